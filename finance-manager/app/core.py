@@ -1,9 +1,9 @@
 from functools import reduce
-import json
+from core.journal import load as load_with_journal
+from core.frame import TransactionFrame
 
 def load_seed(path: str):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load_with_journal(path)
     return (
         tuple(data["accounts"]),
         tuple(data["categories"]),
@@ -21,4 +21,6 @@ def update_budget(budgets: tuple, bid: str, new_limit: int):
     )
 
 def account_balance(trans: tuple, acc_id: str):
+    if isinstance(trans, TransactionFrame):
+        return trans.account_balance(acc_id)
     return reduce(lambda acc, t: acc + t["amount"] if t["acc_id"] == acc_id else acc, trans, 0)
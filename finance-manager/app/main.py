@@ -1,12 +1,57 @@
 import streamlit as st
+import io
 import json
 import os
-from dataclasses import dataclass, asdict
-from functools import reduce
+import sys
 import plotly.express as px
-from typing import Optional, Tuple, List
+from typing import Optional, List
+
+# app/ лежит рядом с core/: делаем пакет core импортируемым при `streamlit run app/main.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import dicts_to_budgets, model_to_dict, models_to_dicts, next_id_from_list, update_budget
+from core.journal import TABLES, empty_data
+from core.storage import open_storage
+from core.frp import EventBus
+from core.views import MaterializedTotals, TRANSACTION_ADDED, TRANSACTION_EDITED, TRANSACTION_DELETED
+from core.importer import import_csv
+from core.indexes import IndexManager
+from core.persistent import PersistentRows
+from core.cache import DerivedCache
+from core.reports import Report, build_report
+from core.cube import Cube
+from core import tracing
+from core.tracing import traced
+
+DATA_FILE = os.environ.get("FM_DATA_FILE", "data/seed.json")  # или бинарный data/seed.fmsnap
+DB_FILE = os.environ.get("FM_DB_FILE", "data/finance.db")
+STORAGE_BACKEND = os.environ.get("FM_STORAGE", "json")  # "json" или "sqlite"
+
+# Трассировка включается флажком на странице Settings; один перезапуск скрипта — интервал app.rerun.
+# cProfile — по кнопке, ровно для следующего перезапуска (отчёт остаётся в session_state).
+tracing.enable(st.session_state.get("trace_enabled", False))
+# Открытые интервалы закрываются в end_rerun — и в конце скрипта, и перед каждым st.rerun().
+rerun_spans = [tracing.span("app.rerun").start()]
+rerun_profile = tracing.Profile().start() if st.session_state.pop("profile_next", False) else None
+
+
+def end_rerun() -> bool:
+    """Stop this run's open spans and the profiler, once; True if a profile report was just stored."""
+    global rerun_profile
+    while rerun_spans:
+        rerun_spans.pop().stop()
+    if rerun_profile is None:
+        return False
+    st.session_state["profile_report"] = rerun_profile.stop()
+    rerun_profile = None
+    return True
+
+
+def rerun():
+    """st.rerun() that first closes the spans and profiler of the current run."""
+    end_rerun()
+    st.rerun()
 
-DATA_FILE = "data/seed.json"
 
 def fmt(x):
     try:
@@ -20,150 +65,91 @@ def fmt(x):
 
 
 
-# -------------------- Immutable models (dataclasses) --------------------
-@dataclass(frozen=True)
-class User:
-    id: int
-    name: str
-
-
-@dataclass(frozen=True)
-class Account:
-    id: int
-    user_id: Optional[int]
-    name: str
-    balance: float
-    currency: str = "KZT"
-
-
-@dataclass(frozen=True)
-class Category:
-    id: int
-    user_id: Optional[int]
-    name: str
-    parent_id: Optional[int] = None
-
-
-@dataclass(frozen=True)
-class Transaction:
-    id: int
-    user_id: Optional[int]
-    acc_id: int
-    cat_id: int
-    amount: float
-
-
-@dataclass(frozen=True)
-class Budget:
-    id: int
-    user_id: Optional[int]
-    cat_id: int
-    limit: float
-
-
-# -------------------- Pure core functions (operate on tuples) --------------------
-def load_seed(path: str) -> Tuple[Tuple[User, ...], Tuple[Account, ...], Tuple[Category, ...], Tuple[Transaction, ...], Tuple[Budget, ...]]:
-    """Pure: load json and return tuples of dataclass instances."""
-    if not os.path.exists(path):
-        return (), (), (), (), ()
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    def _u(x): return User(**x)
-    def _a(x): return Account(id=x["id"], user_id=x.get("user_id"), name=x.get("name", ""), balance=float(x.get("balance", 0.0)), currency=x.get("currency", "KZT"))
-    def _c(x): return Category(id=x["id"], user_id=x.get("user_id"), name=x.get("name", ""), parent_id=x.get("parent_id"))
-    def _t(x): return Transaction(id=x["id"], user_id=x.get("user_id"), acc_id=x["acc_id"], cat_id=x["cat_id"], amount=float(x["amount"]))
-    def _b(x): return Budget(id=x["id"], user_id=x.get("user_id"), cat_id=x["cat_id"], limit=float(x["limit"]))
-    users = tuple(map(_u, data.get("users", [])))
-    accounts = tuple(map(_a, data.get("accounts", [])))
-    categories = tuple(map(_c, data.get("categories", [])))
-    transactions = tuple(map(_t, data.get("transactions", [])))
-    budgets = tuple(map(_b, data.get("budgets", [])))
-    return users, accounts, categories, transactions, budgets
-
-
-def add_transaction(trans: Tuple[Transaction, ...], t: Transaction) -> Tuple[Transaction, ...]:
-    """Pure: return new tuple with appended transaction"""
-    return trans + (t,)
-
-
-def update_budget(budgets: Tuple[Budget, ...], bid: int, new_limit: float) -> Tuple[Budget, ...]:
-    """Pure: return new budgets tuple with updated limit for matching id"""
-    return tuple(b if b.id != bid else Budget(id=b.id, user_id=b.user_id, cat_id=b.cat_id, limit=new_limit) for b in budgets)
-
-
-def account_balance(trans: Tuple[Transaction, ...], acc_id: int) -> float:
-    """Use filter + reduce to compute balance for account acc_id"""
-    acc_trans = filter(lambda t: t.acc_id == acc_id, trans)  # filter
-    return reduce(lambda acc, t: acc + t.amount, acc_trans, 0.0)  # reduce
-
-
-def total_balance(trans: Tuple[Transaction, ...], accounts: Tuple[Account, ...]) -> float:
-    """Use map + reduce to compute total balance across accounts"""
-    balances_iter = map(lambda a: account_balance(trans, a.id), accounts)  # map
-    return reduce(lambda s, x: s + x, balances_iter, 0.0)
-
-
-# -------------------- Helpers to convert between dicts (session/json) and dataclasses --------------------
-def dicts_to_users(lst: List[dict]) -> Tuple[User, ...]:
-    return tuple(User(**u) for u in lst)
-
-
-def dicts_to_accounts(lst: List[dict]) -> Tuple[Account, ...]:
-    return tuple(Account(id=a["id"], user_id=a.get("user_id"), name=a.get("name", ""), balance=float(a.get("balance", 0.0)), currency=a.get("currency", "KZT")) for a in lst)
-
-
-def dicts_to_categories(lst: List[dict]) -> Tuple[Category, ...]:
-    return tuple(Category(id=c["id"], user_id=c.get("user_id"), name=c.get("name", ""), parent_id=c.get("parent_id")) for c in lst)
-
-
-def dicts_to_transactions(lst: List[dict]) -> Tuple[Transaction, ...]:
-    return tuple(Transaction(id=t["id"], user_id=t.get("user_id"), acc_id=t["acc_id"], cat_id=t["cat_id"], amount=float(t["amount"])) for t in lst)
-
-
-def dicts_to_budgets(lst: List[dict]) -> Tuple[Budget, ...]:
-    return tuple(Budget(id=b["id"], user_id=b.get("user_id"), cat_id=b["cat_id"], limit=float(b["limit"])) for b in lst)
-
-
-def models_to_dicts(seq):
-    """General converter: dataclass instances -> list of dicts"""
-    return [asdict(x) for x in seq]
-
-
-def next_id_from_list(lst: List[dict], key="id") -> int:
-    if not lst:
-        return 1
-    return max((item.get(key, 0) for item in lst), default=0) + 1
+# -------------------- File IO and session helpers (UI-side) --------------------
+def get_storage():
+    """Storage backend lives in session_state so it is opened once per session."""
+    if "storage" not in st.session_state:
+        st.session_state["storage"] = open_storage(STORAGE_BACKEND, DATA_FILE, DB_FILE)
+    return st.session_state["storage"]
 
 
-# -------------------- File IO and session helpers (UI-side) --------------------
+@traced("app.load_data_ui")
 def load_data_ui():
-    """Load raw json for session_state use (dicts)."""
-    if not os.path.exists(DATA_FILE):
-        return {"users": [], "accounts": [], "categories": [], "transactions": [], "budgets": []}
+    """
+    Load raw rows (dicts) from the storage backend for session_state use.
+    Not lazy: a *.fmsnap file is decoded into dict rows here as well.
+    """
     try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return get_storage().load_all()
     except Exception as e:
         st.error(f"Ошибка загрузки {DATA_FILE}: {e}")
-        return {"users": [], "accounts": [], "categories": [], "transactions": [], "budgets": []}
+        return empty_data()
 
 
 def save_data_ui():
-    os.makedirs(os.path.dirname(DATA_FILE) or ".", exist_ok=True)
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump({
-            "users": st.session_state.get("users", []),
-            "accounts": st.session_state.get("accounts", []),
-            "categories": st.session_state.get("categories", []),
-            "transactions": st.session_state.get("transactions", []),
-            "budgets": st.session_state.get("budgets", []),
-        }, f, indent=2, ensure_ascii=False)
+    """Full rewrite of the storage backend from session_state."""
+    get_storage().replace_all({
+        "users": st.session_state.get("users", []),
+        "accounts": st.session_state.get("accounts", []),
+        "categories": st.session_state.get("categories", []),
+        "transactions": st.session_state.get("transactions", []),
+        "budgets": st.session_state.get("budgets", []),
+    })
+
+
+def cache_scope(table: str, row: dict):
+    """Derived-data cache scope touched by a row: its owner (a user row is its own scope)."""
+    return row.get("id") if table == "users" else row.get("user_id")
+
+
+def log_put(table: str, row: dict):
+    """Persist one inserted/updated row (journal append or SQL upsert) and update the indexes."""
+    get_storage().put(table, row)
+    st.session_state["index"].put(table, row)
+    st.session_state["cache"].bump(cache_scope(table, row))
+
+
+def log_put_many(table: str, rows: List[dict]):
+    """Persist a batch of rows with one storage write."""
+    get_storage().put_many(table, rows)
+    st.session_state["index"].put_many(table, rows)
+    st.session_state["cache"].bump(*{cache_scope(table, row) for row in rows})
+
+
+def log_delete(table: str, row_id):
+    """Persist one deletion (journal append or SQL delete) and update the indexes."""
+    old = st.session_state["index"].get(table, row_id)
+    get_storage().delete(table, row_id)
+    st.session_state["index"].delete(table, row_id)
+    if old is not None:
+        st.session_state["cache"].bump(cache_scope(table, old))
+    else:
+        st.session_state["cache"].bump()
+
+
+@traced("app.init_totals")
+def init_totals():
+    """Build running totals and the report cube from the loaded transactions and wire them to a fresh EventBus."""
+    bus = EventBus()
+    st.session_state["totals"] = MaterializedTotals(st.session_state.get("transactions", [])).subscribe(bus)
+    st.session_state["cube"] = Cube.build(st.session_state.get("transactions", [])).subscribe(bus)
+    st.session_state["bus"] = bus
 
 
-def refresh_maps():
-    st.session_state["accounts_map"] = {a["id"]: a for a in st.session_state.get("accounts", [])}
-    st.session_state["categories_map"] = {c["id"]: c for c in st.session_state.get("categories", [])}
-    st.session_state["users_map"] = {u["id"]: u for u in st.session_state.get("users", [])}
+def publish(name: str, payload: dict):
+    """Notify subscribers (materialized totals) about a transaction change."""
+    st.session_state["bus"].publish(name, payload)
+
+
+@traced("app.init_index")
+def init_index():
+    """Build the secondary indexes once; log_put/log_delete keep them current afterwards."""
+    index = IndexManager({table: st.session_state.get(table, []) for table in TABLES})
+    st.session_state["index"] = index
+    # id -> row maps are live views of the primary index, not copies
+    st.session_state["accounts_map"] = index.by_id("accounts")
+    st.session_state["categories_map"] = index.by_id("categories")
+    st.session_state["users_map"] = index.by_id("users")
 
 
 # -------------------- Initialize session_state --------------------
@@ -172,9 +158,11 @@ if "users" not in st.session_state:
     st.session_state["users"] = data.get("users", [])
     st.session_state["accounts"] = data.get("accounts", [])
     st.session_state["categories"] = data.get("categories", [])
-    st.session_state["transactions"] = data.get("transactions", [])
+    st.session_state["transactions"] = PersistentRows.from_rows(data.get("transactions", []))
     st.session_state["budgets"] = data.get("budgets", [])
-    refresh_maps()
+    init_index()
+    init_totals()
+    st.session_state["cache"] = DerivedCache()
 
 
 # -------------------- Sidebar / UI basics --------------------
@@ -192,11 +180,94 @@ else:
 menu = st.sidebar.radio("Menu", ["Overview", "Data", "Reports", "Settings"])
 
 
-def filter_by_user(data: List[dict], key="user_id"):
+def user_rows(table: str) -> List[dict]:
+    """Rows of the selected user from the user_id posting list."""
     if not selected_user:
         return []
-    return [d for d in data if d.get(key) == selected_user]
-
+    return st.session_state["index"].query(table, user_id=selected_user)
+
+
+def cached(name: str, build):
+    """Per-user derived artifact, rebuilt only after a write that touches the selected user."""
+    return st.session_state["cache"].get(selected_user, name, build)
+
+
+@traced("app.user_report")
+def user_report(user_id) -> Optional[Report]:
+    """Single-pass report engine fed by the materialized per-category totals; None without transactions."""
+    cat_totals = st.session_state["totals"].category_totals(user_id)
+    if not cat_totals:
+        return None
+    index = st.session_state["index"]
+    return build_report(cat_totals, index.query("categories", user_id=user_id), index.query("budgets", user_id=user_id))
+
+
+@traced("app.overview_artifacts")
+def overview_artifacts(user_id) -> Optional[dict]:
+    """Totals, pie chart and advice for the Overview page; None if the user has no transactions."""
+    report = cached("report_data", lambda: user_report(user_id))
+    if report is None:
+        return None
+    income, expense, balance = report.income, report.expense, report.balance
+
+    categories_total = {name or "❓ Unknown": total for name, total in report.expenses_by_name().items()}
+    expense_data = [{"Категория": name, "Сумма": total} for name, total in categories_total.items()]
+    pie = px.pie(expense_data, names="Категория", values="Сумма", title="Структура расходов") if expense_data else None
+
+    advice_list = []
+    if income == 0:
+        advice_list.append("⚠ Нет регулярного дохода. Сначала стабилизируйте заработок.")
+    if expense > income:
+        advice_list.append("⚠ Ваши расходы превышают доходы. Попробуйте сократить траты.")
+    elif balance < income * 0.05:
+        advice_list.append("⚠ У вас почти нет свободных денег. Попробуйте откладывать хотя бы 10% дохода.")
+    elif income > expense:
+        saving_rate = balance / income if income > 0 else 0
+        if saving_rate < 0.1:
+            advice_list.append("💡 Вы живёте по средствам, но откладываете мало. Попробуйте увеличить накопления.")
+        elif 0.1 <= saving_rate <= 0.2:
+            advice_list.append("✅ Отличный результат! Вы формируете подушку безопасности.")
+        elif saving_rate > 0.2:
+            advice_list.append("🏆 Великолепно! Стоит подумать о долгосрочных инвестициях.")
+
+    if categories_total:
+        max_cat = max(categories_total, key=categories_total.get)
+        if categories_total[max_cat] > expense * 0.9:
+            advice_list.append(f"⚠ Слишком большая доля трат уходит на категорию '{max_cat}'. Сбалансируйте расходы.")
+
+    return {"income": income, "expense": expense, "balance": balance, "pie": pie, "advice": advice_list}
+
+
+@traced("app.report_artifacts")
+def report_artifacts(user_id) -> Optional[dict]:
+    """Formatted tables for the Reports page; None if the user has no transactions."""
+    report = cached("report_data", lambda: user_report(user_id))
+    if report is None:
+        return None
+    by_month = st.session_state["cube"].rollup(("month",), {"user_id": user_id})
+    return {
+        "income": report.income, "expense": report.expense, "balance": report.balance,
+        "by_category": [
+            {"Категория": row.name or "❓ Unknown", "Доход": fmt(row.income), "Расход": fmt(row.expense)}
+            for row in report.by_category
+        ],
+        "by_subcategory": [
+            {"Категория/Подкатегория": row.name, "Доход": fmt(row.income), "Расход": fmt(row.expense)}
+            for row in report.by_subcategory
+        ],
+        "by_month": [
+            {"Месяц": month or "—", "Доход": fmt(t["income"]), "Расход": fmt(t["expense"]),
+             "Операций": t["n_income"] + t["n_expense"]}
+            for month, t in sorted(by_month.items(), key=lambda item: item[0] or "")
+        ],
+        "budgets": [
+            {"Категория": row.name, "Лимит": fmt(row.limit), "Потрачено": fmt(row.spent), "Остаток": fmt(row.remaining)}
+            for row in report.budgets
+        ] if report.budgets else None,
+    }
+
+
+rerun_spans.append(tracing.span(f"app.page.{menu}").start())
 
 # -------------------- Overview --------------------
 if menu == "Overview":
@@ -205,19 +276,11 @@ if menu == "Overview":
     if not selected_user:
         st.info("Нет пользователей. Добавьте пользователя во вкладке Data.")
     else:
-        # use filter_by_user on raw session_state dicts
-        user_trx = filter_by_user(st.session_state["transactions"])
-        if not user_trx:
+        overview = cached("overview", lambda: overview_artifacts(selected_user))
+        if overview is None:
             st.info("Нет транзакций.")
         else:
-            refresh_maps()
-            # Build dataclass tuples for pure computations
-            trans_tup = dicts_to_transactions(st.session_state["transactions"])
-            acc_tup = dicts_to_accounts(filter_by_user(st.session_state["accounts"]))
-
-            income = sum(t.amount for t in trans_tup if t.amount > 0 and t.user_id == selected_user)
-            expense = sum(-t.amount for t in trans_tup if t.amount < 0 and t.user_id == selected_user)
-            balance = income - expense
+            income, expense, balance = overview["income"], overview["expense"], overview["balance"]
 
             col1, col2, col3 = st.columns(3)
             col1.metric("Доход", f"{fmt(income)} KZT")
@@ -226,46 +289,14 @@ if menu == "Overview":
 
             # --- Расходы по категориям ---
             st.subheader("📌 Расходы по категориям")
-            categories_map = {c["id"]: c for c in filter_by_user(st.session_state["categories"])}
-            expense_data = []
-            for t in trans_tup:
-                if t.amount < 0 and t.user_id == selected_user:
-                    cat_name = categories_map.get(t.cat_id, {"name": "❓ Unknown"})["name"]
-                    expense_data.append({"Категория": cat_name, "Сумма": -t.amount})
-            if expense_data:
-                fig = px.pie(expense_data, names="Категория", values="Сумма", title="Структура расходов")
-                st.plotly_chart(fig, use_container_width=True)
+            if overview["pie"] is not None:
+                st.plotly_chart(overview["pie"], use_container_width=True)
             else:
                 st.info("Нет расходов для построения диаграммы.")
 
             # --- Финансовые советы ---
             st.subheader("💡 Финансовые советы")
-            advice_list = []
-            if income == 0:
-                advice_list.append("⚠ Нет регулярного дохода. Сначала стабилизируйте заработок.")
-            if expense > income:
-                advice_list.append("⚠ Ваши расходы превышают доходы. Попробуйте сократить траты.")
-            elif balance < income * 0.05:
-                advice_list.append("⚠ У вас почти нет свободных денег. Попробуйте откладывать хотя бы 10% дохода.")
-            elif income > expense:
-                saving_rate = balance / income if income > 0 else 0
-                if saving_rate < 0.1:
-                    advice_list.append("💡 Вы живёте по средствам, но откладываете мало. Попробуйте увеличить накопления.")
-                elif 0.1 <= saving_rate <= 0.2:
-                    advice_list.append("✅ Отличный результат! Вы формируете подушку безопасности.")
-                elif saving_rate > 0.2:
-                    advice_list.append("🏆 Великолепно! Стоит подумать о долгосрочных инвестициях.")
-
-            categories_total = {}
-            for t in trans_tup:
-                if t.amount < 0 and t.user_id == selected_user:
-                    cat_name = categories_map.get(t.cat_id, {"name": "❓ Unknown"})["name"]
-                    categories_total[cat_name] = categories_total.get(cat_name, 0) + (-t.amount)
-            if categories_total:
-                max_cat = max(categories_total, key=categories_total.get)
-                if categories_total[max_cat] > expense * 0.9:
-                    advice_list.append(f"⚠ Слишком большая доля трат уходит на категорию '{max_cat}'. Сбалансируйте расходы.")
-
+            advice_list = overview["advice"]
             if advice_list:
                 for adv in advice_list:
                     st.write(adv)
@@ -288,8 +319,7 @@ elif menu == "Data":
             if submitted and name:
                 new_id = next_id_from_list(st.session_state["users"])
                 st.session_state["users"].append({"id": new_id, "name": name})
-                save_data_ui()
-                refresh_maps()
+                log_put("users", st.session_state["users"][-1])
                 st.success("Пользователь добавлен")
 
     if not selected_user:
@@ -298,7 +328,7 @@ elif menu == "Data":
         # --- accounts ---
         with tabs[1]:
             st.subheader("Счета")
-            accs = filter_by_user(st.session_state["accounts"])
+            accs = user_rows("accounts")
             st.table([{**a, "balance": fmt(a.get("balance", 0.0))} for a in accs])
             with st.form("add_acc"):
                 name = st.text_input("Название счёта")
@@ -310,15 +340,13 @@ elif menu == "Data":
                         "id": new_id, "user_id": selected_user,
                         "name": name, "balance": float(balance), "currency": "KZT"
                     })
-                    save_data_ui()
-                    refresh_maps()
+                    log_put("accounts", st.session_state["accounts"][-1])
                     st.success("Счёт добавлен")
 
         # --- categories ---
         with tabs[2]:
             st.subheader("Категории")
-            refresh_maps()
-            cats = filter_by_user(st.session_state["categories"])
+            cats = user_rows("categories")
             categories_table = []
             for c in cats:
                 parent_name = "—"
@@ -347,16 +375,15 @@ elif menu == "Data":
                         "id": new_id, "user_id": selected_user,
                         "name": name, "parent_id": parent
                     })
-                    save_data_ui()
-                    refresh_maps()
+                    log_put("categories", st.session_state["categories"][-1])
                     st.success("Категория добавлена")
 
         # --- transactions ---
         with tabs[3]:
             st.subheader("➕ Добавить транзакцию")
             with st.form("add_trx"):
-                acc_list = filter_by_user(st.session_state["accounts"])
-                cat_list = filter_by_user(st.session_state["categories"])
+                acc_list = user_rows("accounts")
+                cat_list = user_rows("categories")
                 if not acc_list or not cat_list:
                     st.warning("Сначала добавьте счёт и категорию.")
                 else:
@@ -373,20 +400,64 @@ elif menu == "Data":
                     amount = st.number_input("Сумма (+ доход, - расход)", value=0.0)
                     submitted = st.form_submit_button("Добавить")
                     if submitted and amount != 0:
-                        # Use pure add_transaction:
-                        trans_tup = dicts_to_transactions(st.session_state["transactions"])
-                        new_id = next_id_from_list(st.session_state["transactions"])
-                        new_t = Transaction(id=new_id, user_id=selected_user, acc_id=acc_id, cat_id=cat_id, amount=float(amount))
-                        new_trans_tup = add_transaction(trans_tup, new_t)
-                        # write back to session_state as dicts
-                        st.session_state["transactions"] = models_to_dicts(new_trans_tup)
-                        save_data_ui()
-                        refresh_maps()
+                        # Persistent append: O(log n), earlier versions stay valid
+                        new_row = {
+                            "id": st.session_state["transactions"].next_id(), "user_id": selected_user,
+                            "acc_id": acc_id, "cat_id": cat_id, "amount": float(amount),
+                        }
+                        st.session_state["transactions"] = st.session_state["transactions"].append(new_row)
+                        log_put("transactions", new_row)
+                        publish(TRANSACTION_ADDED, {"transaction": new_row})
                         st.success("Транзакция добавлена")
-                        st.rerun()
+                        rerun()
+
+            with st.expander("📥 Импорт из CSV / банковской выписки"):
+                acc_list = user_rows("accounts")
+                cat_list = user_rows("categories")
+                uploaded = st.file_uploader("CSV-файл", type=["csv"], key="import_csv")
+                if uploaded is not None and acc_list and cat_list:
+                    st.caption("Колонки: date, amount, account, category, note (счёт и категория — id или название)")
+                    imp_acc = st.selectbox(
+                        "Счёт по умолчанию",
+                        [a["id"] for a in acc_list],
+                        format_func=lambda aid: st.session_state["accounts_map"][aid]["name"],
+                        key="import_acc",
+                    )
+                    imp_cat = st.selectbox(
+                        "Категория по умолчанию",
+                        [c["id"] for c in cat_list],
+                        format_func=lambda cid: st.session_state["categories_map"][cid]["name"],
+                        key="import_cat",
+                    )
+                    imp_delimiter = st.selectbox("Разделитель", [",", ";", "\t"], key="import_delimiter")
+                    if st.button("Импортировать"):
+                        def _sink(rows: List[dict]):
+                            log_put_many("transactions", rows)
+                            st.session_state["transactions"] = st.session_state["transactions"].extend(rows)
+                            for row in rows:
+                                publish(TRANSACTION_ADDED, {"transaction": row})
+
+                        summary = import_csv(
+                            io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline=""),
+                            _sink,
+                            selected_user,
+                            acc_list,
+                            cat_list,
+                            existing=user_rows("transactions"),
+                            next_id=st.session_state["transactions"].next_id(),
+                            account_id=imp_acc,
+                            category_id=imp_cat,
+                            delimiter=imp_delimiter,
+                        )
+                        st.success(
+                            f"Импортировано: {summary.imported}, дубликатов: {summary.duplicates}, "
+                            f"отклонено: {summary.rejected}"
+                        )
+                        for error in summary.errors:
+                            st.warning(error)
 
             st.divider()
-            trx_list = filter_by_user(st.session_state["transactions"])
+            trx_list = user_rows("transactions")
             if trx_list:
                 st.subheader("📋 Список транзакций")
                 trx_display = []
@@ -406,8 +477,8 @@ elif menu == "Data":
                 transaction = next(t for t in trx_list if t["id"] == selected_trx_id)
 
                 with st.form(f"edit_trx_{selected_trx_id}"):
-                    acc_choices = [a["id"] for a in filter_by_user(st.session_state["accounts"])]
-                    cat_choices = [c["id"] for c in filter_by_user(st.session_state["categories"])]
+                    acc_choices = [a["id"] for a in user_rows("accounts")]
+                    cat_choices = [c["id"] for c in user_rows("categories")]
                     new_acc = st.selectbox(
                         "Счёт",
                         acc_choices,
@@ -429,33 +500,25 @@ elif menu == "Data":
                         delete = st.form_submit_button("🗑 Удалить")
 
                     if submitted:
-                        # Replace transaction immutably using tuple ops:
-                        trans_tup = dicts_to_transactions(st.session_state["transactions"])
-                        def _map_replace(t: Transaction):
-                            if t.id != selected_trx_id:
-                                return t
-                            return Transaction(id=t.id, user_id=selected_user, acc_id=new_acc, cat_id=new_cat, amount=float(new_amount))
-                        new_trans_tup = tuple(map(_map_replace, trans_tup))
-                        st.session_state["transactions"] = models_to_dicts(new_trans_tup)
-                        save_data_ui()
-                        refresh_maps()
+                        # Replace immutably: only the path to this row is copied
+                        new_row = {**transaction, "acc_id": new_acc, "cat_id": new_cat, "amount": float(new_amount)}
+                        st.session_state["transactions"] = st.session_state["transactions"].replace(new_row)
+                        log_put("transactions", new_row)
+                        publish(TRANSACTION_EDITED, {"old": transaction, "new": new_row})
                         st.success("Транзакция обновлена")
-                        st.rerun()
+                        rerun()
 
                     if delete:
-                        trans_tup = dicts_to_transactions(st.session_state["transactions"])
-                        new_trans_tup = tuple(filter(lambda t: t.id != selected_trx_id, trans_tup))
-                        st.session_state["transactions"] = models_to_dicts(new_trans_tup)
-                        save_data_ui()
-                        refresh_maps()
+                        st.session_state["transactions"] = st.session_state["transactions"].delete(selected_trx_id)
+                        log_delete("transactions", selected_trx_id)
+                        publish(TRANSACTION_DELETED, {"transaction": transaction})
                         st.success("Транзакция удалена")
-                        st.rerun()
+                        rerun()
 
         # --- budgets ---
         with tabs[4]:
             st.subheader("Бюджеты")
-            refresh_maps()
-            user_budgets = filter_by_user(st.session_state["budgets"])
+            user_budgets = user_rows("budgets")
             budget_display = []
             for b in user_budgets:
                 cat_name = st.session_state["categories_map"].get(b["cat_id"], {}).get("name", f"#{b['cat_id']}")
@@ -476,8 +539,7 @@ elif menu == "Data":
                     budgets_tup = dicts_to_budgets(st.session_state["budgets"])
                     new_budgets_tup = update_budget(budgets_tup, bid, float(new_limit))
                     st.session_state["budgets"] = models_to_dicts(new_budgets_tup)
-                    save_data_ui()
-                    refresh_maps()
+                    log_put("budgets", next(model_to_dict(b) for b in new_budgets_tup if b.id == bid))
                     st.success("Лимит обновлён")
 
 # -------------------- Reports --------------------
@@ -486,94 +548,69 @@ elif menu == "Reports":
     if not selected_user:
         st.warning("Выберите пользователя для отчётов.")
     else:
-        trans_tup = dicts_to_transactions(st.session_state["transactions"])
-        user_trx = [t for t in st.session_state["transactions"] if t.get("user_id") == selected_user]
-        if not user_trx:
+        report = cached("report", lambda: report_artifacts(selected_user))
+        if report is None:
             st.warning("Нет транзакций для отчётов.")
         else:
-            refresh_maps()
-            income = sum(t["amount"] for t in user_trx if t["amount"] > 0)
-            expense = sum(-t["amount"] for t in user_trx if t["amount"] < 0)
-            balance = income - expense
-
             st.subheader("Общие показатели")
             col1, col2, col3 = st.columns(3)
-            col1.metric("Доход", f"{fmt(income)} KZT")
-            col2.metric("Расход", f"{fmt(expense)} KZT")
-            col3.metric("Баланс", f"{fmt(balance)} KZT")
+            col1.metric("Доход", f"{fmt(report['income'])} KZT")
+            col2.metric("Расход", f"{fmt(report['expense'])} KZT")
+            col3.metric("Баланс", f"{fmt(report['balance'])} KZT")
 
             st.subheader("По категориям")
-            categories_map = {c["id"]: c for c in filter_by_user(st.session_state["categories"])}
-            stats_cat = {}
-            for t in trans_tup:
-                if t.user_id != selected_user:
-                    continue
-                cat = categories_map.get(t.cat_id, {"name": "❓ Unknown"})
-                cat_name = cat["name"]
-                if cat_name not in stats_cat:
-                    stats_cat[cat_name] = {"income": 0, "expense": 0}
-                if t.amount > 0:
-                    stats_cat[cat_name]["income"] += t.amount
-                else:
-                    stats_cat[cat_name]["expense"] += -t.amount
-
-            st.table([
-                {"Категория": name, "Доход": fmt(vals["income"]), "Расход": fmt(vals["expense"])}
-                for name, vals in stats_cat.items()
-            ])
+            st.table(report["by_category"])
 
             st.subheader("По подкатегориям")
-            stats_subcat = {}
-            for t in trans_tup:
-                if t.user_id != selected_user:
-                    continue
-                cat = categories_map.get(t.cat_id, None)
-                if not cat:
-                    continue
-                parent = categories_map.get(cat.get("parent_id"), None)
-                key = f"{parent['name']} → {cat['name']}" if parent else cat["name"]
-                if key not in stats_subcat:
-                    stats_subcat[key] = {"income": 0, "expense": 0}
-                if t.amount > 0:
-                    stats_subcat[key]["income"] += t.amount
-                else:
-                    stats_subcat[key]["expense"] += -t.amount
+            st.table(report["by_subcategory"])
 
-            st.table([
-                {"Категория/Подкатегория": name, "Доход": fmt(vals["income"]), "Расход": fmt(vals["expense"])}
-                for name, vals in stats_subcat.items()
-            ])
+            st.subheader("По месяцам")
+            st.table(report["by_month"])
 
-            user_budgets = filter_by_user(st.session_state["budgets"])
-            if user_budgets:
+            if report["budgets"] is not None:
                 st.subheader("Бюджеты")
-                budget_summary = []
-                for b in user_budgets:
-                    cat = categories_map.get(b["cat_id"], None)
-                    if not cat:
-                        continue
-                    spent = sum(
-                        -t["amount"] for t in st.session_state["transactions"]
-                        if t["cat_id"] == b["cat_id"] and t["amount"] < 0 and t.get("user_id") == selected_user
-                    )
-                    budget_summary.append({
-                        "Категория": cat["name"],
-                        "Лимит": fmt(b["limit"]),
-                        "Потрачено": fmt(spent),
-                        "Остаток": fmt(b["limit"] - spent)
-                    })
-                st.table(budget_summary)
+                st.table(report["budgets"])
 
 
 # -------------------- Settings --------------------
 elif menu == "Settings":
-    st.subheader("Soon")
+    st.subheader("Производительность")
+    st.checkbox("Трассировка (замеры интервалов)", key="trace_enabled")
+    stats = tracing.TRACER.stats()
+    if stats:
+        st.dataframe([{k: round(v, 3) if isinstance(v, float) else v for k, v in row.items()} for row in stats])
+        st.download_button(
+            "Скачать трассировку (Chrome trace JSON)",
+            data=json.dumps(tracing.TRACER.chrome_trace()),
+            file_name="finance-manager-trace.json",
+            mime="application/json",
+        )
+    elif st.session_state.get("trace_enabled"):
+        st.info("Замеров пока нет — они появятся после следующего перезапуска страницы.")
+    col1, col2 = st.columns(2)
+    if col1.button("Сбросить замеры"):
+        tracing.TRACER.reset()
+        rerun()
+    if col2.button("Профилировать следующий перезапуск (cProfile)"):
+        st.session_state["profile_next"] = True
+        rerun()
+    if "profile_report" in st.session_state:
+        st.code(st.session_state["profile_report"], language="text")
+
+    st.subheader("Данные")
     if st.button("Сбросить данные (очистить seed.json)"):
         st.session_state["users"] = []
         st.session_state["accounts"] = []
         st.session_state["categories"] = []
-        st.session_state["transactions"] = []
+        st.session_state["transactions"] = PersistentRows()
         st.session_state["budgets"] = []
         save_data_ui()
-        refresh_maps()
+        init_index()
+        init_totals()
+        st.session_state["cache"].bump()
         st.success("Данные сброшены.")
+
+
+# -------------------- Tracing / profiling: end of rerun --------------------
+if end_rerun():
+    st.rerun()  # показать отчёт профилировщика на странице
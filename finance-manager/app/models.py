@@ -0,0 +1,135 @@
+"""
+Immutable models of the app and the pure functions over them (no Streamlit),
+so that benchmarks and tests can import the same code the pages run.
+"""
+from collections import Counter
+from dataclasses import dataclass, fields
+from functools import reduce
+from typing import List, Optional, Tuple
+
+from core.decode import decode_rows
+from core.journal import load as load_with_journal
+
+
+# -------------------- Immutable models (dataclasses) --------------------
+@dataclass(frozen=True, slots=True)
+class User:
+    id: int
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class Account:
+    id: int
+    user_id: Optional[int]
+    name: str
+    balance: float
+    currency: str = "KZT"
+
+
+@dataclass(frozen=True, slots=True)
+class Category:
+    id: int
+    user_id: Optional[int]
+    name: str
+    parent_id: Optional[int] = None
+
+
+@dataclass(frozen=True, slots=True)
+class Transaction:
+    id: int
+    user_id: Optional[int]
+    acc_id: int
+    cat_id: int
+    amount: float
+
+
+@dataclass(frozen=True, slots=True)
+class Budget:
+    id: int
+    user_id: Optional[int]
+    cat_id: int
+    limit: float
+
+
+# seed.json key, default and converter for every model field, in declaration order
+SEED_SPEC = {
+    "users": (("id", None, None), ("name", "", None)),
+    "accounts": (("id", None, None), ("user_id", None, None), ("name", "", None),
+                 ("balance", 0.0, float), ("currency", "KZT", None)),
+    "categories": (("id", None, None), ("user_id", None, None), ("name", "", None), ("parent_id", None, None)),
+    "transactions": (("id", None, None), ("user_id", None, None), ("acc_id", None, None),
+                     ("cat_id", None, None), ("amount", 0.0, float)),
+    "budgets": (("id", None, None), ("user_id", None, None), ("cat_id", None, None), ("limit", 0.0, float)),
+}
+
+
+# -------------------- Pure core functions (operate on tuples) --------------------
+def load_seed(path: str) -> Tuple[Tuple[User, ...], Tuple[Account, ...], Tuple[Category, ...], Tuple[Transaction, ...], Tuple[Budget, ...]]:
+    """Pure: load json snapshot + journal and bulk-decode rows into slotted dataclass tuples."""
+    data = load_with_journal(path)
+    return tuple(
+        tuple(decode_rows(cls, data.get(table, []), SEED_SPEC[table]))
+        for table, cls in (("users", User), ("accounts", Account), ("categories", Category),
+                           ("transactions", Transaction), ("budgets", Budget))
+    )
+
+
+def add_transaction(trans: Tuple[Transaction, ...], t: Transaction) -> Tuple[Transaction, ...]:
+    """Pure: return new tuple with appended transaction"""
+    return trans + (t,)
+
+
+def update_budget(budgets: Tuple[Budget, ...], bid: int, new_limit: float) -> Tuple[Budget, ...]:
+    """Pure: return new budgets tuple with updated limit for matching id"""
+    return tuple(b if b.id != bid else Budget(id=b.id, user_id=b.user_id, cat_id=b.cat_id, limit=new_limit) for b in budgets)
+
+
+def account_balance(trans: Tuple[Transaction, ...], acc_id: int) -> float:
+    """Use filter + reduce to compute balance for account acc_id"""
+    acc_trans = filter(lambda t: t.acc_id == acc_id, trans)  # filter
+    return reduce(lambda acc, t: acc + t.amount, acc_trans, 0.0)  # reduce
+
+
+def total_balance(trans: Tuple[Transaction, ...], accounts: Tuple[Account, ...]) -> float:
+    """Use filter + reduce to compute total balance across accounts in one pass over trans"""
+    weight = Counter(a.id for a in accounts)  # не account_balance на каждый счёт: O(N), а не O(счетов x N)
+    acc_trans = filter(lambda t: t.acc_id in weight, trans)
+    return reduce(lambda s, t: s + t.amount * weight[t.acc_id], acc_trans, 0.0)
+
+
+# -------------------- Helpers to convert between dicts (session/json) and dataclasses --------------------
+def dicts_to_users(lst: List[dict]) -> Tuple[User, ...]:
+    return tuple(User(**u) for u in lst)
+
+
+def dicts_to_accounts(lst: List[dict]) -> Tuple[Account, ...]:
+    return tuple(Account(id=a["id"], user_id=a.get("user_id"), name=a.get("name", ""), balance=float(a.get("balance", 0.0)), currency=a.get("currency", "KZT")) for a in lst)
+
+
+def dicts_to_categories(lst: List[dict]) -> Tuple[Category, ...]:
+    return tuple(Category(id=c["id"], user_id=c.get("user_id"), name=c.get("name", ""), parent_id=c.get("parent_id")) for c in lst)
+
+
+def dicts_to_transactions(lst: List[dict]) -> Tuple[Transaction, ...]:
+    return tuple(Transaction(id=t["id"], user_id=t.get("user_id"), acc_id=t["acc_id"], cat_id=t["cat_id"], amount=float(t["amount"])) for t in lst)
+
+
+def dicts_to_budgets(lst: List[dict]) -> Tuple[Budget, ...]:
+    return tuple(Budget(id=b["id"], user_id=b.get("user_id"), cat_id=b["cat_id"], limit=float(b["limit"])) for b in lst)
+
+
+def model_to_dict(x) -> dict:
+    """Shallow dataclass -> dict (fields are scalars, so no asdict recursion/deepcopy)."""
+    return {f.name: getattr(x, f.name) for f in fields(x)}
+
+
+def models_to_dicts(seq):
+    """General converter: dataclass instances -> list of dicts"""
+    return [model_to_dict(x) for x in seq]
+
+
+def next_id_from_list(lst: List[dict], key="id") -> int:
+    if not lst:
+        return 1
+    return max((item.get(key, 0) for item in lst), default=0) + 1
@@ -0,0 +1,66 @@
+"""
+Пропускная способность шины событий: EventBus.publish vs AsyncEventBus.
+
+    python -m bench.bench_bus [events]
+"""
+import asyncio
+import sys
+import time
+
+from core.frp import AsyncEventBus, EventBus
+from core.views import TRANSACTION_ADDED, MaterializedTotals
+
+
+def make_events(n: int):
+    return [
+        {"transaction": {"id": i, "user_id": i % 50, "acc_id": i % 150, "cat_id": i % 200,
+                         "amount": float(i % 997 - 600), "date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}"}}
+        for i in range(n)
+    ]
+
+
+def sync_bus(events):
+    bus = EventBus()
+    MaterializedTotals().subscribe(bus)
+    for payload in events:
+        bus.publish(TRANSACTION_ADDED, payload)
+
+
+async def async_bus(events, batch: bool, many: bool = False):
+    totals = MaterializedTotals()
+    async with AsyncEventBus(maxsize=4096, batch_size=512) as bus:
+        if batch:
+            def on_batch(batch_events):
+                for event in batch_events:
+                    totals._apply(event.payload["transaction"], 1)
+            bus.subscribe(TRANSACTION_ADDED, on_batch, batch=True)
+        else:
+            bus.subscribe(TRANSACTION_ADDED, totals.on_added)
+        if many:
+            await bus.publish_many(TRANSACTION_ADDED, events)
+        else:
+            for payload in events:
+                await bus.publish(TRANSACTION_ADDED, payload)
+
+
+def rate(func, events) -> float:
+    start = time.perf_counter()
+    func(events)
+    return len(events) / (time.perf_counter() - start)
+
+
+def main(n: int = 200_000):
+    events = make_events(n)
+    sync_rate = rate(sync_bus, events)
+    single_rate = rate(lambda e: asyncio.run(async_bus(e, batch=False)), events)
+    batch_rate = rate(lambda e: asyncio.run(async_bus(e, batch=True)), events)
+    many_rate = rate(lambda e: asyncio.run(async_bus(e, batch=True, many=True)), events)
+    print(f"events={n}")
+    print(f"EventBus.publish                {sync_rate:12,.0f} events/s")
+    print(f"AsyncEventBus, по одному        {single_rate:12,.0f} events/s")
+    print(f"AsyncEventBus, пачками          {batch_rate:12,.0f} events/s")
+    print(f"AsyncEventBus, publish_many     {many_rate:12,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
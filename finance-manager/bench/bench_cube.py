@@ -0,0 +1,53 @@
+"""
+OLAP-куб при 1M строк: сборка (по словарям, по фрейму, параллельно) и отчёт
+пользователя по месяцам и категориям — просмотр строк vs свёртка ячеек.
+
+    python -m bench.bench_cube [rows]
+"""
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.bench_frame import best_of
+from core.cube import Cube
+from core.domain import MINOR_UNITS
+from core.frame import TransactionFrame
+from core.journal import load
+from data.generate_seed import save_seed
+
+
+def scan_report(rows, user_id):
+    """До куба: проход по всем строкам с группировкой (месяц, категория)."""
+    totals = {}
+    for t in rows:
+        if t["user_id"] == user_id:
+            key = (t["date"][:7], t["cat_id"])
+            totals[key] = totals.get(key, 0) + t["amount"]
+    return totals
+
+
+def main(n: int = 1_000_000):
+    path = os.path.join(tempfile.mkdtemp(), "seed.json")
+    save_seed([path], users=max(5, n // 2000), transactions=n, months=12, seed=42)
+    rows = load(path)["transactions"]
+    user_id = rows[0]["user_id"]
+    frame = TransactionFrame.from_dicts(rows, MINOR_UNITS)
+    cube, build = best_of(Cube.build, rows, repeat=1)
+    _, frame_build = best_of(Cube.from_frame, frame, repeat=1)
+    with ThreadPoolExecutor(os.cpu_count()) as executor:
+        _, parallel_build = best_of(Cube.from_frame, frame, executor, repeat=1)
+    cube.totals({"user_id": user_id})  # индексы измерений строятся при первом запросе
+    scanned, scan_time = best_of(scan_report, rows, user_id)
+    rolled, rollup_time = best_of(cube.rollup, ("month", "cat_id"), {"user_id": user_id})
+    assert scanned.keys() == rolled.keys()
+    print(f"rows={n}, ячеек {len(cube)}, групп в отчёте {len(rolled)}, ядер {os.cpu_count()}")
+    print(f"Cube.build, словари         {build * 1000:9.1f} ms")
+    print(f"Cube.from_frame             {frame_build * 1000:9.1f} ms")
+    print(f"Cube.from_frame, потоки     {parallel_build * 1000:9.1f} ms")
+    print(f"отчёт, просмотр строк       {scan_time * 1000:9.1f} ms  x{scan_time / rollup_time:.0f}")
+    print(f"отчёт, rollup куба          {rollup_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,64 @@
+"""
+Загрузка транзакций при 1M строк: память на транзакцию и время декодирования.
+
+    python -m bench.bench_decode [rows]
+"""
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+from bench.bench_frame import make_rows
+from core.decode import decode_transactions
+from core.domain import MINOR_UNITS
+from core.frame import TransactionFrame
+
+
+@dataclass(frozen=True)
+class DictTransaction:
+    """core.domain.Transaction до перехода на __slots__."""
+    id: str
+    account_id: str
+    cat_id: str
+    amount: int
+    ts: str
+    note: Optional[str] = None
+
+
+def decode_closure(rows):
+    """Прежний путь load_seed: замыкание на строку, x.get(...) и float(...)."""
+    def _t(x): return DictTransaction(x["id"], x["acc_id"], x["cat_id"], float(x["amount"]), x.get("date") or "", x.get("note"))
+    return tuple(map(_t, rows))
+
+
+def measure(func, rows):
+    """(время, байт на строку): память — только то, что создано декодером."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(rows)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # время без накладных расходов tracemalloc
+    start = time.perf_counter()
+    func(rows)
+    elapsed = min(elapsed, time.perf_counter() - start)
+    del result
+    return elapsed, size / len(rows)
+
+
+def main(n: int = 1_000_000):
+    rows = make_rows(n)
+    old_time, old_bytes = measure(decode_closure, rows)
+    new_time, new_bytes = measure(decode_transactions, rows)
+    frame_time, frame_bytes = measure(lambda r: TransactionFrame.from_dicts(r, scale=MINOR_UNITS), rows)
+    print(f"rows={n}")
+    print(f"dataclass + __dict__, float  {old_time * 1000:8.1f} ms  {old_bytes:6.1f} B/транзакцию")
+    print(f"__slots__ + decoder, int     {new_time * 1000:8.1f} ms  {new_bytes:6.1f} B/транзакцию")
+    print(f"колонки TransactionFrame     {frame_time * 1000:8.1f} ms  {frame_bytes:6.1f} B/транзакцию")
+    print(f"ускорение x{old_time / new_time:.1f}, память x{old_bytes / new_bytes:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
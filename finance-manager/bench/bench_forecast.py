@@ -0,0 +1,49 @@
+"""
+Прогноз по всем категориям: ForecastEngine.forecast в цикле vs forecast_all.
+
+    python -m bench.bench_forecast [rows]
+"""
+import random
+import sys
+import time
+
+from core.forecast import ForecastEngine, forecast_all
+
+
+def make_rows(n: int, cats: int = 200, seed: int = 42):
+    rnd = random.Random(seed)
+    return [
+        {
+            "id": i, "cat_id": f"c{rnd.randrange(cats)}", "amount": rnd.randint(-50000, 30000),
+            "date": f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+        }
+        for i in range(n)
+    ]
+
+
+def loop_forecast(rows, period):
+    engine = ForecastEngine(rows)
+    return {cat_id: engine.forecast(cat_id, period) for cat_id in {t["cat_id"] for t in rows}}
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(n: int = 100_000, period: int = 30):
+    rows = make_rows(n)
+    loop_result, loop_time = timed(loop_forecast, rows, period)
+    table, batch_time = timed(forecast_all, rows, period)
+    assert {r.cat_id: r.forecast for r in table} == loop_result
+    print(f"rows={n} categories={len(table)} period={period}")
+    print(f"ForecastEngine в цикле    {loop_time * 1000:9.1f} ms")
+    print(f"forecast_all(mean)        {batch_time * 1000:9.1f} ms  x{loop_time / batch_time:.0f}")
+    for model in ("ewma", "holt"):
+        _, t = timed(forecast_all, rows, period, model, bucket="month")
+        print(f"forecast_all({model}, month) {t * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,69 @@
+"""
+Отчёт по категориям при 1M строк: текущие пути vs TransactionFrame.
+
+    python -m bench.bench_frame [rows]
+"""
+import random
+import sys
+import time
+
+from core.domain import Transaction
+from core.frame import TransactionFrame
+from core.transforms import sum_by_category
+
+
+def make_rows(n: int, users: int = 50, cats: int = 200, seed: int = 42):
+    rnd = random.Random(seed)
+    return [
+        {
+            "id": i, "user_id": rnd.randrange(users), "acc_id": rnd.randrange(users * 3),
+            "cat_id": rnd.randrange(cats), "amount": float(rnd.randint(-50000, 30000)),
+            "date": f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+        }
+        for i in range(n)
+    ]
+
+
+def report_loop(rows):
+    """Страница Reports до изменений: dicts -> dataclass-кортеж, затем цикл по строкам."""
+    trans_tup = tuple(Transaction(t["id"], t["acc_id"], t["cat_id"], t["amount"], t["date"]) for t in rows)
+    stats = {}
+    for t in trans_tup:
+        entry = stats.setdefault(t.cat_id, {"income": 0, "expense": 0})
+        if t.amount > 0:
+            entry["income"] += t.amount
+        else:
+            entry["expense"] += -t.amount
+    return stats
+
+
+def report_sum_by_category(rows):
+    """core.transforms.sum_by_category для каждой категории: O(категорий * N)."""
+    return {cat_id: sum_by_category(rows, cat_id) for cat_id in {t["cat_id"] for t in rows}}
+
+
+def best_of(func, *args, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(n: int = 1_000_000):
+    rows = make_rows(n)
+    frame, build = best_of(TransactionFrame.from_dicts, rows, 1, repeat=1)
+    loop_result, loop_time = best_of(report_loop, rows)
+    _, per_cat_time = best_of(report_sum_by_category, rows, repeat=1)
+    frame_result, frame_time = best_of(frame.income_expense, "cat")
+    assert loop_result == frame_result
+    print(f"rows={n}")
+    print(f"build frame (один раз)        {build * 1000:9.1f} ms")
+    print(f"sum_by_category по категориям {per_cat_time * 1000:9.1f} ms  x{per_cat_time / frame_time:.0f}")
+    print(f"Reports: dataclass + цикл     {loop_time * 1000:9.1f} ms  x{loop_time / frame_time:.0f}")
+    print(f"TransactionFrame              {frame_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,41 @@
+"""
+Выборки по датам при 1M строк: просмотр списка vs Ledger (бинарный поиск).
+
+    python -m bench.bench_ledger [rows]
+"""
+import sys
+
+from bench.bench_frame import best_of, make_rows
+from core.filters import by_date_range
+from core.ledger import Ledger
+from core.transforms import filter_month
+
+
+def scan_month(rows, month):
+    """filter_month по ключу 'month' (до Ledger) — полный просмотр."""
+    return filter_month(rows, month)
+
+
+def main(n: int = 1_000_000):
+    rows = make_rows(n)
+    for t in rows:
+        t["month"] = t["date"][:7]
+    ledger, build = best_of(Ledger, rows, repeat=1)
+    start, end = "2025-03-10", "2025-03-20"
+    pred = by_date_range(start, end)
+    scan, scan_time = best_of(lambda: [t for t in rows if pred(t)])
+    sliced, slice_time = best_of(ledger.range, start, end)
+    assert sorted(t["id"] for t in scan) == sorted(t["id"] for t in sliced)
+    month_scan, month_scan_time = best_of(scan_month, rows, "2025-03")
+    month_slice, month_slice_time = best_of(filter_month, ledger, "2025-03")
+    assert len(month_scan) == len(month_slice)
+    print(f"rows={n}, в диапазоне {len(sliced)}, в месяце {len(month_slice)}")
+    print(f"build Ledger (один раз)     {build * 1000:9.1f} ms")
+    print(f"by_date_range, просмотр     {scan_time * 1000:9.1f} ms  x{scan_time / slice_time:.0f}")
+    print(f"Ledger.range                {slice_time * 1000:9.1f} ms")
+    print(f"filter_month, просмотр      {month_scan_time * 1000:9.1f} ms  x{month_scan_time / month_slice_time:.0f}")
+    print(f"filter_month(Ledger)        {month_slice_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
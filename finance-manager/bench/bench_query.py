@@ -0,0 +1,47 @@
+"""
+Составной фильтр при 1M строк: цепочка iter_transactions vs Query.
+
+    python -m bench.bench_query [rows]
+"""
+import sys
+
+from bench.bench_frame import best_of, make_rows
+from core.filters import by_amount_range, by_category, by_date_range
+from core.frame import TransactionFrame
+from core.indexes import IndexManager
+from core.lazy import iter_transactions
+from core.ledger import Ledger
+from core.query import where
+
+FILTERS = (by_category(7), by_date_range("2025-03-01", "2025-03-31"), by_amount_range(100, 20000))
+
+
+def chained(rows):
+    """Как до Query: по генератору на фильтр, каждый вызывает своё замыкание."""
+    out = rows
+    for f in FILTERS:
+        out = iter_transactions(out, f)
+    return list(out)
+
+
+def main(n: int = 1_000_000):
+    rows = make_rows(n)
+    query = where(*FILTERS)
+    ledger, index = Ledger(rows), IndexManager({"transactions": rows})
+    frame = TransactionFrame.from_dicts(rows)
+    expected, chain_time = best_of(chained, rows)
+    ids = sorted(t["id"] for t in expected)
+    scanned, scan_time = best_of(query.run, rows)
+    indexed, index_time = best_of(query.run, rows, ledger, index)
+    framed, frame_time = best_of(query.run, frame)
+    assert sorted(t["id"] for t in scanned) == ids == sorted(t["id"] for t in indexed)
+    assert len(framed) == len(ids)
+    print(f"rows={n}, найдено {len(ids)}; план: {query.plan(rows, ledger, index)}")
+    print(f"цепочка iter_transactions   {chain_time * 1000:9.1f} ms")
+    print(f"Query, просмотр             {scan_time * 1000:9.1f} ms  x{chain_time / scan_time:.1f}")
+    print(f"Query, ledger + index       {index_time * 1000:9.1f} ms  x{chain_time / index_time:.0f}")
+    print(f"Query, TransactionFrame     {frame_time * 1000:9.1f} ms  x{chain_time / frame_time:.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,43 @@
+"""
+BudgetService: отчёты за все месяцы при 1M строк — построчные калькуляторы
+(calc([t]) на строку, месяц за месяцем) vs пакетный группирующий проход.
+
+    python -m bench.bench_service [rows]
+"""
+import sys
+
+from bench.bench_frame import best_of, make_rows
+from core.domain import MINOR_UNITS
+from core.frame import TransactionFrame
+from core.service import BudgetService
+from core.transforms import sum_by_category
+
+
+def row_sum(rows, cat_id):
+    """Построчный калькулятор (без пометки batch) — идёт через адаптер per_row."""
+    return sum(t["amount"] for t in rows if t["cat_id"] == cat_id)
+
+
+def main(n: int = 1_000_000):
+    rows = make_rows(n)
+    for t in rows:
+        t["month"] = t["date"][:7]
+    months = sorted({t["month"] for t in rows})
+    per_row = BudgetService(calculators=[row_sum])
+    batched = BudgetService(calculators=[sum_by_category])
+    frame = TransactionFrame.from_dicts(rows, MINOR_UNITS)
+    loop, loop_time = best_of(lambda: {m: per_row.monthly_report(rows, m) for m in months}, repeat=1)
+    grouped, grouped_time = best_of(batched.monthly_reports, rows)
+    columnar, columnar_time = best_of(batched.monthly_reports, frame)
+    users, users_time = best_of(lambda: batched.monthly_reports(frame, by_user=True))
+    assert all(abs(loop[m][c] - grouped[m][c]) < 1e-6 * n for m in months for c in loop[m])
+    assert grouped.keys() == columnar.keys()
+    print(f"rows={n}, месяцев {len(months)}, групп пользователь x месяц {len(users)}")
+    print(f"per_row, по месяцу          {loop_time * 1000:9.1f} ms  x{loop_time / grouped_time:.1f}")
+    print(f"monthly_reports, строки     {grouped_time * 1000:9.1f} ms")
+    print(f"monthly_reports, фрейм      {columnar_time * 1000:9.1f} ms")
+    print(f"  по пользователям, фрейм   {users_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,61 @@
+"""
+Время старта: seed.json (indent=2, как пишет приложение) против бинарного снапшота.
+
+    python -m bench.bench_snapshot [rows]      # 10M: python -m bench.bench_snapshot 10000000
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bench.bench_frame import make_rows
+from core.snapshot import Snapshot, write
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(n: int = 1_000_000):
+    data = {"users": [], "accounts": [], "categories": [], "transactions": make_rows(n), "budgets": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "seed.json")
+        snap_path = os.path.join(tmp, "seed.fmsnap")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        _, write_time = timed(write, snap_path, data)
+        del data
+
+        def load_json():
+            with open(json_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        loaded, json_time = timed(load_json)
+        del loaded
+        snap, open_time = timed(Snapshot, snap_path)
+        total, first_sum = timed(lambda: int(snap.column("transactions", "amount").sum()))
+        frame, frame_time = timed(snap.frame)
+        _, report_time = timed(frame.income_expense, "cat")
+        rows, rows_time = timed(snap.rows, "transactions")
+        assert len(rows) == n and np.isclose(total / snap.scale, sum(r["amount"] for r in rows))
+        del rows, frame
+        snap.close()
+
+        print(f"rows={n}")
+        print(f"размер: json {os.path.getsize(json_path) / 2**20:8.1f} MB, "
+              f"fmsnap {os.path.getsize(snap_path) / 2**20:8.1f} MB (запись {write_time:.2f} s)")
+        print(f"json.load                       {json_time * 1000:9.1f} ms")
+        print(f"Snapshot() — открытие через mmap {open_time * 1000:8.3f} ms")
+        print(f"  сумма колонки amount           {first_sum * 1000:9.1f} ms")
+        print(f"  TransactionFrame из колонок    {frame_time * 1000:9.1f} ms")
+        print(f"  отчёт по категориям            {report_time * 1000:9.1f} ms")
+        print(f"  все строки в словари           {rows_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,178 @@
+"""
+Набор бенчмарков горячих путей с сохранением результатов и сравнением с базой.
+
+Запускается через pytest (test/test_benchmarks.py) только при FM_BENCH=1:
+
+    FM_BENCH=1 FM_BENCH_SIZES=10000,1000000 python -m pytest -q test/test_benchmarks.py
+
+    FM_BENCH_SIZES      размеры данных через запятую (по умолчанию 10000); база записана
+                        для 10000 и 1000000, прочие размеры (10000000) сравнивать не с чем
+    FM_BENCH_OUT        куда записать результаты (bench/results.json)
+    FM_BENCH_TOLERANCE  во сколько раз можно быть медленнее базы (1.5)
+    FM_BENCH_UPDATE=1   записать результаты как новую базу (bench/baselines.json)
+
+Данные — data.generate_seed с фиксированным seed, так что размер N везде один и тот же набор.
+"""
+import json
+import os
+import time
+from typing import Callable, Dict
+
+from app import models
+from app.core import account_balance
+from core import validation
+from core.decode import decode_categories, decode_transactions
+from core.domain import MINOR_UNITS
+from core.forecast import ForecastEngine, _make_hashable, forecast_expenses
+from core.frame import TransactionFrame
+from core.frp import EventBus
+from core.journal import load
+from core.lazy import lazy_top_categories as lazy_top_sketch
+from core.ledger import Ledger
+from core.recursion import flatten_categories, sum_expenses_recursive
+from core.reports import report
+from core.transforms import filter_month, lazy_top_categories, sum_by_category
+from core.views import TRANSACTION_ADDED, MaterializedTotals
+from data.generate_seed import save_seed
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINES = os.path.join(HERE, "baselines.json")
+RESULTS = os.environ.get("FM_BENCH_OUT", os.path.join(HERE, "results.json"))
+TOLERANCE = float(os.environ.get("FM_BENCH_TOLERANCE", "1.5"))
+SLACK = 0.005  # с; меньшие разницы — шум таймера, а не регрессия
+
+
+def sizes() -> list:
+    return [int(s) for s in os.environ.get("FM_BENCH_SIZES", "10000").split(",") if s.strip()]
+
+
+class Dataset:
+    """Сгенерированные данные размера n и производные представления, общие для всех случаев."""
+
+    def __init__(self, directory: str, n: int):
+        self.n = n
+        self.path = os.path.join(directory, f"seed_{n}.json")
+        save_seed([self.path], users=max(5, n // 2000), transactions=n, months=12, seed=42)
+        self.data = load(self.path)
+        self.rows = self.data["transactions"]
+        self.categories = self.data["categories"]
+        self.models = decode_transactions(self.rows)
+        self.category_models = tuple(decode_categories(self.categories))
+        self.acc_id = self.rows[0]["acc_id"]
+        self.cat_id = self.rows[0]["cat_id"]
+        self.user_id = self.rows[0]["user_id"]
+        self.root_id = next(c["id"] for c in self.categories if c["parent_id"] is None)
+
+
+# ---------- случаи: подготовка (вне замера) -> функция без аргументов ----------
+def _validate_pipeline(d: Dataset):
+    accs = tuple(validation.Account(a["id"], a["name"]) for a in d.data["accounts"])
+    cats = tuple(validation.Category(c["id"], c["name"]) for c in d.categories)
+    budgets = tuple(validation.Budget(b["cat_id"], b["limit"]) for b in d.data["budgets"])
+    trans = tuple(validation.Transaction(t["acc_id"], t["cat_id"], t["amount"]) for t in d.rows)
+    return lambda: validation.validate_pipeline(trans[-1], accs, cats, budgets, trans[:-1])
+
+
+def _validate_many(d: Dataset):
+    accs = [validation.Account(a["id"], a["name"]) for a in d.data["accounts"]]
+    cats = [validation.Category(c["id"], c["name"]) for c in d.categories]
+    budgets = [validation.Budget(b["cat_id"], b["limit"]) for b in d.data["budgets"]]
+    trans = [validation.Transaction(t["acc_id"], t["cat_id"], t["amount"]) for t in d.rows]
+    return lambda: validation.Validator.from_models(accs, cats, budgets).validate_many(trans)
+
+
+def _forecast(d: Dataset):
+    # холодный прогноз: ряды по категориям строятся заново на каждом прогоне
+    return lambda: ForecastEngine(d.rows).forecast(d.cat_id, 3)
+
+
+def _forecast_expenses(d: Dataset):
+    hashable = _make_hashable(d.rows)
+    return lambda: forecast_expenses(d.cat_id, hashable, 3)
+
+
+def _publish(d: Dataset):
+    def run():
+        bus = EventBus()
+        MaterializedTotals().subscribe(bus)
+        for t in d.rows:
+            bus.publish(TRANSACTION_ADDED, {"transaction": t})
+    return run
+
+
+def _total_balance(d: Dataset):
+    trans = models.dicts_to_transactions(d.rows)
+    accounts = models.dicts_to_accounts(d.data["accounts"])
+    return lambda: models.total_balance(trans, accounts)
+
+
+def _total_balance_frame(d: Dataset):
+    frame = TransactionFrame.from_dicts(d.rows, MINOR_UNITS)
+    return lambda: sum(frame.group_sum("acc").values())
+
+
+def _filter_month_ledger(d: Dataset):
+    ledger = Ledger(d.rows)
+    return lambda: filter_month(ledger, "2025-06")
+
+
+def _report_frame(d: Dataset):
+    frame = TransactionFrame.from_dicts(d.rows, MINOR_UNITS)
+    return lambda: report(frame, d.categories, d.data["budgets"], user_id=d.user_id)
+
+
+CASES: Dict[str, Callable[[Dataset], Callable]] = {
+    # load_seed / dicts_to_transactions / total_balance — те же функции, что у страниц (app.models)
+    "load_seed": lambda d: lambda: models.load_seed(d.path),
+    "dicts_to_transactions": lambda d: lambda: models.dicts_to_transactions(d.rows),
+    "decode_transactions": lambda d: lambda: decode_transactions(d.rows),
+    "account_balance": lambda d: lambda: account_balance(tuple(d.rows), d.acc_id),
+    "total_balance": _total_balance,
+    "total_balance_frame": _total_balance_frame,
+    "filter_month": lambda d: lambda: filter_month(d.rows, "2025-06"),
+    "filter_month_ledger": _filter_month_ledger,
+    "sum_by_category": lambda d: lambda: sum_by_category(d.rows, d.cat_id),
+    "lazy_top_categories": lambda d: lambda: list(lazy_top_categories(iter(d.models), d.category_models, 5)),
+    "lazy_top_categories_sketch": lambda d: lambda: list(lazy_top_sketch(iter(d.models), d.category_models, 5)),
+    "flatten_categories": lambda d: lambda: flatten_categories(d.categories),
+    "sum_expenses_recursive": lambda d: lambda: sum_expenses_recursive(d.categories, d.rows, d.root_id),
+    "validate_pipeline": _validate_pipeline,
+    "validate_many": _validate_many,
+    "forecast_engine": _forecast,
+    "forecast_expenses": _forecast_expenses,
+    "eventbus_publish": _publish,
+    "reports_aggregation": lambda d: lambda: report(d.rows, d.categories, d.data["budgets"], user_id=d.user_id),
+    "reports_aggregation_frame": _report_frame,
+}
+
+
+def measure(func: Callable, n: int) -> float:
+    """Лучшее время из нескольких прогонов; на больших данных прогонов меньше."""
+    repeat = 5 if n <= 100_000 else 2
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def key(case: str, n: int) -> str:
+    return f"{case}@{n}"
+
+
+def read_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path: str, values: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(values.items())), f, indent=2)
+        f.write("\n")
+
+
+def regression(elapsed: float, baseline) -> bool:
+    return baseline is not None and elapsed > baseline * TOLERANCE and elapsed - baseline > SLACK
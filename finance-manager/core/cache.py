@@ -0,0 +1,47 @@
+from typing import Callable, Hashable
+
+# ================== Кэш производных данных по версии данных ==================
+#
+# DerivedCache хранит монотонно растущую версию данных: каждая запись
+# (put / delete / импорт) вызывает bump(scope) и увеличивает её на 1.
+# Для каждой области (обычно user_id) запоминается версия последней записи,
+# которая её затронула. Артефакт (отчёт, таблица, график) кэшируется под
+# (область, имя) вместе с версией, на которой он построен, и считается
+# актуальным, пока в его область не было записей. Так запись в данные одного
+# пользователя не сбрасывает отчёты другого, а переключение вкладок и
+# пользователей ничего не пересчитывает.
+
+ALL = object()  # область «все данные» — сбрасывает всё (полная перезагрузка, сброс)
+
+
+class DerivedCache:
+    def __init__(self):
+        self.version = 0
+        self._written = {}   # область -> версия последней записи
+        self._entries = {}   # (область, имя) -> (версия, значение)
+        self.hits = 0
+        self.misses = 0
+
+    def bump(self, *scopes: Hashable) -> int:
+        """Новая версия данных; без аргументов — затронуто всё."""
+        self.version += 1
+        for scope in scopes or (ALL,):
+            self._written[scope] = self.version
+        return self.version
+
+    def stamp(self, scope: Hashable) -> int:
+        """Версия последней записи, влияющей на область."""
+        return max(self._written.get(scope, 0), self._written.get(ALL, 0))
+
+    def get(self, scope: Hashable, name: str, build: Callable[[], object]):
+        entry = self._entries.get((scope, name))
+        if entry is not None and entry[0] >= self.stamp(scope):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = build()
+        self._entries[(scope, name)] = (self.version, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
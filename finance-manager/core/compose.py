@@ -1,12 +1,16 @@
-from functools import reduce
 from typing import Callable
 
 def compose(*funcs: Callable):
     """Составление функций справа налево: compose(f, g)(x) = f(g(x))"""
+    order = funcs[::-1]  # разворачиваем один раз, а не на каждом вызове
     def composed(x):
-        return reduce(lambda acc, f: f(acc), reversed(funcs), x)
+        for f in order:
+            x = f(x)
+        return x
     return composed
 
 def pipe(x, *funcs: Callable):
     """Пропуск значения через функции слева направо: pipe(x, f, g) = g(f(x))"""
-    return reduce(lambda acc, f: f(acc), funcs, x)
+    for f in funcs:
+        x = f(x)
+    return x
@@ -0,0 +1,247 @@
+from concurrent.futures import Executor
+from typing import Iterable, Optional
+
+import numpy as np
+
+from core.decode import paused_gc
+from core.domain import MINOR_UNITS
+from core.frame import TransactionFrame
+from core.frp import EventBus
+from core.recursion import CategoryTree
+from core.views import TRANSACTION_ADDED, TRANSACTION_DELETED, TRANSACTION_EDITED
+
+# ================== OLAP-куб: пользователь × счёт × категория × месяц ==================
+#
+# Ячейка куба — (user_id, acc_id, cat_id, месяц) -> [доход, расход, число
+# доходов, число расходов], суммы целыми в минимальных единицах (как в
+# core.views). Ячеек на порядки меньше, чем транзакций: отчёт за годы истории
+# читает тысячи ячеек, а не миллионы строк.
+#   dice / slice  — подкуб по условиям {измерение: значение или набор значений};
+#                   кандидаты берутся из самого короткого индекса измерения
+#   rollup(by)    — свёртка по остальным измерениям, {ключ by: итоги}
+#   rollup_tree   — итоги по категориям вместе с поддеревом (CategoryTree)
+# Куб обновляется за O(1) на событие EventBus (добавление / правка / удаление).
+# Полная пересборка агрегирует куски транзакций в частичные кубы и сливает их;
+# с переданным Executor куски считаются параллельно. build — по словарям,
+# from_frame — векторно по TransactionFrame (одна сортировка составного кода
+# ячейки); куски фрейма — массивы NumPy, поэтому их дёшево отдавать и в
+# ProcessPoolExecutor, и в ThreadPoolExecutor (NumPy отпускает GIL).
+
+DIMENSIONS = ("user_id", "acc_id", "cat_id", "month")
+
+
+def aggregate(transactions: Iterable[dict]) -> dict:
+    """{ключ ячейки: [доход, расход, n доходов, n расходов]} — частичный куб куска транзакций."""
+    cells = {}
+    with paused_gc():  # новые ячейки — контейнеры: без паузы GC обходит кучу снова и снова
+        for t in transactions:
+            ts = t.get("date") or t.get("ts")
+            key = (
+                t.get("user_id"), t.get("acc_id", t.get("account_id")), t.get("cat_id"),
+                ts[:7] if ts else t.get("month"),
+            )
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = [0, 0, 0, 0]
+            amount = round(t["amount"] * MINOR_UNITS)
+            if amount > 0:
+                cell[0] += amount
+                cell[2] += 1
+            else:
+                cell[1] -= amount
+                cell[3] += 1
+    return cells
+
+
+def aggregate_frame(frame: TransactionFrame) -> dict:
+    """То же для TransactionFrame; месяц — по дате (строки без даты -> месяц None)."""
+    if not len(frame):
+        return {}
+    month = frame.date.astype("datetime64[M]")
+    months, month_code = np.unique(month, return_inverse=True)
+    sizes = (len(frame.acc_ids), len(frame.cat_ids), len(months))
+    code = ((frame.user.astype(np.int64) * sizes[0] + frame.acc) * sizes[1] + frame.cat) * sizes[2] + month_code
+    order = np.argsort(code, kind="stable")
+    code = code[order]
+    starts = np.flatnonzero(np.r_[True, code[1:] != code[:-1]])
+    amount = frame.amount[order]
+    if frame.scale != MINOR_UNITS:
+        amount = np.rint(amount * (MINOR_UNITS / frame.scale)).astype(np.int64)
+    positive = amount > 0
+    income = np.add.reduceat(np.where(positive, amount, 0), starts).tolist()
+    expense = (-np.add.reduceat(np.where(positive, 0, amount), starts)).tolist()
+    n_income = np.add.reduceat(positive.astype(np.int64), starts).tolist()
+    n_total = np.diff(np.r_[starts, len(code)]).tolist()
+    rest, m = np.divmod(code[starts], sizes[2])
+    rest, c = np.divmod(rest, sizes[1])
+    u, a = np.divmod(rest, sizes[0])
+    labels = [None if np.isnat(v) else str(v) for v in months]
+    keys = zip(
+        [frame.user_ids[i] for i in u.tolist()], [frame.acc_ids[i] for i in a.tolist()],
+        [frame.cat_ids[i] for i in c.tolist()], [labels[i] for i in m.tolist()],
+    )
+    with paused_gc():
+        return {
+            key: [income[i], expense[i], n_income[i], n_total[i] - n_income[i]]
+            for i, key in enumerate(keys)
+        }
+
+
+def _totals(cell) -> dict:
+    income, expense, n_income, n_expense = cell
+    return {"income": income / MINOR_UNITS, "expense": expense / MINOR_UNITS, "n_income": n_income, "n_expense": n_expense}
+
+
+def _matcher(value):
+    """Условие на измерение: одно значение или набор (list / tuple / set)."""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(value)
+    return frozenset((value,))
+
+
+class Cube:
+    def __init__(self, transactions: Iterable[dict] = ()):
+        self._cells = aggregate(transactions)
+        self._index = None  # по измерению: значение -> множество ключей; строится при первом dice
+
+    @classmethod
+    def build(cls, transactions: Iterable[dict], executor: Optional[Executor] = None, chunk: int = 100_000) -> "Cube":
+        """Полная пересборка; с executor — кусками около chunk строк (по пользователям) параллельно."""
+        if executor is None:
+            return cls(transactions)
+        rows = transactions if isinstance(transactions, list) else list(transactions)
+        pieces = [[] for _ in range(max(1, -(-len(rows) // chunk)))]
+        for t in rows:
+            pieces[hash(t.get("user_id")) % len(pieces)].append(t)
+        return cls._from_parts(executor.map(aggregate, pieces))
+
+    @classmethod
+    def from_frame(cls, frame: TransactionFrame, executor: Optional[Executor] = None, chunk: int = 250_000) -> "Cube":
+        """Векторная пересборка по TransactionFrame; с executor — кусками по chunk строк параллельно."""
+        if executor is None:
+            return cls._from_parts([aggregate_frame(frame)])
+        parts = max(1, -(-len(frame) // chunk))
+        return cls._from_parts(executor.map(aggregate_frame, [frame.filter(frame.user % parts == i) for i in range(parts)]))
+
+    @classmethod
+    def _from_parts(cls, parts: Iterable[dict]) -> "Cube":
+        # куски разбиты по пользователю: ячейки частичных кубов не пересекаются
+        cube = cls()
+        for part in parts:
+            cube._cells.update(part)
+        return cube
+
+    def __len__(self):
+        return len(self._cells)
+
+    # ---------- обновление ----------
+    def _merge(self, cells: dict, sign: int = 1):
+        own, index = self._cells, self._index
+        for key, delta in cells.items():
+            cell = own.get(key)
+            if cell is None:
+                own[key] = [sign * v for v in delta]
+                if index is not None:
+                    for values, value in zip(index, key):
+                        values.setdefault(value, set()).add(key)
+                continue
+            for i in range(4):
+                cell[i] += sign * delta[i]
+            if cell[2] == cell[3] == 0:
+                del own[key]
+                if index is not None:
+                    for values, value in zip(index, key):
+                        keys = values[value]
+                        keys.discard(key)
+                        if not keys:
+                            del values[value]
+
+    def _indexes(self) -> tuple:
+        if self._index is None:
+            index = tuple({} for _ in DIMENSIONS)
+            for key in self._cells:
+                for values, value in zip(index, key):
+                    keys = values.get(value)
+                    if keys is None:
+                        values[value] = {key}
+                    else:
+                        keys.add(key)
+            self._index = index
+        return self._index
+
+    def _apply(self, t: dict, sign: int):
+        self._merge(aggregate((t,)), sign)
+
+    def on_added(self, event, payload: dict):
+        self._apply(payload["transaction"], 1)
+
+    def on_deleted(self, event, payload: dict):
+        self._apply(payload["transaction"], -1)
+
+    def on_edited(self, event, payload: dict):
+        self._apply(payload["old"], -1)
+        self._apply(payload["new"], 1)
+
+    def subscribe(self, bus: EventBus) -> "Cube":
+        bus.subscribe(TRANSACTION_ADDED, self.on_added)
+        bus.subscribe(TRANSACTION_EDITED, self.on_edited)
+        bus.subscribe(TRANSACTION_DELETED, self.on_deleted)
+        return self
+
+    # ---------- запросы ----------
+    def _keys(self, where: Optional[dict]):
+        if not where:
+            return self._cells.keys()
+        conditions = []
+        for dim, value in where.items():
+            if dim not in DIMENSIONS:
+                raise ValueError(f"unknown cube dimension: {dim!r}")
+            conditions.append((DIMENSIONS.index(dim), _matcher(value)))
+        # кандидаты — из самого узкого условия, остальные проверяются по ключу
+        index = self._indexes()
+        candidates = min(
+            ([k for v in values for k in index[pos].get(v, ())] for pos, values in conditions),
+            key=len,
+        )
+        return [k for k in candidates if all(k[pos] in values for pos, values in conditions)]
+
+    def dice(self, where: dict) -> "Cube":
+        """Подкуб по условиям {измерение: значение или набор значений}."""
+        sub = Cube()
+        sub._merge({k: self._cells[k] for k in self._keys(where)})
+        return sub
+
+    def slice(self, dim: str, value) -> "Cube":
+        return self.dice({dim: value})
+
+    def _rollup(self, by: tuple, where: Optional[dict]) -> dict:
+        for dim in by:
+            if dim not in DIMENSIONS:
+                raise ValueError(f"unknown cube dimension: {dim!r}")
+        positions = [DIMENSIONS.index(dim) for dim in by]
+        groups = {}
+        for key in self._keys(where):
+            group = key[positions[0]] if len(positions) == 1 else tuple(key[p] for p in positions)
+            acc = groups.get(group)
+            if acc is None:
+                acc = groups[group] = [0, 0, 0, 0]
+            cell = self._cells[key]
+            for i in range(4):
+                acc[i] += cell[i]
+        return groups
+
+    def rollup(self, by: Iterable[str] = (), where: Optional[dict] = None) -> dict:
+        """
+        {значения измерений by: итоги} со свёрткой по остальным измерениям.
+        Один элемент в by — ключи-значения, несколько — кортежи; итоги — income / expense / n_income / n_expense.
+        """
+        return {group: _totals(acc) for group, acc in self._rollup(tuple(by), where).items()}
+
+    def totals(self, where: Optional[dict] = None) -> dict:
+        return self.rollup((), where).get((), _totals((0, 0, 0, 0)))
+
+    def rollup_tree(self, tree: CategoryTree, where: Optional[dict] = None) -> dict:
+        """{cat_id: итоги категории вместе со всеми подкатегориями} по дереву категорий."""
+        own = self._rollup(("cat_id",), where)
+        rolled = [tree.accumulate({cat_id: cell[i] for cat_id, cell in own.items()}) for i in range(4)]
+        return {cat_id: _totals([measure[cat_id] for measure in rolled]) for cat_id in tree.order}
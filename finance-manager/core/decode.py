@@ -0,0 +1,113 @@
+import gc
+from contextlib import contextmanager
+from dataclasses import fields
+from typing import Iterable
+
+from core.domain import MINOR_UNITS, Account, Budget, Category, Transaction
+
+# ================== Быстрый декодер seed.json -> модели core.domain ==================
+#
+# Модели объявлены со __slots__ (без __dict__ у каждого экземпляра).
+# Декодер не вызывает сгенерированный __init__ frozen-dataclass (он идёт через
+# object.__setattr__ на каждое поле): экземпляр создаётся object.__new__,
+# поля пишутся напрямую дескрипторами слотов в одном плотном цикле.
+# Суммы переводятся в целые минимальные единицы (тиыны/копейки): 12.5 -> 1250.
+# На время цикла сборщик мусора выключен: миллион новых объектов иначе
+# запускает десятки бесполезных проходов по поколениям.
+
+
+def to_minor(amount, scale: int = MINOR_UNITS) -> int:
+    """Сумма в основных единицах -> целые минимальные единицы."""
+    return round(amount * scale)
+
+
+def from_minor(amount: int, scale: int = MINOR_UNITS) -> float:
+    return amount / scale
+
+
+@contextmanager
+def paused_gc():
+    """Выключает сборщик мусора на время массового создания объектов."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _setters(cls) -> tuple:
+    """Дескрипторы слотов в порядке полей dataclass."""
+    return tuple(cls.__dict__[f.name].__set__ for f in fields(cls))
+
+
+def decode_rows(cls, rows: Iterable[dict], spec: tuple) -> list:
+    """
+    Общий декодер: spec — по одному (ключ, значение по умолчанию, преобразование или None)
+    на каждое поле cls в порядке объявления. cls должен быть со __slots__.
+    """
+    new = object.__new__
+    plan = tuple(zip(_setters(cls), spec))
+    out = []
+    append = out.append
+    with paused_gc():
+        for row in rows:
+            obj = new(cls)
+            get = row.get
+            for setter, (key, default, convert) in plan:
+                value = get(key, default)
+                setter(obj, value if convert is None or value is None else convert(value))
+            append(obj)
+    return out
+
+
+def decode_transactions(rows: Iterable[dict], scale: int = MINOR_UNITS) -> list:
+    """Словари seed.json -> Transaction с amount в минимальных единицах."""
+    new = object.__new__
+    s_id, s_acc, s_cat, s_amount, s_ts, s_note = _setters(Transaction)
+    out = []
+    append = out.append
+    with paused_gc():
+        for row in rows:
+            get = row.get
+            t = new(Transaction)
+            s_id(t, row["id"])
+            s_acc(t, row["acc_id"])
+            s_cat(t, row["cat_id"])
+            s_amount(t, round(row["amount"] * scale))
+            s_ts(t, get("date") or "")
+            s_note(t, get("note"))
+            append(t)
+    return out
+
+
+def decode_accounts(rows: Iterable[dict], scale: int = MINOR_UNITS) -> list:
+    return decode_rows(Account, rows, (
+        ("id", None, None), ("name", "", None),
+        ("balance", 0, lambda v: round(v * scale)), ("currency", "KZT", None),
+    ))
+
+
+def decode_categories(rows: Iterable[dict]) -> list:
+    return decode_rows(Category, rows, (
+        ("id", None, None), ("name", "", None), ("parent_id", None, None), ("type", None, None),
+    ))
+
+
+def decode_budgets(rows: Iterable[dict], scale: int = MINOR_UNITS) -> list:
+    return decode_rows(Budget, rows, (
+        ("id", None, None), ("cat_id", None, None),
+        ("limit", 0, lambda v: round(v * scale)), ("period", "month", None),
+    ))
+
+
+def decode_seed(data: dict, scale: int = MINOR_UNITS) -> dict:
+    """Весь разобранный seed -> {таблица: кортеж моделей}; users остаются словарями."""
+    return {
+        "users": tuple(data.get("users", [])),
+        "accounts": tuple(decode_accounts(data.get("accounts", []), scale)),
+        "categories": tuple(decode_categories(data.get("categories", []))),
+        "transactions": tuple(decode_transactions(data.get("transactions", []), scale)),
+        "budgets": tuple(decode_budgets(data.get("budgets", []), scale)),
+    }
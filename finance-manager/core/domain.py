@@ -1,21 +1,25 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass(frozen=True)
+# Суммы в минимальных единицах (тиыны/копейки): целое amount * MINOR_UNITS.
+# Единственный масштаб для views, reports, cube, decode, snapshot, storage и генератора данных.
+MINOR_UNITS = 100
+
+@dataclass(frozen=True, slots=True)
 class Account:
     id: str
     name: str
     balance: int  # начальный баланс, целое (например в тенге)
     currency: str  # "KZT"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Category:
     id: str
     name: str
     parent_id: Optional[str]  # None если корневая
     type: str  # "income" или "expense"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Transaction:
     id: str
     account_id: str
@@ -24,14 +28,14 @@ class Transaction:
     ts: str        # ISO-like: "YYYY-MM-DD"
     note: Optional[str] = None
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Budget:
     id: str
     cat_id: str
     limit: int     # лимит (целое)
     period: str    # "month" или "week"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Event:
     id: str
     ts: str
@@ -1,22 +1,47 @@
 from datetime import datetime
+from functools import lru_cache
+
+# Различных дат в данных немного (дни), а предикат вызывается на каждую
+# транзакцию: каждая строка даты разбирается один раз.
+_parse_date = lru_cache(maxsize=8192)(datetime.fromisoformat)
+
+
+class Filter:
+    """
+    Предикат по одному полю: вызывается как обычное замыкание (filter, iter_transactions),
+    а поле и параметры (field, args) читает планировщик core.query.
+    """
+    __slots__ = ("field", "args", "fn")
+
+    def __init__(self, field: str, args: tuple, fn):
+        self.field = field
+        self.args = args
+        self.fn = fn
+
+    def __call__(self, t):
+        return self.fn(t)
+
+    def __repr__(self):
+        return f"{self.field}{self.args!r}"
 
 def by_category(cat_id: str):
     def f(t):
         return t["cat_id"] == cat_id
-    return f
+    return Filter("cat_id", (cat_id,), f)
 
 def by_date_range(start: str, end: str):
-    s = datetime.fromisoformat(start)
-    e = datetime.fromisoformat(end)
+    s = _parse_date(start)
+    e = _parse_date(end)
     def f(t):
-        d = datetime.fromisoformat(t["date"])
+        d = _parse_date(t["date"])
         return s <= d <= e
-    return f
+    return Filter("date", (start, end), f)
 
 def by_amount_range(min_amt: int, max_amt: int):
     def f(t):
         return min_amt <= abs(t["amount"]) <= max_amt
-    return f
+    return Filter("amount", (min_amt, max_amt), f)
+
 from core.maybe_either import Just, Nothing
 
 def safe_category(cats, cat_id):
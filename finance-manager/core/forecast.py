@@ -1,18 +1,252 @@
-from functools import lru_cache
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass
+from datetime import date
 from statistics import mean
+from typing import Iterable, Optional
 import time
 
+from core.views import TRANSACTION_ADDED, TRANSACTION_EDITED, TRANSACTION_DELETED
+
 def _make_hashable(transactions):
     return tuple(tuple(sorted(t.items())) for t in transactions)
 
-@lru_cache
+# Совместимая обёртка над ForecastEngine без состояния: один проход по истории
+# на вызов. Чтобы спрашивать по многим категориям и периодам одну историю,
+# держите ForecastEngine (кэш — внутри экземпляра); для живых данных —
+# с подпиской на EventBus.
 def forecast_expenses(cat_id: str, transactions_hashable: tuple, period: int) -> int:
-    transactions = [dict(t) for t in transactions_hashable]
-    amounts = [abs(t["amount"]) for t in transactions if t["cat_id"] == cat_id and t["amount"] < 0]
-    if not amounts:
-        return 0
-    n = min(len(amounts), period)
-    return int(mean(amounts[-n:]))
+    return ForecastEngine(dict(t) for t in transactions_hashable).forecast(cat_id, period)
+
+
+class ForecastEngine:
+    """
+    Прогноз расходов по категориям без хэширования истории.
+    Ряды расходов по категориям строятся один раз (один проход по транзакциям)
+    и дописываются при записи. Кэш — ограниченный LRU с ключом
+    (cat_id, period, поколение категории); запись в категорию увеличивает её
+    поколение, поэтому старые значения больше не находятся и вытесняются.
+    """
+
+    def __init__(self, transactions=(), maxsize: int = 256):
+        self.maxsize = maxsize
+        self.version = 0
+        self._series = {}       # cat_id -> [(id, |amount|), ...] в порядке поступления
+        self._generation = {}   # cat_id -> номер версии последней записи
+        self._cache = OrderedDict()
+        self.hits = self.misses = 0
+        for t in transactions:
+            if t["amount"] < 0:
+                self._series.setdefault(t["cat_id"], []).append((t.get("id"), -t["amount"]))
+
+    def _touch(self, cat_id):
+        self.version += 1
+        self._generation[cat_id] = self.version
+
+    def add(self, t: dict):
+        if t["amount"] < 0:
+            self._series.setdefault(t["cat_id"], []).append((t.get("id"), -t["amount"]))
+            self._touch(t["cat_id"])
+
+    def _find(self, t: dict):
+        series = self._series.get(t["cat_id"], [])
+        for i in range(len(series) - 1, -1, -1):
+            if series[i][0] == t.get("id"):
+                return series, i
+        return series, None
+
+    def remove(self, t: dict):
+        series, i = self._find(t)
+        if i is not None:
+            del series[i]
+            self._touch(t["cat_id"])
+
+    def replace(self, old: dict, new: dict):
+        """Правка на месте сохраняет позицию транзакции в ряду."""
+        series, i = self._find(old)
+        if i is not None and new["cat_id"] == old["cat_id"] and new["amount"] < 0:
+            series[i] = (new.get("id"), -new["amount"])
+            self._touch(new["cat_id"])
+        else:
+            self.remove(old)
+            self.add(new)
+
+    def forecast(self, cat_id, period: int) -> int:
+        key = (cat_id, period, self._generation.get(cat_id, 0))
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        self.misses += 1
+        series = self._series.get(cat_id)
+        result = int(mean(a for _, a in series[-period:])) if series else 0
+        self._cache[key] = result
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return result
+
+    def forecast_all(self, period: int) -> dict:
+        """Прогноз для всех категорий с расходами: один проход по готовым рядам."""
+        return {cat_id: self.forecast(cat_id, period) for cat_id in self._series if self._series[cat_id]}
+
+    # ---- Подписчики EventBus (см. core.views) ----
+    def on_added(self, event, payload: dict):
+        self.add(payload["transaction"])
+
+    def on_deleted(self, event, payload: dict):
+        self.remove(payload["transaction"])
+
+    def on_edited(self, event, payload: dict):
+        self.replace(payload["old"], payload["new"])
+
+    def subscribe(self, bus) -> "ForecastEngine":
+        bus.subscribe(TRANSACTION_ADDED, self.on_added)
+        bus.subscribe(TRANSACTION_EDITED, self.on_edited)
+        bus.subscribe(TRANSACTION_DELETED, self.on_deleted)
+        return self
+
+
+# ================== Пакетный прогноз по всем категориям ==================
+
+class RollingMean:
+    """Среднее последних period значений; добавление O(1)."""
+
+    def __init__(self, period: int):
+        self.window = deque(maxlen=period or None)
+
+    def update(self, x):
+        self.window.append(x)
+
+    def value(self):
+        return mean(self.window) if self.window else 0
+
+
+class EWMA:
+    """Экспоненциальное сглаживание: s = alpha * x + (1 - alpha) * s."""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.level = None
+
+    def update(self, x):
+        self.level = x if self.level is None else self.alpha * x + (1 - self.alpha) * self.level
+
+    def value(self):
+        return self.level or 0
+
+
+class Holt:
+    """Модель Хольта (уровень + тренд); прогноз на один шаг вперёд, не ниже нуля."""
+
+    def __init__(self, alpha: float = 0.3, beta: float = 0.1):
+        self.alpha = alpha
+        self.beta = beta
+        self.level = None
+        self.trend = 0.0
+
+    def update(self, x):
+        if self.level is None:
+            self.level = x
+            return
+        prev = self.level
+        self.level = self.alpha * x + (1 - self.alpha) * (prev + self.trend)
+        self.trend = self.beta * (self.level - prev) + (1 - self.beta) * self.trend
+
+    def value(self):
+        return max(self.level + self.trend, 0) if self.level is not None else 0
+
+
+MODELS = {
+    "mean": lambda period, alpha, beta: RollingMean(period),
+    "ewma": lambda period, alpha, beta: EWMA(alpha),
+    "holt": lambda period, alpha, beta: Holt(alpha, beta),
+}
+
+
+@dataclass(frozen=True)
+class ForecastRow:
+    cat_id: str
+    forecast: int       # прогноз по самой категории
+    rollup: int         # прогноз по категории вместе с подкатегориями
+    observations: int   # число точек ряда категории (транзакций или периодов)
+
+
+def _bucket_index(ts: str, bucket: str) -> int:
+    """Порядковый номер дня или месяца — соседние периоды отличаются на 1."""
+    if bucket == "day":
+        return date.fromisoformat(ts[:10]).toordinal()
+    return int(ts[:4]) * 12 + int(ts[5:7]) - 1
+
+
+def _ancestors(categories) -> dict:
+    """cat_id -> (cat_id, родитель, прародитель, ...)."""
+    parent = {c["id"]: c.get("parent_id") for c in categories}
+    chains = {}
+    for cat_id in parent:
+        chain, seen, node = [], set(), cat_id
+        while node is not None and node not in seen:
+            chain.append(node)
+            seen.add(node)
+            node = parent.get(node)
+        chains[cat_id] = tuple(chain)
+    return chains
+
+
+def forecast_all(
+    transactions: Iterable[dict],
+    period: int,
+    model: str = "mean",
+    categories: Optional[Iterable[dict]] = None,
+    bucket: Optional[str] = None,
+    alpha: float = 0.3,
+    beta: float = 0.1,
+) -> list:
+    """
+    Прогноз расходов для всех категорий за один проход по транзакциям.
+    model: "mean" (скользящее среднее последних period точек), "ewma" или "holt".
+    bucket: None — ряд из отдельных расходов (как forecast_expenses);
+            "day" / "month" — ряд сумм расходов по дням / месяцам (пропуски = 0),
+            дата берётся из поля "date" или "ts".
+    categories: словари с id/parent_id — тогда считаются и свёртки по родителям.
+    Возвращает список ForecastRow в порядке первого появления категории.
+    """
+    make = MODELS[model]
+    chains = _ancestors(categories) if categories is not None else {}
+    own = defaultdict(lambda: make(period, alpha, beta))
+    sub = defaultdict(lambda: make(period, alpha, beta))
+    counts = defaultdict(int)
+    buckets = defaultdict(lambda: defaultdict(int))  # (узел, own|sub) -> {период: сумма}
+
+    for t in transactions:
+        amount = t["amount"]
+        if amount >= 0:
+            continue
+        cat_id = t["cat_id"]
+        chain = chains.get(cat_id, (cat_id,))
+        if bucket is None:
+            counts[cat_id] += 1
+            own[cat_id].update(-amount)
+            for node in chain:
+                sub[node].update(-amount)
+        else:
+            idx = _bucket_index(t.get("date") or t["ts"], bucket)
+            buckets[(cat_id, "own")][idx] += -amount
+            for node in chain:
+                buckets[(node, "sub")][idx] -= amount
+
+    if bucket is not None:
+        for (node, kind), series in buckets.items():
+            target = own if kind == "own" else sub
+            first, last = min(series), max(series)
+            for idx in range(first, last + 1):
+                target[node].update(series.get(idx, 0))
+            if kind == "own":
+                counts[node] = last - first + 1
+
+    return [
+        ForecastRow(cat_id, int(own[cat_id].value()) if cat_id in own else 0, int(sub[cat_id].value()), counts[cat_id])
+        for cat_id in sub
+    ]
+
 
 def measure_time(func, *args):
     start = time.perf_counter()
@@ -0,0 +1,198 @@
+from typing import Iterable
+
+import numpy as np
+
+from core.domain import Transaction
+
+# ================== Колоночное представление транзакций ==================
+#
+# TransactionFrame хранит транзакции параллельными массивами NumPy:
+#   amount  int64           — сумма в минимальных единицах (amount * scale)
+#   cat / acc / user int32  — коды словарного кодирования id
+#   date    datetime64[D]   — дата (NaT, если не задана)
+# Группировки и фильтры выполняются векторно, без прохода Python по строкам.
+
+# Пока сумма модулей меньше 2**53, float64-веса в np.bincount считают точно.
+_EXACT_FLOAT = 2 ** 53
+
+
+def _encode(values: list):
+    """Словарное кодирование: (коды int32, список исходных id по коду)."""
+    index = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int32, count=len(values))
+    return codes, list(index)
+
+
+class TransactionFrame:
+    def __init__(self, amount, cat, acc, user, date, cat_ids, acc_ids, user_ids, scale: int = 1, exact=None, codes=None):
+        self.amount = amount
+        self.cat = cat
+        self.acc = acc
+        self.user = user
+        self.date = date
+        self.cat_ids = cat_ids
+        self.acc_ids = acc_ids
+        self.user_ids = user_ids
+        self.scale = scale
+        # Любая групповая сумма не больше суммы модулей — проверяем один раз.
+        self.exact = bool(np.abs(amount).sum() < _EXACT_FLOAT) if exact is None else exact
+        self._codes = codes if codes is not None else {
+            "cat": {v: i for i, v in enumerate(cat_ids)},
+            "acc": {v: i for i, v in enumerate(acc_ids)},
+            "user": {v: i for i, v in enumerate(user_ids)},
+        }
+
+    # ---------- конструкторы ----------
+    @classmethod
+    def from_columns(cls, amounts, cat_ids, acc_ids, user_ids, dates, scale: int = 1) -> "TransactionFrame":
+        amount = np.asarray(amounts)
+        if amount.dtype.kind in "iu":
+            amount = amount.astype(np.int64) * scale
+        else:
+            amount = np.rint(amount.astype(np.float64) * scale).astype(np.int64)
+        cat, cats = _encode(cat_ids)
+        acc, accs = _encode(acc_ids)
+        user, users = _encode(user_ids)
+        date = np.array([d[:10] if d else "NaT" for d in dates], dtype="datetime64[D]")
+        return cls(amount, cat, acc, user, date, cats, accs, users, scale)
+
+    @classmethod
+    def from_models(cls, trans: Iterable[Transaction], scale: int = 1) -> "TransactionFrame":
+        """Из кортежа core.domain.Transaction (у модели нет user_id — он None)."""
+        trans = list(trans)
+        return cls.from_columns(
+            [t.amount for t in trans],
+            [t.cat_id for t in trans],
+            [t.account_id for t in trans],
+            [None] * len(trans),
+            [t.ts for t in trans],
+            scale,
+        )
+
+    @classmethod
+    def from_dicts(cls, rows: Iterable[dict], scale: int = 1) -> "TransactionFrame":
+        """Из словарей seed.json: acc_id, cat_id, user_id, amount, date/ts."""
+        rows = list(rows)
+        return cls.from_columns(
+            [r.get("amount", 0) for r in rows],
+            [r.get("cat_id") for r in rows],
+            [r.get("acc_id") for r in rows],
+            [r.get("user_id") for r in rows],
+            [r.get("date") or r.get("ts") for r in rows],
+            scale,
+        )
+
+    def __len__(self):
+        return len(self.amount)
+
+    def _out(self, value):
+        value = int(value)
+        return value if self.scale == 1 else value / self.scale
+
+    # ---------- маски ----------
+    def code(self, column: str, value):
+        """Код значения в колонке cat / acc / user; None, если такого id во фрейме нет."""
+        return self._codes[column].get(value)
+
+    def _mask_code(self, column: str, value):
+        code = self.code(column, value)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return getattr(self, column) == code
+
+    def mask_category(self, cat_id):
+        return self._mask_code("cat", cat_id)
+
+    def mask_account(self, acc_id):
+        return self._mask_code("acc", acc_id)
+
+    def mask_user(self, user_id):
+        return self._mask_code("user", user_id)
+
+    def mask_date_range(self, start: str, end: str):
+        return (self.date >= np.datetime64(start[:10], "D")) & (self.date <= np.datetime64(end[:10], "D"))
+
+    def mask_income(self):
+        return self.amount > 0
+
+    def mask_expense(self):
+        return self.amount < 0
+
+    def filter(self, mask) -> "TransactionFrame":
+        """Подмножество строк; словари id (и их обратные индексы) общие с исходным фреймом."""
+        return TransactionFrame(
+            self.amount[mask], self.cat[mask], self.acc[mask], self.user[mask], self.date[mask],
+            self.cat_ids, self.acc_ids, self.user_ids, self.scale, self.exact, self._codes,
+        )
+
+    def to_dicts(self) -> list:
+        """Строки-словари как в seed.json (acc_id, cat_id, user_id, amount, date) — для построчных функций."""
+        amounts = self.amount.tolist() if self.scale == 1 else (self.amount / self.scale).tolist()
+        dates = [None if d is None else d.isoformat() for d in self.date.tolist()]
+        cats = [self.cat_ids[c] for c in self.cat.tolist()]
+        accs = [self.acc_ids[a] for a in self.acc.tolist()]
+        users = [self.user_ids[u] for u in self.user.tolist()]
+        return [
+            {"user_id": u, "acc_id": a, "cat_id": c, "amount": m, "date": d}
+            for u, a, c, m, d in zip(users, accs, cats, amounts, dates)
+        ]
+
+    # ---------- агрегаты ----------
+    def sum(self, mask=None):
+        amount = self.amount if mask is None else self.amount[mask]
+        return self._out(amount.sum())
+
+    def _group_sum(self, codes, amount, size: int):
+        if len(amount) == 0:
+            return np.zeros(size, dtype=np.int64)
+        if self.exact:
+            return np.bincount(codes, weights=amount, minlength=size).astype(np.int64)
+        # Огромные суммы: точное целочисленное сложение через сортировку.
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        totals = np.zeros(size, dtype=np.int64)
+        totals[sorted_codes[starts]] = np.add.reduceat(amount[order], starts)
+        return totals
+
+    def group_sum(self, by: str = "cat", mask=None) -> dict:
+        """{id: сумма} по cat / acc / user; группы без строк не попадают в результат."""
+        codes = getattr(self, by)
+        ids = getattr(self, f"{by}_ids")
+        amount = self.amount
+        if mask is not None:
+            codes, amount = codes[mask], amount[mask]
+        totals = self._group_sum(codes, amount, len(ids))
+        present = np.bincount(codes, minlength=len(ids)) > 0
+        return {ids[i]: self._out(totals[i]) for i in np.flatnonzero(present)}
+
+    def income_expense(self, by: str = "cat", mask=None) -> dict:
+        """
+        {id: {"income": ..., "expense": ...}} векторно.
+        Группы идут в порядке первого появления id во фрейме (коды так и выданы).
+        """
+        codes = getattr(self, by)
+        ids = getattr(self, f"{by}_ids")
+        amount = self.amount
+        if mask is not None:
+            codes, amount = codes[mask], amount[mask]
+        income = self._group_sum(codes, np.maximum(amount, 0), len(ids))
+        expense = income - self._group_sum(codes, amount, len(ids))
+        present = np.bincount(codes, minlength=len(ids)) > 0
+        return {
+            ids[i]: {"income": self._out(income[i]), "expense": self._out(expense[i])}
+            for i in np.flatnonzero(present)
+        }
+
+    def totals(self, mask=None) -> dict:
+        amount = self.amount if mask is None else self.amount[mask]
+        return {
+            "income": self._out(amount[amount > 0].sum()),
+            "expense": self._out(-amount[amount < 0].sum()),
+        }
+
+    def account_balance(self, acc_id):
+        return self.sum(self.mask_account(acc_id))
+
+    def sum_by_category(self, cat_id):
+        return self.sum(self.mask_category(cat_id))
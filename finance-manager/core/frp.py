@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import Executor
 from typing import Callable, Dict, List
 from collections import defaultdict
 from dataclasses import dataclass
@@ -23,21 +25,132 @@ class EventBus:
             results.append(handler(event, payload))
         return results
 
+# ================== Асинхронная шина с очередями по темам ==================
+#
+# AsyncEventBus — для потоков событий (импорт, генератор данных), где
+# синхронный publish на каждое событие упирается в вызовы обработчиков.
+#   - у каждой темы своя ограниченная asyncio.Queue (maxsize): когда
+#     обработчики не успевают, await publish(...) ждёт места — backpressure;
+#   - один воркер на тему забирает события пачками до batch_size и отдаёт
+#     их обработчикам списком (subscribe(..., batch=True)); обычные
+#     обработчики handler(event, payload) по-прежнему вызываются по одному;
+#   - offload=True выполняет обработчик в пуле потоков (executor или пул
+#     цикла по умолчанию), не блокируя цикл событий; корутины ожидаются.
+# Ошибка обработчика не останавливает воркер: она попадает в errors.
+# Синхронный EventBus остаётся как был.
+
+class AsyncEventBus:
+    def __init__(self, maxsize: int = 1024, batch_size: int = 256, executor: Executor = None):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.executor = executor
+        self._subscribers: Dict[str, list] = defaultdict(list)  # тема -> [(handler, batch, offload)]
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self.errors: list = []  # (тема, исключение)
+
+    def subscribe(self, name: str, handler: Callable, batch: bool = False, offload: bool = False):
+        self._subscribers[name].append((handler, batch, offload))
+
+    def _queue(self, name: str) -> asyncio.Queue:
+        queue = self._queues.get(name)
+        if queue is None:
+            queue = self._queues[name] = asyncio.Queue(self.maxsize)
+            self._workers[name] = asyncio.get_running_loop().create_task(self._run(name, queue))
+        return queue
+
+    async def publish(self, name: str, payload: dict):
+        """Ставит событие в очередь темы; ждёт, если очередь заполнена."""
+        if name in self._subscribers:
+            queue = self._queue(name)
+            event = Event(name, datetime.now().isoformat(), payload)
+            if queue.full():
+                await queue.put(event)
+            else:
+                queue.put_nowait(event)
+
+    async def publish_many(self, name: str, payloads):
+        """Пачка событий с общей меткой времени; ждёт только при заполненной очереди."""
+        if name not in self._subscribers:
+            return
+        queue = self._queue(name)
+        ts = datetime.now().isoformat()
+        for payload in payloads:
+            event = Event(name, ts, payload)
+            if queue.full():
+                await queue.put(event)
+            else:
+                queue.put_nowait(event)
+
+    def publish_nowait(self, name: str, payload: dict):
+        """Без ожидания: asyncio.QueueFull, если обработчики отстали на maxsize событий."""
+        if name in self._subscribers:
+            self._queue(name).put_nowait(Event(name, datetime.now().isoformat(), payload))
+
+    async def _call(self, handler: Callable, offload: bool, *args):
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(*args)
+        if offload:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, handler, *args)
+        return handler(*args)
+
+    async def _deliver(self, name: str, events: list):
+        for handler, batch, offload in self._subscribers[name]:
+            if batch:
+                try:
+                    await self._call(handler, offload, events)
+                except Exception as e:
+                    self.errors.append((name, e))
+                continue
+            # ошибка на одном событии не лишает обработчик остальных событий пачки
+            for event in events:
+                try:
+                    await self._call(handler, offload, event, event.payload)
+                except Exception as e:
+                    self.errors.append((name, e))
+
+    async def _run(self, name: str, queue: asyncio.Queue):
+        while True:
+            events = [await queue.get()]
+            while len(events) < self.batch_size and not queue.empty():
+                events.append(queue.get_nowait())
+            try:
+                await self._deliver(name, events)
+            finally:
+                for _ in events:
+                    queue.task_done()
+
+    async def join(self):
+        """Ждёт, пока все поставленные события будут обработаны."""
+        for queue in list(self._queues.values()):
+            await queue.join()
+
+    async def close(self):
+        """Доставляет оставшиеся события и останавливает воркеры."""
+        await self.join()
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._queues.clear()
+        self._workers.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
 # ---- Подписчики ----
 def update_balance(event, state: dict):
     acc_id = event.payload.get("account_id")
     amount = event.payload.get("amount", 0)
-    new_state = state.copy()
-    # Не добавляем payload, только агрегат
-    new_state[acc_id] = new_state.get(acc_id, 0) + amount
-    return {acc_id: new_state[acc_id]}
+    # Не копируем состояние и не добавляем payload — только изменённый агрегат
+    return {acc_id: state.get(acc_id, 0) + amount}
 
 def check_budget(event, state: dict):
     cat_id = event.payload.get("cat_id")
     amount = event.payload.get("amount", 0)
-    new_state = state.copy()
-    new_state[cat_id] = new_state.get(cat_id, 0) + amount
-    return {cat_id: new_state[cat_id]}
+    return {cat_id: state.get(cat_id, 0) + amount}
 
 def create_alert(event, state: dict):
     alerts = state.get("alerts", [])
@@ -0,0 +1,307 @@
+import csv
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+
+from core.domain import Transaction
+from core.maybe_either import Left
+from core.tracing import traced
+from core.validation import Validator
+
+# ================== Потоковый импорт CSV / банковских выписок ==================
+#
+# Конвейер из генераторов, в памяти одновременно только одна пачка:
+#   read_rows  -> parse_rows  -> dedupe  -> chunked  -> validate + commit
+#   (csv)         (Transaction)  (хэш)      (пачки)     (Validator, sink)
+# Хэши для поиска дублей хранятся по датам (SeenHashes): в памяти — только
+# последние DEDUPE_WINDOW дат, остальные восстанавливаются из уже сохранённых
+# строк при следующем обращении, так что память не растёт с размером файла.
+
+DEFAULT_COLUMNS = {
+    "date": "date",
+    "amount": "amount",
+    "category": "category",
+    "account": "account",
+    "note": "note",
+}
+BATCH_SIZE = 1000
+DEDUPE_WINDOW = 62  # дат с хэшами в памяти — пара месяцев выписки
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    errors: list = field(default_factory=list)  # первые MAX_ERRORS ошибок
+
+    MAX_ERRORS = 20
+
+    def reject(self, line: int, error: str):
+        self.rejected += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append(f"line {line}: {error}")
+
+
+def parse_amount(value: str) -> float:
+    """
+    '-1 234,50' / '1.234,50' / '1,234.50' / '−500' -> float.
+    Десятичный разделитель — последний из '.' и ',', другой — разделитель тысяч.
+    Неоднозначные суммы вроде '1,234' (тысячи или дробь?) -> ValueError.
+    """
+    s = value.strip().replace(" ", "").replace(" ", "").replace("−", "-")
+    sign = s[:1] if s[:1] in ("-", "+") else ""
+    s = s[len(sign):]
+    seps = [c for c in ",." if c in s]
+    if not seps:
+        return float(sign + s)
+    if len(seps) == 2:
+        point = max(s.rfind(","), s.rfind("."))
+        whole, frac = s[:point], s[point + 1:]
+        if s[point] in whole:
+            raise ValueError(f"ambiguous amount {value!r}")
+        groups = whole.split("," if s[point] == "." else ".")
+    elif s.count(seps[0]) > 1:  # '1,234,567' — только разделители тысяч
+        groups, frac = s.split(seps[0]), ""
+    else:
+        whole, frac = s.split(seps[0])
+        if len(frac) == 3 and whole.strip("0"):
+            raise ValueError(f"ambiguous amount {value!r}")
+        groups = [whole]
+    if len(groups) > 1 and (not 1 <= len(groups[0]) <= 3 or any(len(g) != 3 for g in groups[1:])):
+        raise ValueError(f"bad digit grouping in amount {value!r}")
+    if not all(g.isdigit() for g in groups + [frac] if g):
+        raise ValueError(f"bad amount {value!r}")
+    return float(f"{sign}{''.join(groups)}.{frac or 0}")
+
+
+def parse_date(value: str) -> str:
+    """
+    '2025-03-01' / '2025-03-01T10:00' / '01.03.2025' -> '2025-03-01'; пустое значение -> ''.
+    Прочие форматы -> ValueError: неверная дата ломает периоды бюджета, Ledger и фрейм.
+    """
+    s = (value or "").strip()
+    if not s:
+        return ""
+    parts = s.split(".")
+    if len(parts) == 3 and len(parts[2]) == 4:  # DD.MM.YYYY
+        return date(int(parts[2]), int(parts[1]), int(parts[0])).isoformat()
+    return datetime.fromisoformat(s).date().isoformat()
+
+
+def read_rows(f: TextIO, delimiter: str = ",") -> Iterator[dict]:
+    """Лениво читает строки CSV как словари по заголовку."""
+    return csv.DictReader(f, delimiter=delimiter)
+
+
+def _resolver(items: Iterable[dict]) -> Callable[[str], Optional[int]]:
+    """Сопоставляет значение колонки с id: по id или по имени (без учёта регистра)."""
+    by_key = {}
+    for item in items:
+        by_key[str(item["id"])] = item["id"]
+        by_key.setdefault(str(item.get("name", "")).strip().lower(), item["id"])
+    return lambda value: by_key.get(str(value).strip().lower()) if value not in (None, "") else None
+
+
+def parse_rows(
+    rows: Iterable[dict],
+    columns: dict,
+    accounts: Iterable[dict],
+    categories: Iterable[dict],
+    account_id=None,
+    category_id=None,
+    result: ImportResult = None,
+) -> Iterator[tuple]:
+    """
+    Колонки CSV -> (номер строки, core.domain.Transaction без id).
+    account_id / category_id — значения по умолчанию, если колонки нет или значение не найдено.
+    """
+    columns = {**DEFAULT_COLUMNS, **columns}
+    find_account = _resolver(accounts)
+    find_category = _resolver(categories)
+    for line, row in enumerate(rows, start=2):  # строка 1 — заголовок
+        try:
+            amount = parse_amount(row[columns["amount"]])
+        except (KeyError, TypeError, ValueError):
+            if result is not None:
+                result.reject(line, f"bad amount {row.get(columns['amount'])!r}")
+            continue
+        acc = find_account(row.get(columns["account"])) or account_id
+        cat = find_category(row.get(columns["category"])) or category_id
+        try:
+            ts = parse_date(row.get(columns["date"]))
+        except ValueError:
+            if result is not None:
+                result.reject(line, f"bad date {row.get(columns['date'])!r}")
+            continue
+        note = (row.get(columns["note"]) or "").strip() or None
+        yield line, Transaction(None, acc, cat, amount, ts, note)
+
+
+def content_hash(t: Transaction) -> bytes:
+    """Хэш содержимого транзакции (без id) — для поиска дублей."""
+    key = f"{t.account_id}|{t.cat_id}|{float(t.amount)!r}|{t.ts}|{t.note or ''}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+
+
+def row_hash(row: dict) -> bytes:
+    return content_hash(Transaction(
+        None, row.get("acc_id"), row.get("cat_id"), row["amount"], row.get("date") or "", row.get("note")
+    ))
+
+
+class SeenHashes:
+    """
+    Хэши транзакций по датам. existing — сохранённые строки пользователя или
+    функция date -> строки на эту дату (запрос к хранилищу). Хэши даты строятся
+    при первом обращении; после сохранения пачки (committed) в памяти остаются
+    только window последних дат, вытесненные читаются заново вместе с уже
+    импортированными строками.
+    """
+
+    def __init__(self, existing=(), window: int = DEDUPE_WINDOW):
+        self.window = window
+        self._hashes = OrderedDict()
+        if callable(existing):
+            self._by_date, self._lookup = None, existing
+        else:
+            # только ссылки на строки, которые и так лежат в хранилище
+            self._by_date = {}
+            for r in existing:
+                self._by_date.setdefault((r.get("date") or "")[:10], []).append(r)
+            self._lookup = lambda date: self._by_date.get(date, ())
+
+    def add(self, t: Transaction) -> bool:
+        """Запоминает хэш транзакции; False — такая уже есть."""
+        hashes = self._hashes.get(t.ts)
+        if hashes is None:
+            hashes = self._hashes[t.ts] = {row_hash(r) for r in self._lookup(t.ts)}
+        else:
+            self._hashes.move_to_end(t.ts)
+        h = content_hash(t)
+        if h in hashes:
+            return False
+        hashes.add(h)
+        return True
+
+    def committed(self, rows: list):
+        """Пачка сохранена: старые даты можно вытеснить, их хэши восстановятся по lookup."""
+        if self._by_date is not None:
+            for r in rows:
+                self._by_date.setdefault((r.get("date") or "")[:10], []).append(r)
+        while len(self._hashes) > self.window:
+            self._hashes.popitem(last=False)
+
+
+def dedupe(items: Iterable[tuple], seen: SeenHashes, result: ImportResult = None) -> Iterator[tuple]:
+    """Пропускает транзакции, чей хэш уже встречался (в базе или раньше в файле)."""
+    for line, t in items:
+        if not seen.add(t):
+            if result is not None:
+                result.duplicates += 1
+            continue
+        yield line, t
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+@traced("importer.import_csv")
+def import_csv(
+    f: TextIO,
+    sink: Callable[[list], None],
+    user_id,
+    accounts: list,
+    categories: list,
+    existing=(),
+    next_id: int = 1,
+    columns: dict = None,
+    account_id=None,
+    category_id=None,
+    delimiter: str = ",",
+    batch_size: int = BATCH_SIZE,
+) -> ImportResult:
+    """
+    Импортирует CSV пачками по batch_size: каждая пачка проверяется Validator-ом
+    (счёт и категория пользователя) и передаётся в sink списком словарей-строк.
+    existing — уже сохранённые транзакции пользователя или функция date -> его
+    транзакции на эту дату (см. SeenHashes), для поиска дублей.
+    """
+    result = ImportResult()
+    seen = SeenHashes(existing)
+    validator = Validator((a["id"] for a in accounts), (c["id"] for c in categories), None)
+    parsed = parse_rows(read_rows(f, delimiter), columns or {}, accounts, categories,
+                        account_id, category_id, result)
+    for batch in chunked(dedupe(parsed, seen, result), batch_size):
+        rows = []
+        for (line, t), checked in zip(batch, validator.validate_many(t for _, t in batch)):
+            if isinstance(checked, Left):
+                result.reject(line, checked.value["error"])
+                continue
+            rows.append({
+                "id": next_id, "user_id": user_id, "acc_id": t.account_id, "cat_id": t.cat_id,
+                "amount": t.amount, "date": t.ts or None, "note": t.note,
+            })
+            next_id += 1
+        if rows:
+            sink(rows)
+            result.imported += len(rows)
+        seen.committed(rows)
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    from core.storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Импорт транзакций из CSV / банковской выписки")
+    parser.add_argument("csv_path")
+    parser.add_argument("--user", type=int, required=True, help="id пользователя")
+    parser.add_argument("--account", type=int, help="счёт по умолчанию")
+    parser.add_argument("--category", type=int, help="категория по умолчанию")
+    parser.add_argument("--backend", default=os.environ.get("FM_STORAGE", "json"), choices=("json", "sqlite"))
+    parser.add_argument("--data", default="data/seed.json")
+    parser.add_argument("--db", default=os.environ.get("FM_DB_FILE", "data/finance.db"))
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    for name in DEFAULT_COLUMNS:
+        parser.add_argument(f"--{name}-col", dest=f"{name}_col", default=DEFAULT_COLUMNS[name])
+    args = parser.parse_args()
+
+    storage = open_storage(args.backend, args.data, args.db)
+    if args.backend == "sqlite":
+        # дубли ищутся запросом по дате, а не по всей истории в памяти
+        existing = lambda date: storage.transactions(user_id=args.user, start=date, end=date)
+    else:
+        existing = storage.transactions(user_id=args.user)
+    with open(args.csv_path, "r", encoding=args.encoding, newline="") as f:
+        summary = import_csv(
+            f,
+            lambda rows: storage.put_many("transactions", rows),
+            args.user,
+            storage.rows("accounts", args.user),
+            storage.rows("categories", args.user),
+            existing=existing,
+            next_id=storage.max_id("transactions") + 1,
+            columns={name: getattr(args, f"{name}_col") for name in DEFAULT_COLUMNS},
+            account_id=args.account,
+            category_id=args.category,
+            delimiter=args.delimiter,
+            batch_size=args.batch_size,
+        )
+    storage.close()
+    print(f"imported={summary.imported} duplicates={summary.duplicates} rejected={summary.rejected}")
+    for error in summary.errors:
+        print(error)
@@ -0,0 +1,123 @@
+from collections import defaultdict
+from typing import Iterable
+
+# ================== Вторичные индексы по таблицам ==================
+#
+# IndexManager держит для каждой таблицы:
+#   первичный индекс        id -> строка
+#   списки вхождений (posting lists) по полям из FIELDS:
+#                           (таблица, поле) -> значение -> {id: строка}
+# Вставка / изменение / удаление обновляют только затронутые списки,
+# поэтому выборка строк одного пользователя стоит O(его строк), а не O(всех).
+# Строки хранятся по ссылке: индекс не копирует словари из session_state.
+# Повторяющиеся id из старых данных не теряются: вторая и следующие строки
+# лежат под ключом (id, n); get и put работают с последней строкой с этим id,
+# delete удаляет все — как JsonStorage, журнал и PersistentRows.
+
+FIELDS = {
+    "users": (),
+    "accounts": ("user_id",),
+    "categories": ("user_id", "parent_id"),
+    "transactions": ("user_id", "acc_id", "cat_id"),
+    "budgets": ("user_id", "cat_id"),
+}
+
+
+class IndexManager:
+    def __init__(self, data: dict = None, fields: dict = FIELDS):
+        self.fields = fields
+        self._rows = {table: {} for table in fields}
+        self._postings = {(table, f): defaultdict(dict) for table, names in fields.items() for f in names}
+        self._dups = {table: defaultdict(int) for table in fields}  # id -> число дублей
+        for table, rows in (data or {}).items():
+            if table in fields:
+                for row in rows:
+                    self._load(table, row)
+
+    # ---------- изменение ----------
+    def _link(self, table: str, slot, row: dict):
+        self._rows[table][slot] = row
+        for f in self.fields[table]:
+            self._postings[(table, f)][row.get(f)][slot] = row
+
+    def _unlink(self, table: str, slot):
+        row = self._rows[table].pop(slot)
+        for f in self.fields[table]:
+            postings = self._postings[(table, f)]
+            bucket = postings[row.get(f)]
+            del bucket[slot]
+            if not bucket:
+                del postings[row.get(f)]
+
+    def _load(self, table: str, row: dict):
+        row_id = row.get("id")
+        if row_id in self._rows[table]:
+            self._dups[table][row_id] += 1
+            self._link(table, (row_id, self._dups[table][row_id]), row)
+        else:
+            self._link(table, row_id, row)
+
+    def _slot(self, table: str, row_id):
+        """Ключ последней строки с этим id: (id, n) у дублей, иначе сам id."""
+        n = self._dups[table].get(row_id, 0)
+        return (row_id, n) if n else row_id
+
+    def put(self, table: str, row: dict):
+        """Вставка или замена (последней) строки по id; списки обновляются только при смене значения поля."""
+        slot = self._slot(table, row.get("id"))
+        old = self._rows[table].get(slot)
+        self._rows[table][slot] = row
+        for f in self.fields[table]:
+            postings = self._postings[(table, f)]
+            if old is not None and old.get(f) != row.get(f):
+                bucket = postings[old.get(f)]
+                bucket.pop(slot, None)
+                if not bucket:
+                    del postings[old.get(f)]
+            # Замена ключа в dict сохраняет позицию строки в списке.
+            postings[row.get(f)][slot] = row
+
+    def put_many(self, table: str, rows: Iterable[dict]):
+        for row in rows:
+            self.put(table, row)
+
+    def delete(self, table: str, row_id):
+        if row_id in self._rows[table]:
+            self._unlink(table, row_id)
+        for n in range(1, self._dups[table].pop(row_id, 0) + 1):
+            self._unlink(table, (row_id, n))
+
+    # ---------- запросы ----------
+    def by_id(self, table: str) -> dict:
+        """Живой словарь id -> строка (не копия; обновляется вместе с индексом; дубли — под (id, n))."""
+        return self._rows[table]
+
+    def get(self, table: str, row_id, default=None):
+        return self._rows[table].get(self._slot(table, row_id), default)
+
+    def _candidates(self, table: str, filters: dict) -> dict:
+        """Самый короткий список вхождений среди индексированных полей фильтра."""
+        best = None
+        for f, value in filters.items():
+            if f in self.fields[table]:
+                bucket = self._postings[(table, f)].get(value, {})
+                if best is None or len(bucket) < len(best):
+                    best = bucket
+        return self._rows[table] if best is None else best
+
+    def query(self, table: str, **filters) -> list:
+        """
+        Строки, у которых все поля равны заданным: query("transactions", user_id=1, cat_id=5).
+        Начинает с самого селективного индекса, остальные условия проверяет по строкам.
+        """
+        candidates = self._candidates(table, filters)
+        if len(filters) <= 1 and candidates is not self._rows[table]:
+            return list(candidates.values())
+        return [r for r in candidates.values() if all(r.get(f) == v for f, v in filters.items())]
+
+    def count(self, table: str, **filters) -> int:
+        if len(filters) == 1:
+            (f, value), = filters.items()
+            if f in self.fields[table]:
+                return len(self._postings[(table, f)].get(value, {}))
+        return len(self.query(table, **filters))
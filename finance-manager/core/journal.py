@@ -0,0 +1,228 @@
+import json
+import os
+import warnings
+from typing import Iterable, Iterator, Optional
+
+from core.tracing import traced
+
+# ================== Журнал изменений поверх снапшота ==================
+#
+# Снапшот — обычный seed.json или бинарный *.fmsnap (core.snapshot).
+# Каждое изменение дописывается одной строкой
+# в файл "<snapshot>.journal" (JSON Lines), поэтому запись одной транзакции
+# стоит O(1) вместо перезаписи всего файла. Журнал сворачивается (compaction)
+# в новый снапшот, когда в нём не меньше COMPACT_EVERY записей и он дорос до
+# размера снапшота: перезапись снапшота окупается, и импорт N строк пачками
+# стоит O(N) записи на диск, а не O(N^2).
+#
+# Формат записи:
+#   {"op": "put", "table": "transactions", "row": {...}}   вставка/замена по id
+#   {"op": "del", "table": "transactions", "id": 5}         удаление по id
+#   {"op": "reset"}                                         очистка всех таблиц
+
+TABLES = ("users", "accounts", "categories", "transactions", "budgets")
+COMPACT_EVERY = 1000
+COMPACT_RATIO = 1.0  # размер журнала относительно снапшота
+
+
+def empty_data() -> dict:
+    return {name: [] for name in TABLES}
+
+
+def journal_path(path: str) -> str:
+    return path + ".journal"
+
+
+def read_snapshot(path: str) -> dict:
+    """Читает снапшот; отсутствующий файл — пустые таблицы."""
+    data = empty_data()
+    if path.endswith(".fmsnap"):
+        from core.snapshot import read
+        if os.path.exists(path):
+            data.update(read(path))
+    elif os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data.update(json.load(f))
+    return data
+
+
+def read_journal(path: str) -> Iterator[dict]:
+    """
+    Лениво читает записи журнала.
+    Недописанная последняя строка (сбой во время записи) пропускается;
+    испорченная строка в середине пропускается с предупреждением, а не обрывает загрузку.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.endswith("\n"):
+                return
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                warnings.warn(f"{path}:{number}: skipping unreadable journal record ({e})", RuntimeWarning)
+
+
+def _size(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def _count_records(path: str) -> int:
+    """Число записей журнала без разбора JSON (для порога compaction)."""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.endswith(b"\n") and line.strip())
+
+
+def truncate_torn_tail(path: str):
+    """Обрезает журнал до последнего "\n": недописанная строка не должна склеиться со следующей записью."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r+b") as f:
+        pos = f.seek(0, os.SEEK_END)
+        if pos == 0:
+            return
+        f.seek(pos - 1)
+        if f.read(1) == b"\n":
+            return
+        while pos > 0:
+            step = min(pos, 4096)
+            pos -= step
+            f.seek(pos)
+            i = f.read(step).rfind(b"\n")
+            if i >= 0:
+                f.truncate(pos + i + 1)
+                return
+        f.truncate(0)
+
+
+def replay(data: dict, records: Iterable[dict]) -> dict:
+    """
+    Применяет записи журнала к данным снапшота (на месте).
+    Для каждой таблицы строится индекс id -> позиции, поэтому проигрывание
+    стоит O(N + J), а не O(N * J). Как и в JsonStorage, put заменяет последнюю
+    строку с этим id, а del удаляет все строки с ним (в данных бывают дубли id).
+    """
+    positions = {}
+
+    def _positions(table):
+        if table not in positions:
+            index = {}
+            for i, row in enumerate(data.setdefault(table, [])):
+                index.setdefault(row.get("id"), []).append(i)
+            positions[table] = index
+        return positions[table]
+
+    deleted = set()
+    for rec in records:
+        op = rec.get("op")
+        if op == "reset":
+            for table in list(data):
+                data[table] = []
+            positions.clear()
+            deleted.clear()
+        elif op == "put":
+            table, row = rec["table"], rec["row"]
+            pos = _positions(table)
+            found = pos.get(row.get("id"))
+            if found is None:
+                pos[row.get("id")] = [len(data[table])]
+                data[table].append(row)
+            else:
+                data[table][found[-1]] = row
+        elif op == "del":
+            table = rec["table"]
+            for i in _positions(table).pop(rec["id"], ()):
+                deleted.add((table, i))
+
+    # Удалённые строки вычищаем одним проходом в конце, чтобы позиции не съезжали.
+    for table in {t for t, _ in deleted}:
+        gone = {i for t, i in deleted if t == table}
+        data[table] = [row for i, row in enumerate(data[table]) if i not in gone]
+    return data
+
+
+@traced("journal.load")
+def load(path: str) -> dict:
+    """Снапшот + проигранный журнал."""
+    return replay(read_snapshot(path), read_journal(journal_path(path)))
+
+
+def write_snapshot(path: str, data: dict):
+    """Атомарно записывает снапшот: во временный файл, затем os.replace."""
+    if path.endswith(".fmsnap"):
+        from core.snapshot import write
+        write(path, data)
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({name: data.get(name, []) for name in TABLES}, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Journal:
+    """
+    Журнал изменений для одного файла данных.
+    put/delete дописывают одну запись; compact сворачивает журнал в снапшот.
+    """
+
+    def __init__(self, path: str, compact_every: int = COMPACT_EVERY, ratio: float = COMPACT_RATIO):
+        self.path = path
+        self.journal_file = journal_path(path)
+        self.compact_every = compact_every
+        self.ratio = ratio
+        self.pending = _count_records(self.journal_file)
+        self.journal_bytes = _size(self.journal_file)
+        self.snapshot_bytes = _size(path)
+
+    def load(self) -> dict:
+        return load(self.path)
+
+    def _append(self, *records: dict):
+        """Дописывает записи одним вызовом write и одним fsync."""
+        os.makedirs(os.path.dirname(self.journal_file) or ".", exist_ok=True)
+        truncate_torn_tail(self.journal_file)
+        text = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        with open(self.journal_file, "ab") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        self.pending += len(records)
+        self.journal_bytes += len(text)
+
+    def put(self, table: str, row: dict):
+        self._append({"op": "put", "table": table, "row": row})
+
+    def put_many(self, table: str, rows: Iterable[dict]):
+        self._append(*({"op": "put", "table": table, "row": row} for row in rows))
+
+    def delete(self, table: str, row_id):
+        self._append({"op": "del", "table": table, "id": row_id})
+
+    def reset(self):
+        self._append({"op": "reset"})
+
+    def needs_compaction(self) -> bool:
+        return self.pending >= self.compact_every and self.journal_bytes >= self.snapshot_bytes * self.ratio
+
+    def compact(self, data: Optional[dict] = None):
+        """
+        Записывает новый снапшот и очищает журнал.
+        data — актуальное состояние; если не передано, оно восстанавливается с диска.
+        """
+        if data is None:
+            data = self.load()
+        write_snapshot(self.path, data)
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self.pending = 0
+        self.journal_bytes = 0
+        self.snapshot_bytes = _size(self.path)
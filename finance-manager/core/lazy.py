@@ -1,16 +1,43 @@
 from typing import Tuple, Iterable, Iterator
-from collections import Counter
 from .domain import Transaction, Category
+from .topk import SpaceSaving, snapshots
 
 def iter_transactions(trans: Tuple[Transaction, ...], pred) -> Iterable[Transaction]:
     for t in trans:
         if pred(t):
             yield t
 
-def lazy_top_categories(trans: Iterable[Transaction], cats: Tuple[Category, ...], k: int) -> Iterator[tuple[str, int]]:
-    counter = Counter()
+# Счётчиков Space-Saving на одно место топа: при категориях не больше
+# CAPACITY_PER_K * k суммы точные, дальше — верхние оценки.
+CAPACITY_PER_K = 4
+
+def _expenses(trans: Iterable[Transaction], cat_ids: set) -> Iterator[tuple]:
+    """(cat_id, расход) — только расходы (-amount при amount < 0), как в CategoryTree.rollup."""
+    return ((t.cat_id, -t.amount) for t in trans if t.amount < 0 and t.cat_id in cat_ids)
+
+def _capacity(cat_ids: set, k: int, capacity: int = None) -> int:
+    return capacity or max(min(len(cat_ids), CAPACITY_PER_K * k), 1)
+
+def lazy_top_categories(trans: Iterable[Transaction], cats: Tuple[Category, ...], k: int,
+                        capacity: int = None) -> Iterator[tuple[str, int]]:
+    """
+    Топ-k категорий по расходу: (cat_id, расход) по убыванию, не больше k пар,
+    после прохода по потоку. Промежуточные снимки — lazy_top_snapshots.
+    Память — O(capacity) счётчиков (Space-Saving), по умолчанию
+    min(len(cats), CAPACITY_PER_K * k).
+    """
     cat_ids = {c.id for c in cats}
-    for t in trans:
-        if t.cat_id in cat_ids:
-            counter[t.cat_id] += t.amount
-            yield t.cat_id, counter[t.cat_id]
+    sketch = SpaceSaving(_capacity(cat_ids, k, capacity))
+    for cat_id, spent in _expenses(trans, cat_ids):
+        sketch.update(cat_id, spent)
+    if k > 0:
+        yield from sketch.top(k)
+
+def lazy_top_snapshots(trans: Iterable[Transaction], cats: Tuple[Category, ...], k: int,
+                       every: int = 1000, capacity: int = None) -> Iterator[tuple]:
+    """
+    Снимки топ-k ((cat_id, расход), ...) каждые every расходов и в конце потока.
+    Расходы и capacity — как в lazy_top_categories.
+    """
+    cat_ids = {c.id for c in cats}
+    return snapshots(_expenses(trans, cat_ids), k, every, _capacity(cat_ids, k, capacity))
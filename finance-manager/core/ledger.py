@@ -0,0 +1,166 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+from core.decode import paused_gc
+
+# ================== Журнал транзакций, разбитый по месяцам ==================
+#
+# Ledger хранит транзакции отсортированными по дате и разбитыми на месячные
+# партиции: "YYYY-MM" -> партиция (days — порядковые номера дней, rows — строки
+# в том же порядке). Дата каждой строки разбирается один раз при добавлении.
+#   month("2025-01")              — одна партиция, O(1) + O(k)
+#   range("2025-01-10", "2025-03-05") — бинарный поиск по месяцам и по дням
+#                                   в крайних партициях, O(log n + k)
+# Строки без даты, но с ключом "month" (старый формат) попадают в партицию
+# своего месяца как «плавающие»: month() их возвращает, range() — нет.
+# Строки без даты и месяца хранятся отдельно и в выборки не попадают.
+
+
+@lru_cache(maxsize=8192)
+def _ordinal(day: str) -> int:
+    return date.fromisoformat(day).toordinal()
+
+
+def day_ordinal(ts: str) -> int:
+    """"YYYY-MM-DD[...]" -> номер дня (date.toordinal); различных дней мало — кэшируем."""
+    return _ordinal(ts[:10])
+
+
+def _date_of(t) -> Optional[str]:
+    if isinstance(t, dict):
+        return t.get("date") or t.get("ts")
+    return getattr(t, "ts", None) or None
+
+
+class _Partition:
+    __slots__ = ("days", "rows", "loose")
+
+    def __init__(self):
+        self.days = []
+        self.rows = []
+        self.loose = []
+
+
+class Ledger:
+    def __init__(self, transactions: Iterable = ()):
+        self._parts = {}
+        self._months = []  # отсортированные ключи партиций
+        self._undated = []
+        self._count = 0
+        self.extend(transactions)
+
+    def _partition(self, month: str) -> _Partition:
+        part = self._parts.get(month)
+        if part is None:
+            part = self._parts[month] = _Partition()
+            insort(self._months, month)
+        return part
+
+    # ---------- изменение ----------
+    def extend(self, transactions: Iterable):
+        """Пакетная загрузка: одна сортировка вместо вставки по одной строке."""
+        dated, days = [], []
+        with paused_gc():
+            for t in transactions:
+                ts = _date_of(t)
+                if ts:
+                    dated.append(t)
+                    days.append(day_ordinal(ts))
+                else:
+                    self.add(t)
+            part, month_end = None, 0
+            for i in sorted(range(len(days)), key=days.__getitem__):
+                day, t = days[i], dated[i]
+                if day >= month_end:
+                    # следующий месяц: граница — первое число месяца после него
+                    first = date.fromordinal(day)
+                    part = self._partition(f"{first.year:04d}-{first.month:02d}")
+                    month_end = date(first.year + first.month // 12, first.month % 12 + 1, 1).toordinal()
+                if part.days and part.days[-1] > day:
+                    i = bisect_right(part.days, day)
+                    part.days.insert(i, day)
+                    part.rows.insert(i, t)
+                else:
+                    part.days.append(day)
+                    part.rows.append(t)
+        self._count += len(dated)
+
+    def add(self, t):
+        ts = _date_of(t)
+        self._count += 1
+        if ts:
+            part = self._partition(ts[:7])
+            day = day_ordinal(ts)
+            i = bisect_right(part.days, day)
+            part.days.insert(i, day)
+            part.rows.insert(i, t)
+        elif isinstance(t, dict) and t.get("month"):
+            self._partition(t["month"]).loose.append(t)
+        else:
+            self._undated.append(t)
+
+    def remove(self, t):
+        """Удаляет строку (по тождеству или равенству); ValueError, если её нет."""
+        ts = _date_of(t)
+        if ts:
+            part = self._parts.get(ts[:7])
+            if part is not None:
+                day = day_ordinal(ts)
+                for i in range(bisect_left(part.days, day), bisect_right(part.days, day)):
+                    if part.rows[i] is t or part.rows[i] == t:
+                        del part.days[i], part.rows[i]
+                        self._count -= 1
+                        return
+        else:
+            bucket = self._undated
+            if isinstance(t, dict) and t.get("month") in self._parts:
+                bucket = self._parts[t["month"]].loose
+            if t in bucket:
+                bucket.remove(t)
+                self._count -= 1
+                return
+        raise ValueError("transaction not in ledger")
+
+    # ---------- запросы ----------
+    def __len__(self):
+        return self._count
+
+    def __iter__(self) -> Iterator:
+        """Хронологически; плавающие строки месяца — после датированных."""
+        for month in self._months:
+            part = self._parts[month]
+            yield from part.rows
+            yield from part.loose
+        yield from self._undated
+
+    def months(self) -> list:
+        return list(self._months)
+
+    def month(self, month: str) -> list:
+        part = self._parts.get(month)
+        if part is None:
+            return []
+        return part.rows + part.loose
+
+    def _bounds(self, start: str, end: str):
+        """(партиция, lo, hi) для каждого месяца диапазона — общий обход для range и count_range."""
+        lo_day, hi_day = day_ordinal(start), day_ordinal(end)
+        months = self._months
+        for month in months[bisect_left(months, start[:7]):bisect_right(months, end[:7])]:
+            part = self._parts[month]
+            lo = bisect_left(part.days, lo_day) if month == start[:7] else 0
+            hi = bisect_right(part.days, hi_day) if month == end[:7] else len(part.days)
+            yield part, lo, hi
+
+    def count_range(self, start: str, end: str) -> int:
+        """Число строк в range(start, end) без их копирования — O(log n + месяцев)."""
+        return sum(max(hi - lo, 0) for _, lo, hi in self._bounds(start, end))
+
+    def range(self, start: str, end: str) -> list:
+        """Строки с датой в [start, end] включительно (по дням)."""
+        out = []
+        for part, lo, hi in self._bounds(start, end):
+            out.extend(part.rows[lo:hi])
+        return out
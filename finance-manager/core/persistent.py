@@ -0,0 +1,332 @@
+from typing import Iterable, Iterator, Optional
+
+from core.tracing import traced
+
+# ================== Персистентные коллекции со структурным разделением ==================
+#
+# Обновление возвращает новую коллекцию, старая остаётся прежней (как у кортежей),
+# но копируется только путь от корня до изменённого листа — O(log32 n), а не O(n).
+#   PVector        — вектор-дерево (bit-partitioned trie), 32 элемента в узле
+#   PMap           — HAMT: хэш-дерево ключ -> значение с bitmap-узлами
+#   PersistentRows — строки-словари по порядку вставки + индекс id -> позиции;
+#                    append / replace / delete за O(log n), словари не копируются.
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+HASH_BITS = 64
+
+
+# ---------- PVector ----------
+def _new_path(level: int, value):
+    return (value,) if level == 0 else (_new_path(level - BITS, value),)
+
+
+def _push(node: tuple, level: int, i: int, value) -> tuple:
+    if level == 0:
+        return node + (value,)
+    sub = (i >> level) & MASK
+    if sub < len(node):
+        return node[:sub] + (_push(node[sub], level - BITS, i, value),) + node[sub + 1:]
+    return node + (_new_path(level - BITS, value),)
+
+
+def _assoc(node: tuple, level: int, i: int, value) -> tuple:
+    sub = (i >> level) & MASK
+    child = value if level == 0 else _assoc(node[sub], level - BITS, i, value)
+    return node[:sub] + (child,) + node[sub + 1:]
+
+
+class PVector:
+    __slots__ = ("_count", "_shift", "_root")
+
+    def __init__(self, count: int = 0, shift: int = BITS, root: tuple = ()):
+        self._count = count
+        self._shift = shift
+        self._root = root
+
+    @classmethod
+    def from_iterable(cls, values: Iterable) -> "PVector":
+        """Сборка снизу вверх за O(n), без промежуточных версий."""
+        level = tuple(values)
+        count = len(level)
+        nodes = [level[i:i + WIDTH] for i in range(0, count, WIDTH)]
+        shift = BITS
+        while len(nodes) > WIDTH:
+            nodes = [tuple(nodes[i:i + WIDTH]) for i in range(0, len(nodes), WIDTH)]
+            shift += BITS
+        return cls(count, shift, tuple(nodes))
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        node = self._root
+        for level in range(self._shift, 0, -BITS):
+            node = node[(i >> level) & MASK]
+        return node[i & MASK]
+
+    def append(self, value) -> "PVector":
+        if self._count == 1 << (self._shift + BITS):
+            # корень заполнен — дерево растёт на уровень
+            root = (self._root, _new_path(self._shift, value))
+            return PVector(self._count + 1, self._shift + BITS, root)
+        return PVector(self._count + 1, self._shift, _push(self._root, self._shift, self._count, value))
+
+    def set(self, i: int, value) -> "PVector":
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return PVector(self._count, self._shift, _assoc(self._root, self._shift, i, value))
+
+    def __iter__(self) -> Iterator:
+        def walk(node, level):
+            if level == 0:
+                yield from node
+            else:
+                for child in node:
+                    yield from walk(child, level - BITS)
+        return walk(self._root, self._shift)
+
+
+# ---------- PMap (HAMT) ----------
+def _hash(key) -> int:
+    return hash(key) & ((1 << HASH_BITS) - 1)
+
+
+def _popcount(x: int) -> int:
+    return bin(x).count("1")
+
+
+class _Node:
+    __slots__ = ("bitmap", "items")  # items: пары (ключ, значение) или дочерние узлы
+
+    def __init__(self, bitmap: int, items: tuple):
+        self.bitmap = bitmap
+        self.items = items
+
+
+class _Collision:
+    __slots__ = ("items",)  # одинаковый полный хэш — список пар
+
+    def __init__(self, items: tuple):
+        self.items = items
+
+
+_EMPTY = _Node(0, ())
+
+
+def _merge(shift: int, p1: tuple, h1: int, p2: tuple, h2: int):
+    if shift >= HASH_BITS:
+        return _Collision((p1, p2))
+    b1, b2 = (h1 >> shift) & MASK, (h2 >> shift) & MASK
+    if b1 == b2:
+        return _Node(1 << b1, (_merge(shift + BITS, p1, h1, p2, h2),))
+    items = (p1, p2) if b1 < b2 else (p2, p1)
+    return _Node((1 << b1) | (1 << b2), items)
+
+
+def _set(node, shift: int, h: int, key, value):
+    """(новый узел, добавлен ли новый ключ)."""
+    if isinstance(node, _Collision):
+        for i, (k, _) in enumerate(node.items):
+            if k == key:
+                return _Collision(node.items[:i] + ((key, value),) + node.items[i + 1:]), False
+        return _Collision(node.items + ((key, value),)), True
+    bit = 1 << ((h >> shift) & MASK)
+    idx = _popcount(node.bitmap & (bit - 1))
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, node.items[:idx] + ((key, value),) + node.items[idx:]), True
+    item = node.items[idx]
+    if isinstance(item, tuple):
+        if item[0] == key:
+            child, added = (key, value), False
+        else:
+            child, added = _merge(shift + BITS, item, _hash(item[0]), (key, value), h), True
+    else:
+        child, added = _set(item, shift + BITS, h, key, value)
+    return _Node(node.bitmap, node.items[:idx] + (child,) + node.items[idx + 1:]), added
+
+
+def _remove(node, shift: int, h: int, key):
+    """Новый узел (None, если опустел) или тот же узел, если ключа нет."""
+    if isinstance(node, _Collision):
+        items = tuple(p for p in node.items if p[0] != key)
+        return node if len(items) == len(node.items) else (_Collision(items) if items else None)
+    bit = 1 << ((h >> shift) & MASK)
+    if not node.bitmap & bit:
+        return node
+    idx = _popcount(node.bitmap & (bit - 1))
+    item = node.items[idx]
+    if isinstance(item, tuple):
+        if item[0] != key:
+            return node
+        child = None
+    else:
+        child = _remove(item, shift + BITS, h, key)
+        if child is item:
+            return node
+    if child is None:
+        bitmap = node.bitmap & ~bit
+        return _Node(bitmap, node.items[:idx] + node.items[idx + 1:]) if bitmap else None
+    return _Node(node.bitmap, node.items[:idx] + (child,) + node.items[idx + 1:])
+
+
+def _build(entries: list, shift: int):
+    """Узел из списка (хэш, ключ, значение) с различными ключами — без промежуточных версий."""
+    if shift >= HASH_BITS:
+        return _Collision(tuple((k, v) for _, k, v in entries))
+    buckets = {}
+    for entry in entries:
+        buckets.setdefault((entry[0] >> shift) & MASK, []).append(entry)
+    bitmap, items = 0, []
+    for b in sorted(buckets):
+        group = buckets[b]
+        bitmap |= 1 << b
+        items.append((group[0][1], group[0][2]) if len(group) == 1 else _build(group, shift + BITS))
+    return _Node(bitmap, tuple(items))
+
+
+class PMap:
+    __slots__ = ("_root", "_count")
+
+    def __init__(self, root=_EMPTY, count: int = 0):
+        self._root = root
+        self._count = count
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "PMap":
+        if not d:
+            return cls()
+        return cls(_build([(_hash(k), k, v) for k, v in d.items()], 0), len(d))
+
+    def __len__(self):
+        return self._count
+
+    def get(self, key, default=None):
+        h = _hash(key)
+        node, shift = self._root, 0
+        while True:
+            if isinstance(node, _Collision):
+                return next((v for k, v in node.items if k == key), default)
+            bit = 1 << ((h >> shift) & MASK)
+            if not node.bitmap & bit:
+                return default
+            item = node.items[_popcount(node.bitmap & (bit - 1))]
+            if isinstance(item, tuple):
+                return item[1] if item[0] == key else default
+            node, shift = item, shift + BITS
+
+    def __contains__(self, key):
+        return self.get(key, _EMPTY) is not _EMPTY
+
+    def set(self, key, value) -> "PMap":
+        root, added = _set(self._root, 0, _hash(key), key, value)
+        return PMap(root, self._count + added)
+
+    def remove(self, key) -> "PMap":
+        root = _remove(self._root, 0, _hash(key), key)
+        if root is self._root:
+            return self
+        return PMap(root if root is not None else _EMPTY, self._count - 1)
+
+    def items(self) -> Iterator[tuple]:
+        def walk(node):
+            for item in node.items:
+                if isinstance(item, tuple):
+                    yield item
+                else:
+                    yield from walk(item)
+        return walk(self._root)
+
+
+# ---------- PersistentRows ----------
+class PersistentRows:
+    """
+    Неизменяемая коллекция строк-словарей с ключом "id".
+    Удалённые строки остаются «дырами» (None) в векторе; когда дыр больше,
+    чем живых строк, коллекция пересобирается (амортизированно O(1) на удаление).
+    Повторяющиеся id из старых данных сохраняются: get и replace работают с
+    последней строкой с этим id, delete удаляет все — как JsonStorage и журнал.
+    """
+
+    __slots__ = ("_rows", "_index", "_live", "max_id")
+
+    def __init__(self, rows: PVector = None, index: PMap = None, live: int = 0, max_id: int = 0):
+        self._rows = rows if rows is not None else PVector()
+        self._index = index if index is not None else PMap()  # id -> кортеж позиций
+        self._live = live
+        self.max_id = max_id
+
+    @classmethod
+    @traced("persistent.from_rows")
+    def from_rows(cls, rows: Iterable[dict]) -> "PersistentRows":
+        rows = list(rows)
+        positions = {}
+        for i, row in enumerate(rows):
+            positions.setdefault(row.get("id"), []).append(i)
+        index = PMap.from_dict({row_id: tuple(pos) for row_id, pos in positions.items()})
+        return cls(PVector.from_iterable(rows), index, len(rows), _max_id(positions))
+
+    def __len__(self):
+        return self._live
+
+    def __iter__(self) -> Iterator[dict]:
+        return (row for row in self._rows if row is not None)
+
+    def __contains__(self, row_id):
+        return row_id in self._index
+
+    def get(self, row_id, default=None) -> Optional[dict]:
+        pos = self._index.get(row_id)
+        return default if pos is None else self._rows[pos[-1]]
+
+    def next_id(self) -> int:
+        return self.max_id + 1
+
+    def append(self, row: dict) -> "PersistentRows":
+        row_id = row.get("id")
+        pos = self._index.get(row_id, ()) + (len(self._rows),)
+        return PersistentRows(
+            self._rows.append(row), self._index.set(row_id, pos), self._live + 1,
+            _max_id((row_id,), self.max_id),
+        )
+
+    def extend(self, rows: Iterable[dict]) -> "PersistentRows":
+        result = self
+        for row in rows:
+            result = result.append(row)
+        return result
+
+    def replace(self, row: dict) -> "PersistentRows":
+        """Заменяет строку с тем же id; если её нет — добавляет в конец."""
+        pos = self._index.get(row.get("id"))
+        if pos is None:
+            return self.append(row)
+        return PersistentRows(self._rows.set(pos[-1], row), self._index, self._live, self.max_id)
+
+    def delete(self, row_id) -> "PersistentRows":
+        pos = self._index.get(row_id)
+        if pos is None:
+            return self
+        rows = self._rows
+        for i in pos:
+            rows = rows.set(i, None)
+        result = PersistentRows(rows, self._index.remove(row_id), self._live - len(pos), self.max_id)
+        if len(rows) - result._live > result._live:
+            compacted = PersistentRows.from_rows(result)
+            compacted.max_id = self.max_id
+            return compacted
+        return result
+
+    def to_list(self) -> list:
+        """Для сериализации: сами словари, без копирования и asdict."""
+        return list(self)
+
+
+def _max_id(ids: Iterable, start: int = 0) -> int:
+    """Наибольший целый id (для next_id); нецелые id пропускаются."""
+    return max([start, *(i for i in ids if isinstance(i, int))])
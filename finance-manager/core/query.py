@@ -0,0 +1,203 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from core.filters import Filter, _parse_date, by_amount_range, by_category
+from core.frame import TransactionFrame
+from core.indexes import IndexManager
+from core.ledger import Ledger
+
+# ================== План выполнения для составных фильтров ==================
+#
+# where(by_category(5), by_date_range(...), by_amount_range(...)) собирает
+# фильтры в Query. Фильтры по одному полю сливаются заранее (две категории —
+# пустой результат, диапазоны дат и сумм пересекаются), так что каждое поле
+# проверяется один раз. Затем Query выбирает путь доступа:
+#   TransactionFrame — векторные маски; самый селективный фильтр (категория)
+#                      даёт позиции, остальные считаются только на них;
+#   index / ledger   — из индекса категорий (IndexManager) и журнала по датам
+#                      (Ledger) берётся тот, что обещает меньше строк;
+#   scan             — полный просмотр, если индексов нет.
+# Оставшиеся условия проверяются одним слитым предикатом: дешёвые поля
+# первыми, произвольные функции (lambda t: ...) — последними; на фрейме поля
+# считаются масками, а произвольные функции — по уцелевшим строкам.
+# Даты на всех путях сравниваются по дню, как в Ledger: "2025-01-31T10:00"
+# входит в диапазон по "2025-01-31", какой бы путь ни выбрал план.
+# Query вызывается как функция данных и встраивается в compose / pipe.
+
+COST = {"cat_id": 0, "amount": 1, "date": 2}  # порядок построчной проверки
+CUSTOM = len(COST)
+
+
+def _cost(f) -> int:
+    return COST.get(f.field, CUSTOM) if isinstance(f, Filter) else CUSTOM
+
+
+def _normalize(filters) -> tuple:
+    """(фильтры — по одному на поле, плюс произвольные; заведомо пустой результат?)."""
+    by_field, custom = {}, []
+    for f in filters:
+        if isinstance(f, Filter) and f.field in COST:
+            by_field.setdefault(f.field, []).append(f.args)
+        else:
+            custom.append(f)
+    merged = []
+    for field, args in by_field.items():
+        if field == "cat_id":
+            values = {a[0] for a in args}
+            if len(values) > 1:
+                return (), True
+            merged.append(by_category(values.pop()))
+        elif field == "date":
+            start = max((a[0] for a in args), key=_parse_date)
+            end = min((a[1] for a in args), key=_parse_date)
+            if _parse_date(start) > _parse_date(end):
+                return (), True
+            merged.append(_day_range(start, end))
+        else:
+            lo, hi = max(a[0] for a in args), min(a[1] for a in args)
+            if lo > hi:
+                return (), True
+            merged.append(by_amount_range(lo, hi))
+    return tuple(sorted(merged + custom, key=_cost)), False
+
+
+def _day_range(start: str, end: str) -> Filter:
+    """Диапазон дат по дню (с точностью Ledger и колонки date фрейма), границы включительно."""
+    lo, hi = start[:10], end[:10]
+
+    def f(t):
+        return lo <= (t.get("date") or "")[:10] <= hi
+    return Filter("date", (start, end), f)
+
+
+def _fuse(filters: tuple) -> Optional[Callable]:
+    """Один предикат вместо цепочки генераторов; None — проверять нечего."""
+    if not filters:
+        return None
+    if len(filters) == 1:
+        return filters[0]
+    fns = tuple(f.fn if isinstance(f, Filter) else f for f in filters)
+
+    def test(t):
+        for fn in fns:
+            if not fn(t):
+                return False
+        return True
+    return test
+
+
+def _column_mask(frame: TransactionFrame, f: Filter, pos):
+    """Маска фильтра по колонкам фрейма; pos — уже отобранные позиции или None."""
+    def col(name):
+        values = getattr(frame, name)
+        return values if pos is None else values[pos]
+
+    if f.field == "cat_id":
+        code = frame.code("cat", f.args[0])
+        return col("cat") == code if code is not None else np.zeros(len(col("cat")), dtype=bool)
+    if f.field == "date":
+        date = col("date")
+        return (date >= np.datetime64(f.args[0][:10], "D")) & (date <= np.datetime64(f.args[1][:10], "D"))
+    amount = np.abs(col("amount"))
+    return (amount >= f.args[0] * frame.scale) & (amount <= f.args[1] * frame.scale)
+
+
+@dataclass(frozen=True)
+class Plan:
+    access: str        # "empty" | "frame" | "index" | "ledger" | "scan"
+    estimate: int      # строк, которые придётся проверить (-1 — неизвестно)
+    driver: Optional[Filter]
+    residual: tuple
+
+    def __str__(self):
+        driver = f" by {self.driver!r}" if self.driver is not None else ""
+        rest = ", ".join(map(repr, self.residual)) or "-"
+        return f"{self.access}{driver} (~{self.estimate} rows), then {rest}"
+
+
+class Query:
+    def __init__(self, filters):
+        self.filters, self.empty = _normalize(filters)
+
+    def __call__(self, data):
+        return self.run(data)
+
+    def _field(self, name: str) -> Optional[Filter]:
+        return next((f for f in self.filters if isinstance(f, Filter) and f.field == name), None)
+
+    def plan(self, rows=None, ledger: Ledger = None, index: IndexManager = None) -> Plan:
+        """Самый селективный путь доступа среди доступных индексов."""
+        if self.empty:
+            return Plan("empty", 0, None, ())
+        if isinstance(rows, TransactionFrame):
+            return Plan("frame", len(rows), None, self.filters)
+        options = []
+        cat, date = self._field("cat_id"), self._field("date")
+        if index is not None and cat is not None:
+            options.append(("index", index.count("transactions", cat_id=cat.args[0]), cat))
+        if ledger is not None and date is not None:
+            options.append(("ledger", ledger.count_range(*date.args), date))
+        if not options or rows is not None:
+            size = len(rows) if hasattr(rows, "__len__") else -1
+            options.append(("scan", size, None))
+        access, estimate, driver = min(options, key=lambda o: (o[1] < 0, o[1]))
+        return Plan(access, estimate, driver, tuple(f for f in self.filters if f is not driver))
+
+    def mask(self, frame: TransactionFrame):
+        """
+        Булева маска по фрейму: позиции из первого фильтра, остальные — только по ним.
+        Произвольные предикаты вызываются на строках-словарях уцелевших позиций.
+        """
+        out = np.zeros(len(frame), dtype=bool)
+        if self.empty:
+            return out
+        pos = None
+        custom = [f for f in self.filters if _cost(f) == CUSTOM]
+        for f in self.filters:
+            if _cost(f) != CUSTOM:
+                m = _column_mask(frame, f, pos)
+                pos = np.flatnonzero(m) if pos is None else pos[m]
+        if custom:
+            if pos is None:
+                pos = np.arange(len(frame))
+            test = _fuse(tuple(custom))
+            rows = frame.filter(pos).to_dicts()
+            pos = pos[np.fromiter((test(t) for t in rows), dtype=bool, count=len(rows))]
+        if pos is None:
+            out[:] = True
+        else:
+            out[pos] = True
+        return out
+
+    def run(self, source, ledger: Ledger = None, index: IndexManager = None):
+        """
+        source — список строк, Ledger, IndexManager или TransactionFrame.
+        ledger / index — необязательные индексы по тем же строкам, что и source.
+        Для фрейма возвращает отфильтрованный фрейм, иначе список строк
+        (в порядке выбранного пути доступа, а не обязательно исходном).
+        """
+        if isinstance(source, TransactionFrame):
+            return source.filter(self.mask(source))
+        if isinstance(source, Ledger):
+            ledger = source
+        elif isinstance(source, IndexManager):
+            index = source
+            source = index.by_id("transactions").values()
+        plan = self.plan(source, ledger, index)
+        if plan.access == "empty":
+            return []
+        if plan.access == "index":
+            candidates = index.query("transactions", cat_id=plan.driver.args[0])
+        elif plan.access == "ledger":
+            candidates = ledger.range(*plan.driver.args)
+        else:
+            candidates = source
+        test = _fuse(plan.residual)
+        return list(candidates) if test is None else [t for t in candidates if test(t)]
+
+
+def where(*filters) -> Query:
+    """Query из фильтров core.filters и произвольных предикатов (все условия через И)."""
+    return Query(filters)
@@ -1,14 +1,102 @@
+from collections import defaultdict
+from typing import Callable, Iterable
+
+
+class CategoryTree:
+    """
+    Индекс дерева категорий (словари с id / parent_id).
+    Смежность parent -> children строится один раз; обход в глубину итеративный,
+    поэтому глубина дерева не ограничена лимитом рекурсии.
+    Для каждого узла хранится интервал Эйлерова обхода [tin, tout):
+    узел n лежит в поддереве a, если tin[a] <= tin[n] < tout[a] — проверка за O(1).
+    """
+
+    def __init__(self, cats: Iterable[dict]):
+        self.by_id = {}
+        self.children = defaultdict(list)
+        for c in cats:
+            self.by_id[c["id"]] = c
+            self.children[c.get("parent_id")].append(c["id"])
+        self.order = []   # id в прямом порядке обхода (как flatten_categories)
+        self.tin = {}
+        self.tout = {}
+        # Корни: родителя нет или он не является категорией.
+        roots = [cid for cid, c in self.by_id.items() if c.get("parent_id") not in self.by_id]
+        self._walk(roots)
+
+    def _walk(self, roots):
+        stack = [(cid, False) for cid in reversed(roots)]
+        while stack:
+            cid, leaving = stack.pop()
+            if leaving:
+                self.tout[cid] = len(self.order)
+                continue
+            if cid in self.tin:  # цикл в данных — второй раз не заходим
+                continue
+            self.tin[cid] = len(self.order)
+            self.order.append(cid)
+            stack.append((cid, True))
+            stack.extend((child, False) for child in reversed(self.children.get(cid, ())))
+
+    def is_descendant(self, cat_id, ancestor_id) -> bool:
+        """True, если cat_id лежит в поддереве ancestor_id (включая сам узел)."""
+        if cat_id not in self.tin or ancestor_id not in self.tin:
+            return False
+        return self.tin[ancestor_id] <= self.tin[cat_id] < self.tout[ancestor_id]
+
+    def descendants(self, root=None) -> list:
+        """Потомки root в прямом порядке обхода, без самого root; None — все корневые деревья."""
+        if root in self.tin:
+            ids = self.order[self.tin[root] + 1:self.tout[root]]
+        else:
+            ids = self._collect(self.children.get(root, ()))
+        return [self.by_id[cid] for cid in ids]
+
+    def _collect(self, top) -> list:
+        """Прямой обход от заданных детей (для корня, которого нет среди категорий)."""
+        ids = []
+        for cid in top:
+            if cid in self.tin:
+                ids.extend(self.order[self.tin[cid]:self.tout[cid]])
+        return ids
+
+    def subtree_ids(self, root) -> set:
+        return {root} | {c["id"] for c in self.descendants(root)}
+
+    def path(self, cat_id) -> list:
+        """Категории от корня до cat_id включительно."""
+        result, seen = [], set()
+        while cat_id in self.by_id and cat_id not in seen:
+            seen.add(cat_id)
+            result.append(self.by_id[cat_id])
+            cat_id = self.by_id[cat_id].get("parent_id")
+        return result[::-1]
+
+    def accumulate(self, own: dict) -> dict:
+        """Свёртка снизу вверх: значение узла + значения всех потомков. O(число категорий)."""
+        total = {cid: own.get(cid, 0) for cid in self.order}
+        for cid in reversed(self.order):
+            parent = self.by_id[cid].get("parent_id")
+            if parent in total:
+                total[parent] += total[cid]
+        return total
+
+    def rollup(self, trans: Iterable[dict], amount: Callable[[dict], float] = None) -> dict:
+        """
+        Итоги по всем узлам за один проход по транзакциям + свёртка снизу вверх.
+        По умолчанию считаются расходы (-amount для отрицательных сумм).
+        """
+        if amount is None:
+            amount = lambda t: -t["amount"] if t["amount"] < 0 else 0
+        own = defaultdict(int)
+        for t in trans:
+            own[t["cat_id"]] += amount(t)
+        return self.accumulate(own)
+
+
 def flatten_categories(cats, root=None):
-    result = []
-    for c in cats:
-        if c.get("parent_id") == root:
-            result.append(c)
-            result.extend(flatten_categories(cats, c["id"]))
-    return result
+    return CategoryTree(cats).descendants(root)
 
 def sum_expenses_recursive(cats, trans, root_id):
-    subs = [c for c in cats if c.get("parent_id") == root_id]
-    total = sum(-t["amount"] for t in trans if t["cat_id"] == root_id and t["amount"] < 0)
-    for s in subs:
-        total += sum_expenses_recursive(cats, trans, s["id"])
-    return total
+    ids = CategoryTree(cats).subtree_ids(root_id)
+    return sum(-t["amount"] for t in trans if t["cat_id"] in ids and t["amount"] < 0)
@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from core.domain import MINOR_UNITS
+from core.frame import TransactionFrame
+from core.recursion import CategoryTree
+from core.tracing import traced
+
+# ================== Отчёт за один проход ==================
+#
+# category_totals — единственный проход по транзакциям пользователя:
+#   {cat_id: {"income", "expense"}} (для TransactionFrame — векторно).
+# build_report собирает из этих сумм всё остальное без повторного чтения
+# транзакций: общий доход/расход, строки по категориям (с объединением
+# одноимённых), по подкатегориям (сумма поддерева через CategoryTree) и
+# расход по бюджетам (бюджет родителя покрывает подкатегории).
+# Итоговая стоимость — O(N) + O(категорий + бюджетов), а не O(бюджетов * N).
+# Суммы копятся целыми в минимальных единицах, как в core.views.
+
+
+@dataclass(frozen=True)
+class CategoryRow:
+    name: Optional[str]   # None — категория не найдена
+    income: float
+    expense: float
+
+
+@dataclass(frozen=True)
+class BudgetRow:
+    budget: dict
+    name: str
+    limit: float
+    spent: float
+
+    @property
+    def remaining(self) -> float:
+        return self.limit - self.spent
+
+
+@dataclass(frozen=True)
+class Report:
+    income: float
+    expense: float
+    by_category: tuple      # CategoryRow по имени категории
+    by_subcategory: tuple   # CategoryRow, name — путь "Родитель → Потомок"
+    budgets: tuple          # BudgetRow
+
+    @property
+    def balance(self) -> float:
+        return self.income - self.expense
+
+    def expenses_by_name(self) -> dict:
+        """{имя категории: расход} только для категорий с расходом — для диаграммы и советов."""
+        return {row.name: row.expense for row in self.by_category if row.expense > 0}
+
+
+@traced("reports.category_totals")
+def category_totals(transactions, user_id=None) -> dict:
+    """
+    {cat_id: {"income", "expense"}} за один проход; user_id=None — все транзакции.
+    Принимает словари (seed.json), модели с атрибутами или TransactionFrame.
+    """
+    if isinstance(transactions, TransactionFrame):
+        mask = None if user_id is None else transactions.mask_user(user_id)
+        return transactions.income_expense("cat", mask)
+    sums = {}
+    for t in transactions:
+        if isinstance(t, dict):
+            if user_id is not None and t.get("user_id") != user_id:
+                continue
+            cat_id, amount = t.get("cat_id"), t["amount"]
+        else:
+            if user_id is not None and getattr(t, "user_id", None) != user_id:
+                continue
+            cat_id, amount = t.cat_id, t.amount
+        entry = sums.get(cat_id)
+        if entry is None:
+            entry = sums[cat_id] = [0, 0]
+        value = round(amount * MINOR_UNITS)
+        if value > 0:
+            entry[0] += value
+        else:
+            entry[1] -= value
+    return {cat_id: {"income": inc / MINOR_UNITS, "expense": exp / MINOR_UNITS} for cat_id, (inc, exp) in sums.items()}
+
+
+@traced("reports.build_report")
+def build_report(cat_totals: dict, categories: Iterable[dict], budgets: Iterable[dict] = ()) -> Report:
+    """Отчёт из сумм по категориям (category_totals или MaterializedTotals.category_totals)."""
+    categories = list(categories)
+    by_id = {c["id"]: c for c in categories}
+
+    # Все суммы ниже — целые в минимальных единицах; в float переводятся один раз, в Report.
+    minor = {cid: (round(vals["income"] * MINOR_UNITS), round(vals["expense"] * MINOR_UNITS))
+             for cid, vals in cat_totals.items()}
+    income = expense = 0
+    named = {}
+    for cat_id, (inc, exp) in minor.items():
+        income += inc
+        expense += exp
+        name = by_id[cat_id]["name"] if cat_id in by_id else None
+        entry = named.setdefault(name, [0, 0])
+        entry[0] += inc
+        entry[1] += exp
+
+    tree = CategoryTree(categories)
+    income_rollup = tree.accumulate({cid: inc for cid, (inc, _) in minor.items()})
+    expense_rollup = tree.accumulate({cid: exp for cid, (_, exp) in minor.items()})
+    used = tree.accumulate({cid: 1 for cid in cat_totals})
+    subcats = {}
+    for cat_id in tree.order:
+        if not used[cat_id]:
+            continue
+        key = " → ".join(c["name"] for c in tree.path(cat_id))
+        entry = subcats.setdefault(key, [0, 0])
+        entry[0] += income_rollup[cat_id]
+        entry[1] += expense_rollup[cat_id]
+
+    budget_rows = tuple(
+        BudgetRow(b, by_id[b["cat_id"]]["name"], b["limit"], expense_rollup.get(b["cat_id"], 0) / MINOR_UNITS)
+        for b in budgets if b["cat_id"] in by_id
+    )
+    return Report(
+        income / MINOR_UNITS,
+        expense / MINOR_UNITS,
+        tuple(CategoryRow(name, inc / MINOR_UNITS, exp / MINOR_UNITS) for name, (inc, exp) in named.items()),
+        tuple(CategoryRow(name, inc / MINOR_UNITS, exp / MINOR_UNITS) for name, (inc, exp) in subcats.items()),
+        budget_rows,
+    )
+
+
+def report(transactions, categories: Iterable[dict], budgets: Iterable[dict] = (), user_id=None) -> Report:
+    """Полный отчёт пользователя: один проход по транзакциям + сборка."""
+    return build_report(category_totals(transactions, user_id), categories, budgets)
@@ -1,37 +1,174 @@
-from core.transforms import filter_month, sum_by_category, sum_amounts
+from itertools import islice
+
+import numpy as np
+
+from core.frame import TransactionFrame
+from core.ledger import Ledger
+
+# ================== Пакетный протокол калькуляторов ==================
+#
+# Калькулятор вызывается как calc(rows) для строк без cat_id и
+# calc(rows, cat_id) для строк категории — один раз на всю группу, а не на
+# каждую строку с новым списком [t]. Группа — список строк-словарей или, если
+# на вход подан TransactionFrame, колоночный срез фрейма (строки одной группы
+# лежат подряд после одной сортировки, срез — представление без копирования).
+# Пакетный калькулятор помечается атрибутом batch = True (см. batch_calculator);
+# старые построчные калькуляторы оборачиваются адаптером per_row.
+# Валидаторы работают потоково: validator(chunk) -> chunk по кускам из chunk
+# строк, поэтому не должны зависеть от строк вне куска (фильтры, проверки).
+# monthly_reports собирает отчёты сразу за много месяцев (и пользователей)
+# за один группирующий проход.
+
+
+def batch_calculator(func):
+    """Помечает калькулятор как пакетный: func(rows[, cat_id]) получает всю группу сразу."""
+    func.batch = True
+    return func
+
+
+def per_row(calc):
+    """Адаптер построчного калькулятора: calc([t]) / calc([t], cat_id) на каждую строку, результаты складываются."""
+    if getattr(calc, "batch", False):
+        return calc
+
+    def run(rows, cat_id=None):
+        if isinstance(rows, TransactionFrame):
+            raise TypeError(f"per-row calculator {getattr(calc, '__name__', calc)!r} cannot run on a TransactionFrame")
+        if cat_id is None:
+            return sum(calc([t]) for t in rows)
+        return sum(calc([t], cat_id) for t in rows)
+    return batch_calculator(run)
+
 
 class BudgetService:
-    def __init__(self, validators=None, calculators=None):
+    def __init__(self, validators=None, calculators=None, chunk: int = 4096):
         self.validators = validators or []
         self.calculators = calculators or []
+        self.chunk = chunk
 
-    def monthly_report(self, data, month):
-        for validator in self.validators:
-            data = validator(data)
-        data_month = filter_month(data, month)
-        report = 0  
-        for t in data_month:
+    def _stream(self, rows):
+        """Строки после валидаторов, которые получают их кусками по self.chunk."""
+        return self._validated(rows) if self.validators else rows
+
+    def _validated(self, rows):
+        it = iter(rows)
+        while True:
+            chunk = list(islice(it, self.chunk))
+            if not chunk:
+                return
+            for validator in self.validators:
+                chunk = validator(chunk)
+            yield from chunk
+
+    def _report(self, groups: dict, calcs: list):
+        """Отчёт по группам {cat_id: строки}: число, если категорий нет, иначе {cat_id: сумма}."""
+        if not groups:
+            return 0
+        if list(groups) == [None]:
+            rows = groups[None]
+            return sum(calc(rows) for calc in calcs)
+        return {
+            cat_id: sum(calc(rows) if cat_id is None else calc(rows, cat_id) for calc in calcs)
+            for cat_id, rows in groups.items()
+        }
+
+    @staticmethod
+    def _group(rows, groups: dict, month=None, by_user: bool = False):
+        """
+        {месяц или (user_id, месяц): {cat_id: [строки]}} одним проходом.
+        month задан — все строки этого месяца (партиция Ledger), иначе ключ "month" строки.
+        """
+        for t in rows:
+            k = month or t.get("month")
+            if k is None:
+                continue
+            if by_user:
+                k = (t.get("user_id"), k)
+            by_cat = groups.get(k)
+            if by_cat is None:
+                by_cat = groups[k] = {}
             cat_id = t.get("cat_id")
-            if cat_id is None:
-                for calc in self.calculators:
-                    report += calc([t])
+            bucket = by_cat.get(cat_id)
+            if bucket is None:
+                by_cat[cat_id] = [t]
             else:
-                if not isinstance(report, dict):
-                    report = {}
-                if cat_id not in report:
-                    report[cat_id] = 0
-                for calc in self.calculators:
-                    report[cat_id] += calc([t], cat_id)
-        return report
+                bucket.append(t)
+        return groups
+
+    def _frame_groups(self, frame: TransactionFrame, wanted, by_user: bool) -> dict:
+        """Группы колоночными срезами: одна сортировка по (пользователь, месяц, категория)."""
+        for validator in self.validators:
+            frame = validator(frame)
+        month = frame.date.astype("datetime64[M]")
+        keys = [frame.cat, month.view(np.int64)] + ([frame.user] if by_user else [])
+        order = np.lexsort(keys)  # последний ключ — главный
+        frame, month = frame.filter(order), month[order]
+        change = np.zeros(len(frame), dtype=bool)
+        change[:1] = True
+        for column in keys:
+            column = column[order]
+            change[1:] |= column[1:] != column[:-1]
+        starts = np.flatnonzero(change)
+        # ключи групп — разом по первым строкам групп, а не поэлементно из массивов
+        labels = month[starts].astype(str).tolist()  # NaT -> "NaT"
+        cats = [frame.cat_ids[c] for c in frame.cat[starts].tolist()]
+        users = [frame.user_ids[u] for u in frame.user[starts].tolist()] if by_user else None
+        bounds = starts.tolist() + [len(frame)]
+        groups = {}
+        for i, m in enumerate(labels):
+            if m == "NaT" or (wanted is not None and m not in wanted):
+                continue
+            k = (users[i], m) if by_user else m
+            by_cat = groups.get(k)
+            if by_cat is None:
+                by_cat = groups[k] = {}
+            by_cat[cats[i]] = frame.filter(slice(bounds[i], bounds[i + 1]))
+        return groups
+
+    def monthly_reports(self, data, months=None, by_user: bool = False) -> dict:
+        """
+        {месяц: отчёт} за один группирующий проход; by_user=True — {(user_id, месяц): отчёт}.
+        months=None — все встреченные месяцы, иначе только перечисленные (без строк — 0).
+        Месяц строки — ключ "month"; у Ledger — его партиция, у TransactionFrame — дата.
+        """
+        calcs = [per_row(calc) for calc in self.calculators]
+        wanted = None if months is None else set(months)
+        if isinstance(data, TransactionFrame):
+            groups = self._frame_groups(data, wanted, by_user)
+        elif isinstance(data, Ledger):
+            # валидаторы построчные: достаточно прогнать их по нужным партициям
+            groups = {}
+            for m in data.months():
+                if wanted is None or m in wanted:
+                    self._group(self._stream(data.month(m)), groups, m, by_user)
+        else:
+            rows = self._stream(data)
+            if wanted is not None:
+                rows = [t for t in rows if t.get("month") in wanted]
+            groups = self._group(rows, {}, by_user=by_user)
+        reports = {k: self._report(by_cat, calcs) for k, by_cat in groups.items()}
+        if months is not None and not by_user:
+            return {m: reports.get(m, 0) for m in months}
+        return reports
+
+    def monthly_report(self, data, month):
+        return self.monthly_reports(data, [month])[month]
 
 class ReportService:
+    """
+    Агрегаторы по тому же протоколу, что калькуляторы BudgetService:
+    пакетный (batch = True) читает данные — agg(data, cat_id), где data — строки,
+    TransactionFrame или Cube; остальные дорабатывают предыдущий результат —
+    agg(результат, cat_id).
+    """
+
     def __init__(self, aggregators=None):
         self.aggregators = aggregators or []
 
     def category_report(self, data, cat_id):
         report = {}
         for agg in self.aggregators:
-            if agg.__name__ == "sum_by_category":
+            if getattr(agg, "batch", False):
                 report[cat_id] = agg(data, cat_id)
             else:
                 report[cat_id] = agg(report.get(cat_id, 0), cat_id)
@@ -0,0 +1,330 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from typing import Iterable, Optional
+
+import numpy as np
+
+from core.decode import paused_gc
+from core.domain import MINOR_UNITS
+from core.frame import TransactionFrame
+from core.journal import TABLES, empty_data
+
+# ================== Бинарный снапшот с загрузкой через mmap ==================
+#
+# Файл *.fmsnap:
+#   MAGIC (8 байт) | версия u32 | длина заголовка u32 | заголовок (JSON) | секции
+# Заголовок — каталог: для каждой таблицы число строк и смещения колонок.
+# Каждая колонка — массив фиксированной ширины (выровнен по 8 байт):
+#   id     int64                     — первичный ключ
+#   ref    int32, NULL = INT32_MIN   — user_id / acc_id / cat_id / parent_id
+#   money  int64                     — сумма в минимальных единицах (x scale)
+#   date   int32, NULL = INT32_MIN   — дни от 1970-01-01
+#   str    int32, NULL = -1          — номер строки в общей таблице строк
+# Таблица строк: смещения uint64 (n + 1) и один блок UTF-8; одинаковые строки
+# (валюта, повторяющиеся названия) хранятся один раз.
+# Snapshot открывает файл через mmap и отдаёт колонки как np.frombuffer —
+# открытие не читает данных, страницы подгружаются при первом обращении.
+# SnapshotWriter пишет файл потоково: куски таблиц кодируются в колонки во
+# временных файлах, заголовок и итоговый файл собираются в close() — в памяти
+# держится только таблица строк.
+
+MAGIC = b"FMSNAP\x00\x00"
+VERSION = 1
+EXT = ".fmsnap"
+ALIGN = 8
+
+INT32_NULL = np.iinfo(np.int32).min
+
+KINDS = {"id": "<i8", "ref": "<i4", "money": "<i8", "date": "<i4", "str": "<i4"}
+
+SCHEMA = {
+    "users": (("id", "id"), ("name", "str")),
+    "accounts": (("id", "id"), ("user_id", "ref"), ("name", "str"), ("balance", "money"), ("currency", "str")),
+    "categories": (("id", "id"), ("user_id", "ref"), ("name", "str"), ("parent_id", "ref")),
+    "transactions": (("id", "id"), ("user_id", "ref"), ("acc_id", "ref"), ("cat_id", "ref"),
+                     ("amount", "money"), ("date", "date"), ("note", "str")),
+    "budgets": (("id", "id"), ("user_id", "ref"), ("cat_id", "ref"), ("limit", "money")),
+}
+
+_PREFIX = struct.Struct("<8sII")
+
+
+def is_snapshot(path: str) -> bool:
+    return path.endswith(EXT)
+
+
+def _pad(n: int) -> int:
+    return -n % ALIGN
+
+
+# ---------- запись ----------
+class _Strings:
+    def __init__(self):
+        self.index = {}
+
+    def code(self, value) -> int:
+        if value is None:
+            return -1
+        return self.index.setdefault(str(value), len(self.index))
+
+    def arrays(self):
+        blobs = [s.encode("utf-8") for s in self.index]
+        offsets = np.zeros(len(blobs) + 1, dtype="<u8")
+        np.cumsum([len(b) for b in blobs], out=offsets[1:])
+        return offsets, b"".join(blobs)
+
+
+def _encode_column(rows: list, name: str, kind: str, scale: int, strings: _Strings) -> np.ndarray:
+    n = len(rows)
+    dtype = KINDS[kind]
+    if kind == "id":
+        values = (r.get(name) for r in rows)
+    elif kind == "ref":
+        values = (INT32_NULL if r.get(name) is None else r.get(name) for r in rows)
+    elif kind == "money":
+        values = (round((r.get(name) or 0) * scale) for r in rows)
+    elif kind == "str":
+        values = (strings.code(r.get(name)) for r in rows)
+    else:  # date
+        days = np.array([(r.get(name) or r.get("ts") or "NaT")[:10] for r in rows], dtype="datetime64[D]")
+        out = days.astype(np.int64)
+        out[np.isnat(days)] = INT32_NULL
+        return out.astype(dtype)
+    try:
+        return np.fromiter(values, dtype=dtype, count=n)
+    except (TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f"column {name!r}: snapshot stores integer ids and numeric amounts ({e})")
+
+
+class SnapshotWriter:
+    """
+    Потоковая запись снапшота: add_rows / add_columns кусками в любом порядке
+    таблиц, close() атомарно собирает файл. Как контекстный менеджер при
+    исключении ничего не пишет.
+    """
+
+    def __init__(self, path: str, scale: int = MINOR_UNITS):
+        self.path = path
+        self.scale = scale
+        self._strings = _Strings()
+        self._rows = {table: 0 for table in TABLES}
+        self._spool = {}  # (таблица, колонка) -> временный файл с байтами колонки
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    def _spool_file(self, table: str, name: str):
+        f = self._spool.get((table, name))
+        if f is None:
+            f = self._spool[(table, name)] = tempfile.TemporaryFile(dir=os.path.dirname(self.path) or ".")
+        return f
+
+    def add_rows(self, table: str, rows: Iterable[dict]):
+        """Кусок таблицы словарями (как в seed.json)."""
+        rows = list(rows)
+        for name, kind in SCHEMA[table]:
+            column = _encode_column(rows, name, kind, self.scale, self._strings)
+            self._spool_file(table, name).write(column.tobytes())
+        self._rows[table] += len(rows)
+
+    def add_columns(self, table: str, columns: dict):
+        """
+        Кусок таблицы готовыми колонками (все колонки SCHEMA, одной длины):
+        id / ref — целые (NULL — INT32_NULL), money — минимальные единицы
+        (в масштабе writer.scale), date — дни от 1970-01-01, str — строки или None.
+        """
+        n = None
+        for name, kind in SCHEMA[table]:
+            values = columns[name]
+            if kind == "str":
+                column = np.fromiter((self._strings.code(v) for v in values), dtype=KINDS[kind], count=len(values))
+            else:
+                column = np.asarray(values).astype(KINDS[kind], copy=False)
+            if n is not None and len(column) != n:
+                raise ValueError(f"column {name!r}: expected {n} values, got {len(column)}")
+            n = len(column)
+            self._spool_file(table, name).write(column.tobytes())
+        self._rows[table] += n or 0
+
+    def _discard(self):
+        for f in self._spool.values():
+            f.close()
+        self._spool.clear()
+
+    def close(self):
+        header = {"scale": self.scale, "tables": {}}
+        sections = []  # (временный файл, bytes или массив) в порядке записи
+        offset = 0
+
+        def add(payload, size: int) -> int:
+            nonlocal offset
+            start = offset
+            sections.append((payload, size))
+            offset += size + _pad(size)
+            return start
+
+        for table in TABLES:
+            columns = {}
+            for name, kind in SCHEMA[table]:
+                size = self._rows[table] * np.dtype(KINDS[kind]).itemsize
+                columns[name] = {"kind": kind, "offset": add(self._spool.get((table, name)), size)}
+            header["tables"][table] = {"rows": self._rows[table], "columns": columns}
+        offsets, blob = self._strings.arrays()
+        header["strings"] = {"count": len(offsets) - 1, "offsets": add(offsets.tobytes(), offsets.nbytes),
+                             "blob": add(blob, len(blob)), "size": len(blob)}
+
+        raw = json.dumps(header).encode("utf-8")
+        raw += b" " * _pad(_PREFIX.size + len(raw))
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_PREFIX.pack(MAGIC, VERSION, len(raw)))
+                f.write(raw)
+                for payload, size in sections:
+                    if isinstance(payload, bytes):
+                        f.write(payload)
+                    elif payload is not None:
+                        payload.seek(0)
+                        shutil.copyfileobj(payload, f, 1 << 20)
+                    f.write(b"\0" * _pad(size))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        finally:
+            self._discard()
+
+
+def write(path: str, data: dict, scale: int = MINOR_UNITS):
+    """Атомарно записывает данные (таблицы списков словарей) в бинарный снапшот."""
+    with SnapshotWriter(path, scale) as writer:
+        for table in TABLES:
+            writer.add_rows(table, data.get(table, []))
+
+
+# ---------- чтение ----------
+class Snapshot:
+    """Снапшот, открытый через mmap; колонки читаются лениво."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a snapshot file")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported snapshot version {version}")
+        self.version = version
+        self.header = json.loads(bytes(self._mm[_PREFIX.size:_PREFIX.size + size]))
+        self.scale = self.header["scale"]
+        self._base = _PREFIX.size + size
+        self._strings: Optional[list] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # ещё живы представления колонок — файл закроется вместе с ними
+
+    def count(self, table: str) -> int:
+        return self.header["tables"][table]["rows"]
+
+    def column(self, table: str, name: str) -> np.ndarray:
+        """Колонка как массив поверх mmap (только чтение, без копирования)."""
+        meta = self.header["tables"][table]["columns"][name]
+        return np.frombuffer(self._mm, dtype=KINDS[meta["kind"]], count=self.count(table),
+                             offset=self._base + meta["offset"])
+
+    def strings(self) -> list:
+        if self._strings is None:
+            meta = self.header["strings"]
+            offsets = np.frombuffer(self._mm, dtype="<u8", count=meta["count"] + 1,
+                                    offset=self._base + meta["offsets"]).tolist()
+            start = self._base + meta["blob"]
+            blob = self._mm[start:start + meta["size"]]
+            self._strings = [blob[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+        return self._strings
+
+    def values(self, table: str, name: str) -> list:
+        """Колонка в значениях Python (None для NULL, float для сумм, "YYYY-MM-DD" для дат)."""
+        kind = self.header["tables"][table]["columns"][name]["kind"]
+        col = self.column(table, name)
+        if kind == "id":
+            return col.tolist()
+        if kind == "money":
+            return (col / self.scale).tolist()
+        if kind == "ref":
+            return [None if v == INT32_NULL else v for v in col.tolist()]
+        if kind == "date":
+            # различных дат немного: форматируем каждую один раз
+            days, inverse = np.unique(col, return_inverse=True)
+            labels = [None if v == INT32_NULL else str(np.datetime64(v, "D")) for v in days.tolist()]
+            return [labels[i] for i in inverse.tolist()]
+        strings = self.strings()
+        return [None if i < 0 else strings[i] for i in col.tolist()]
+
+    def rows(self, table: str) -> list:
+        names = [name for name, _ in SCHEMA[table]]
+        columns = [self.values(table, name) for name in names]
+        with paused_gc():
+            return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def to_data(self) -> dict:
+        data = empty_data()
+        for table in TABLES:
+            data[table] = self.rows(table)
+        return data
+
+    def frame(self) -> TransactionFrame:
+        """TransactionFrame прямо из колонок (коды id — в порядке возрастания id)."""
+        def codes(name):
+            col = self.column("transactions", name)
+            ids, inverse = np.unique(col, return_inverse=True)
+            return inverse.astype(np.int32), [None if v == INT32_NULL else v for v in ids.tolist()]
+
+        cat, cat_ids = codes("cat_id")
+        acc, acc_ids = codes("acc_id")
+        user, user_ids = codes("user_id")
+        raw = self.column("transactions", "date")
+        date = np.where(raw == INT32_NULL, np.iinfo(np.int64).min, raw).astype("datetime64[D]")
+        amount = self.column("transactions", "amount")
+        return TransactionFrame(amount, cat, acc, user, date, cat_ids, acc_ids, user_ids, self.scale)
+
+
+def read(path: str) -> dict:
+    with Snapshot(path) as snap:
+        return snap.to_data()
+
+
+def convert(src: str, dst: str):
+    """seed.json <-> *.fmsnap по расширениям; журнал src учитывается."""
+    from core.journal import load, write_snapshot
+    write_snapshot(dst, load(src))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Конвертация seed.json <-> бинарный снапшот")
+    parser.add_argument("src", help="data/seed.json или data/seed.fmsnap")
+    parser.add_argument("dst")
+    args = parser.parse_args()
+    convert(args.src, args.dst)
+    print(f"{args.src} -> {args.dst}")
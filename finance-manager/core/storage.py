@@ -0,0 +1,335 @@
+import os
+import sqlite3
+from typing import Optional
+
+from core.domain import MINOR_UNITS
+from core.frame import TransactionFrame
+from core.journal import Journal, TABLES, load as load_with_journal
+from core.snapshot import Snapshot, is_snapshot
+from core.tracing import traced
+
+# ================== Подключаемое хранилище данных ==================
+#
+# Оба бэкенда дают одинаковый интерфейс:
+#   load_all()                  -> dict таблиц (списки словарей)
+#   put / put_many / delete / replace_all  -> изменения
+#   rows(table, user_id)        -> строки одного пользователя
+#   transactions(...)           -> транзакции с фильтрами
+#   max_id(table)               -> наибольший id в таблице (0, если пусто)
+#   totals(user_id)             -> {"income": ..., "expense": ...}
+#   category_totals(user_id)    -> {cat_id: {"income": ..., "expense": ...}}
+#
+# JsonStorage — совместимый режим (seed.json + журнал), фильтры в Python,
+# агрегаты — векторно по TransactionFrame (пересобирается после записи).
+# Строки читаются при первом обращении к data; у снапшота *.fmsnap с пустым
+# журналом агрегаты считаются прямо по колонкам mmap, без разбора строк.
+# Приложение (load_all) при старте всё равно разворачивает все строки в
+# словари: ими живут session_state, индексы и куб.
+# SqliteStorage — stdlib sqlite3, фильтры и агрегаты выполняются в SQL по индексам.
+
+COLUMNS = {
+    "users": ("id", "name"),
+    "accounts": ("id", "user_id", "name", "balance", "currency"),
+    "categories": ("id", "user_id", "name", "parent_id"),
+    "transactions": ("id", "user_id", "acc_id", "cat_id", "amount", "date", "note"),
+    "budgets": ("id", "user_id", "cat_id", "limit"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY, user_id INTEGER, name TEXT, balance REAL, currency TEXT
+);
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY, user_id INTEGER, name TEXT, parent_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY, user_id INTEGER, acc_id INTEGER, cat_id INTEGER,
+    amount REAL NOT NULL, date TEXT, note TEXT
+);
+CREATE TABLE IF NOT EXISTS budgets (
+    id INTEGER PRIMARY KEY, user_id INTEGER, cat_id INTEGER, "limit" REAL
+);
+CREATE INDEX IF NOT EXISTS idx_trans_user ON transactions (user_id);
+CREATE INDEX IF NOT EXISTS idx_trans_user_cat ON transactions (user_id, cat_id);
+CREATE INDEX IF NOT EXISTS idx_trans_acc ON transactions (acc_id);
+CREATE INDEX IF NOT EXISTS idx_trans_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_accounts_user ON accounts (user_id);
+CREATE INDEX IF NOT EXISTS idx_categories_user ON categories (user_id);
+CREATE INDEX IF NOT EXISTS idx_budgets_user ON budgets (user_id);
+"""
+
+
+def _quoted(columns):
+    return ", ".join(f'"{c}"' for c in columns)
+
+
+class JsonStorage:
+    """seed.json + журнал изменений; запросы — линейные проходы в памяти."""
+
+    # Суммы в приложении — float с копейками; во фрейме храним их в тиынах.
+    FRAME_SCALE = MINOR_UNITS
+
+    def __init__(self, path: str):
+        self.path = path
+        self.journal = Journal(path)
+        self._data = None
+        self._positions = {table: None for table in TABLES}
+        self._frame = None
+
+    @property
+    def data(self) -> dict:
+        """Таблицы строками-словарями: снапшот + журнал читаются при первом обращении."""
+        if self._data is None:
+            self._data = self.journal.load()
+        return self._data
+
+    @data.setter
+    def data(self, value: dict):
+        self._data = value
+
+    def frame(self) -> TransactionFrame:
+        if self._frame is None:
+            if self._data is None and is_snapshot(self.path) and os.path.exists(self.path) \
+                    and not self.journal.journal_bytes:
+                # колонки снапшота через mmap: строки-словари не создаются
+                with Snapshot(self.path) as snap:
+                    self._frame = snap.frame()
+            else:
+                self._frame = TransactionFrame.from_dicts(self.data.get("transactions", []), scale=self.FRAME_SCALE)
+        return self._frame
+
+    def _changed(self, table: str):
+        if table == "transactions":
+            self._frame = None
+        if self.journal.needs_compaction():
+            self.journal.compact(self.data)
+
+    def _pos(self, table):
+        if self._positions.get(table) is None:
+            self._positions[table] = {r.get("id"): i for i, r in enumerate(self.data.setdefault(table, []))}
+        return self._positions[table]
+
+    @traced("storage.json.load_all")
+    def load_all(self) -> dict:
+        return {table: list(self.data.get(table, [])) for table in TABLES}
+
+    def _upsert(self, table: str, row: dict):
+        pos = self._pos(table)
+        i = pos.get(row.get("id"))
+        if i is None:
+            pos[row.get("id")] = len(self.data[table])
+            self.data[table].append(row)
+        else:
+            self.data[table][i] = row
+
+    def put(self, table: str, row: dict):
+        self._upsert(table, row)
+        self.journal.put(table, row)
+        self._changed(table)
+
+    def put_many(self, table: str, rows):
+        """Пачка строк: одна запись в журнал (один fsync) на всю пачку."""
+        rows = list(rows)
+        for row in rows:
+            self._upsert(table, row)
+        self.journal.put_many(table, rows)
+        self._changed(table)
+
+    def delete(self, table: str, row_id):
+        self.data[table] = [r for r in self.data.get(table, []) if r.get("id") != row_id]
+        self._positions[table] = None
+        self.journal.delete(table, row_id)
+        self._changed(table)
+
+    def replace_all(self, data: dict):
+        self.data = {table: list(data.get(table, [])) for table in TABLES}
+        self._positions = {table: None for table in TABLES}
+        self._frame = None
+        self.journal.compact(self.data)
+
+    def rows(self, table: str, user_id=None) -> list:
+        return [r for r in self.data.get(table, []) if r.get("user_id") == user_id]
+
+    def transactions(self, user_id=None, cat_id=None, acc_id=None,
+                     start: Optional[str] = None, end: Optional[str] = None) -> list:
+        def match(t):
+            return ((user_id is None or t.get("user_id") == user_id)
+                    and (cat_id is None or t.get("cat_id") == cat_id)
+                    and (acc_id is None or t.get("acc_id") == acc_id)
+                    and (start is None or (t.get("date") or "") >= start)
+                    and (end is None or (t.get("date") or "") <= end))
+        return [t for t in self.data.get("transactions", []) if match(t)]
+
+    def max_id(self, table: str) -> int:
+        return max((r.get("id") for r in self.data.get(table, [])), default=0)
+
+    def totals(self, user_id) -> dict:
+        frame = self.frame()
+        return frame.totals(frame.mask_user(user_id))
+
+    def category_totals(self, user_id) -> dict:
+        frame = self.frame()
+        return frame.income_expense("cat", frame.mask_user(user_id))
+
+    def close(self):
+        pass
+
+
+class SqliteStorage:
+    """stdlib sqlite3; фильтры и агрегаты выполняются в SQL по индексам."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        # Streamlit может выполнять перезапуски скрипта в разных потоках.
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Базы, созданные до появления колонки note: добавляем её (нужна для поиска дублей при импорте)."""
+        columns = {r["name"] for r in self.conn.execute("PRAGMA table_info(transactions)")}
+        if "note" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE transactions ADD COLUMN note TEXT")
+
+    def _select(self, sql: str, params=()) -> list:
+        return [dict(r) for r in self.conn.execute(sql, params)]
+
+    @traced("storage.sqlite.load_all")
+    def load_all(self) -> dict:
+        return {
+            table: self._select(f"SELECT {_quoted(COLUMNS[table])} FROM {table} ORDER BY id")
+            for table in TABLES
+        }
+
+    def put(self, table: str, row: dict):
+        cols = COLUMNS[table]
+        with self.conn:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {table} ({_quoted(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                tuple(row.get(c) for c in cols),
+            )
+
+    def _insert_many(self, table: str, rows):
+        cols = COLUMNS[table]
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({_quoted(cols)}) VALUES ({', '.join('?' * len(cols))})",
+            (tuple(r.get(c) for c in cols) for r in rows),
+        )
+
+    def put_many(self, table: str, rows):
+        with self.conn:
+            self._insert_many(table, rows)
+
+    def delete(self, table: str, row_id):
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+
+    def replace_all(self, data: dict):
+        with self.conn:
+            for table in TABLES:
+                self.conn.execute(f"DELETE FROM {table}")
+                self._insert_many(table, data.get(table, []))
+
+    def rows(self, table: str, user_id=None) -> list:
+        return self._select(
+            f"SELECT {_quoted(COLUMNS[table])} FROM {table} WHERE user_id IS ? ORDER BY id", (user_id,)
+        )
+
+    def transactions(self, user_id=None, cat_id=None, acc_id=None,
+                     start: Optional[str] = None, end: Optional[str] = None) -> list:
+        where, params = [], []
+        for column, value in (("user_id", user_id), ("cat_id", cat_id), ("acc_id", acc_id)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            where.append("date >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("date <= ?")
+            params.append(end)
+        sql = f"SELECT {_quoted(COLUMNS['transactions'])} FROM transactions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._select(sql + " ORDER BY id", params)
+
+    def max_id(self, table: str) -> int:
+        return self.conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+
+    def totals(self, user_id) -> dict:
+        income, expense = self.conn.execute(
+            "SELECT COALESCE(SUM(CASE WHEN amount > 0 THEN amount END), 0),"
+            "       COALESCE(SUM(CASE WHEN amount < 0 THEN -amount END), 0)"
+            " FROM transactions WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        return {"income": income, "expense": expense}
+
+    def category_totals(self, user_id) -> dict:
+        rows = self.conn.execute(
+            "SELECT cat_id,"
+            "       COALESCE(SUM(CASE WHEN amount > 0 THEN amount END), 0),"
+            "       COALESCE(SUM(CASE WHEN amount <= 0 THEN -amount END), 0)"
+            " FROM transactions WHERE user_id = ?"
+            " GROUP BY cat_id ORDER BY MIN(id)",
+            (user_id,),
+        )
+        return {cat_id: {"income": inc, "expense": exp} for cat_id, inc, exp in rows}
+
+    def close(self):
+        self.conn.close()
+
+
+def _unique_ids(rows: list) -> list:
+    """
+    В старых seed.json встречаются повторяющиеся id; в SQLite id — первичный ключ.
+    Повторы получают новые id (max + 1, ...), чтобы ни одна строка не потерялась.
+    """
+    next_id = max((r.get("id") or 0 for r in rows), default=0) + 1
+    seen, result = set(), []
+    for r in rows:
+        if r.get("id") in seen:
+            r = {**r, "id": next_id}
+            next_id += 1
+        seen.add(r.get("id"))
+        result.append(r)
+    return result
+
+
+def migrate_json_to_sqlite(json_path: str, db_path: str) -> SqliteStorage:
+    """Переносит seed.json (+ журнал) в базу SQLite одной транзакцией."""
+    data = load_with_journal(json_path)
+    storage = SqliteStorage(db_path)
+    storage.replace_all({table: _unique_ids(rows) for table, rows in data.items()})
+    return storage
+
+
+def open_storage(backend: str, json_path: str, db_path: str):
+    """
+    backend: "json" или "sqlite".
+    При первом открытии SQLite-базы данные мигрируются из json_path.
+    """
+    if backend == "json":
+        return JsonStorage(json_path)
+    if backend == "sqlite":
+        if not os.path.exists(db_path) and os.path.exists(json_path):
+            return migrate_json_to_sqlite(json_path, db_path)
+        return SqliteStorage(db_path)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Миграция seed.json в SQLite")
+    parser.add_argument("json_path", nargs="?", default="data/seed.json")
+    parser.add_argument("db_path", nargs="?", default="data/finance.db")
+    args = parser.parse_args()
+    migrated = migrate_json_to_sqlite(args.json_path, args.db_path)
+    counts = {t: len(rows) for t, rows in migrated.load_all().items()}
+    migrated.close()
+    print(f"{args.json_path} -> {args.db_path}: {counts}")
@@ -0,0 +1,118 @@
+import heapq
+from itertools import count
+from typing import Hashable, Iterable, Iterator
+
+# ================== Топ-k за один проход ==================
+#
+# top_k — точный топ по готовым суммам: куча из k элементов, O(c log k)
+# вместо полной сортировки O(c log c).
+# SpaceSaving — потоковый топ-k с памятью O(capacity) (алгоритм Space-Saving,
+# взвешенный вариант): хранится не больше capacity счётчиков; ключ, которого
+# нет в сводке, вытесняет минимальный и наследует его значение как погрешность.
+# Пока различных ключей не больше capacity, счёт точный. В общем случае
+# count(key) — верхняя оценка, count - error — нижняя, а любой ключ с долей
+# больше total / capacity гарантированно в сводке.
+# Минимум ищется по куче с ленивым удалением устаревших записей; куча
+# перестраивается, когда разрастается вдвое, так что обновление — O(log k)
+# амортизированно, память — O(k).
+
+
+def top_k(totals: dict, k: int) -> list:
+    """[(ключ, сумма)] k наибольших по убыванию."""
+    return heapq.nlargest(k, totals.items(), key=lambda kv: kv[1])
+
+
+class SpaceSaving:
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.total = 0
+        self._counts = {}  # ключ -> [значение, погрешность]
+        self._heap = []    # (значение, номер, ключ), возможны устаревшие записи
+        self._seq = count()  # номер разводит равные значения: ключи между собой не сравниваются
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __contains__(self, key):
+        return key in self._counts
+
+    def _rebuild(self):
+        self._heap = [(entry[0], next(self._seq), key) for key, entry in self._counts.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        """Ключ с минимальным значением (пропуская устаревшие записи кучи)."""
+        while True:
+            value, _, key = heapq.heappop(self._heap)
+            entry = self._counts.get(key)
+            if entry is not None and entry[0] == value:
+                return key, entry
+
+    def update(self, key: Hashable, weight=1):
+        """Добавляет weight >= 0 к ключу; возвращает его текущую оценку."""
+        self.total += weight
+        entry = self._counts.get(key)
+        if entry is not None:
+            entry[0] += weight
+        elif len(self._counts) < self.capacity:
+            entry = self._counts[key] = [weight, 0]
+        else:
+            victim, (floor, _) = self._pop_min()
+            del self._counts[victim]
+            entry = self._counts[key] = [floor + weight, floor]
+        heapq.heappush(self._heap, (entry[0], next(self._seq), key))
+        if len(self._heap) > 2 * self.capacity:
+            self._rebuild()
+        return entry[0]
+
+    def count(self, key) -> int:
+        entry = self._counts.get(key)
+        return 0 if entry is None else entry[0]
+
+    def error(self, key) -> int:
+        entry = self._counts.get(key)
+        return 0 if entry is None else entry[1]
+
+    def top(self, k: int = None) -> list:
+        """[(ключ, оценка)] по убыванию; k=None — вся сводка."""
+        return heapq.nlargest(k or self.capacity, ((key, e[0]) for key, e in self._counts.items()),
+                              key=lambda kv: kv[1])
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        Сводка по объединённому потоку. Ключу, которого нет в заполненной
+        сводке, добавляется её минимум — и к оценке, и к погрешности.
+        """
+        out = SpaceSaving(max(self.capacity, other.capacity))
+        out.total = self.total + other.total
+        floors = [min((e[0] for e in s._counts.values()), default=0) if len(s) == s.capacity else 0
+                  for s in (self, other)]
+        merged = {}
+        for key in self._counts.keys() | other._counts.keys():
+            entry = merged[key] = [0, 0]
+            for sketch, floor in zip((self, other), floors):
+                value, err = sketch._counts.get(key, (floor, floor))
+                entry[0] += value
+                entry[1] += err
+        for key, entry in heapq.nlargest(out.capacity, merged.items(), key=lambda kv: kv[1][0]):
+            out._counts[key] = entry
+        out._rebuild()
+        return out
+
+
+def snapshots(pairs: Iterable[tuple], k: int, every: int, capacity: int = None) -> Iterator[tuple]:
+    """
+    Поток (ключ, вес) -> снимки топ-k каждые every элементов и в конце:
+    кортежи ((ключ, оценка), ...) по убыванию.
+    """
+    sketch = SpaceSaving(capacity or k)
+    seen = 0
+    for key, weight in pairs:
+        sketch.update(key, weight)
+        seen += 1
+        if seen % every == 0:
+            yield tuple(sketch.top(k))
+    if seen % every:
+        yield tuple(sketch.top(k))
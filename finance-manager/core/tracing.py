@@ -0,0 +1,187 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Optional
+
+# ================== Трассировка: вложенные интервалы (spans) ==================
+#
+# with span("reports.build"): ...   или   @traced("storage.load_all")
+# Пока трассировка выключена (по умолчанию), span() возвращает один общий
+# пустой объект, а traced-обёртка сразу вызывает функцию — цена одной
+# проверки флага. Включённый Tracer копит по каждому имени число вызовов,
+# суммарное время и квантили p50 / p99 (скетч KLL из core.sketches, O(1)
+# на замер), а также последние max_events интервалов для экспорта в формате
+# Chrome trace events (chrome://tracing, Perfetto). Вложенность — по времени
+# и глубине стека интервалов своего потока.
+# Profile / profiled() — разовый снимок cProfile для одного прогона (например,
+# одного перезапуска страницы Streamlit, где with-блок неудобен: start / stop).
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "begin", "depth")
+
+    def __init__(self, tracer: "Tracer", name: str):
+        self.tracer = tracer
+        self.name = name
+
+    def start(self) -> "_Span":
+        stack = self.tracer._stack()
+        self.depth = len(stack)
+        stack.append(self)
+        self.begin = time.perf_counter_ns()
+        return self
+
+    def stop(self):
+        end = time.perf_counter_ns()
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        self.tracer._record(self.name, self.begin, end - self.begin, self.depth)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+class Tracer:
+    def __init__(self, max_events: int = 100_000):
+        self.enabled = False
+        self._stats = {}  # имя -> [число, сумма нс, KLL длительностей нс]
+        self._events = deque(maxlen=max_events)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str):
+        return _Span(self, name) if self.enabled else _NULL
+
+    def _record(self, name: str, begin: int, duration: int, depth: int):
+        with self._lock:
+            entry = self._stats.get(name)
+            if entry is None:
+                from core.sketches import KLL  # core.sketches -> core.views: не тянем при импорте
+                entry = self._stats[name] = [0, 0, KLL()]
+            entry[0] += 1
+            entry[1] += duration
+            entry[2].update(duration)
+            self._events.append((name, begin, duration, threading.get_ident(), depth))
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._events.clear()
+
+    def stats(self) -> list:
+        """По именам, от большего суммарного времени: count, total / mean / p50 / p99 в мс."""
+        with self._lock:
+            items = [(name, count, total, kll.quantiles((0.5, 0.99))) for name, (count, total, kll) in self._stats.items()]
+        rows = [
+            {"span": name, "count": count, "total_ms": total / 1e6, "mean_ms": total / count / 1e6,
+             "p50_ms": p50 / 1e6, "p99_ms": p99 / 1e6}
+            for name, count, total, (p50, p99) in items
+        ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def chrome_trace(self) -> dict:
+        """Последние интервалы в формате Chrome trace events (ts и dur — в микросекундах)."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {"name": name, "cat": name.split(".", 1)[0], "ph": "X", "pid": pid, "tid": tid,
+                 "ts": (begin - self._origin) / 1000, "dur": duration / 1000, "args": {"depth": depth}}
+                for name, begin, duration, tid, depth in events
+            ],
+        }
+
+
+TRACER = Tracer()
+
+
+def enable(on: bool = True):
+    TRACER.enabled = on
+
+
+def span(name: str):
+    """Интервал глобального трассировщика; при выключенной трассировке — пустой объект."""
+    return TRACER.span(name) if TRACER.enabled else _NULL
+
+
+def traced(name: Optional[str] = None):
+    """Декоратор: вызов функции — интервал с именем name (по умолчанию module.qualname)."""
+    def decorate(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with TRACER.span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class Profile:
+    """cProfile между start() и stop(); stop() возвращает таблицу pstats текстом."""
+
+    def __init__(self, sort: str = "cumulative", limit: int = 40):
+        self.sort, self.limit = sort, limit
+        self._profiler = cProfile.Profile()
+
+    def start(self) -> "Profile":
+        self._profiler.enable()
+        return self
+
+    def stop(self) -> str:
+        self._profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats(self.sort).print_stats(self.limit)
+        return out.getvalue()
+
+
+@contextmanager
+def profiled(sort: str = "cumulative", limit: int = 40):
+    """cProfile на время блока; после выхода result["text"] — таблица pstats."""
+    result = {}
+    profile = Profile(sort, limit).start()
+    try:
+        yield result
+    finally:
+        result["text"] = profile.stop()
@@ -1,6 +1,10 @@
 from collections import defaultdict
 from typing import Iterable, Tuple, Iterator
 from core.domain import Transaction, Category
+from core.cube import Cube
+from core.frame import TransactionFrame
+from core.ledger import Ledger
+from core.topk import top_k
 
 # ================== Трансформы для фильтрации и суммирования ==================
 
@@ -9,21 +13,40 @@ def filter_month(data, month="2025-01"):
     Фильтрует транзакции по указанному месяцу.
     data: список словарей, каждый словарь — транзакция с ключом 'month'
     month: строка формата "YYYY-MM"
+    Для Ledger возвращается готовая месячная партиция без просмотра остальных строк.
     """
+    if isinstance(data, Ledger):
+        return data.month(month)
     return [t for t in data if t.get("month") == month]
 
 def sum_amounts(data):
     """
     Суммирует поле 'amount' для всех элементов списка data.
+    TransactionFrame суммируется векторно, Cube — по ячейкам.
     """
+    if isinstance(data, Cube):
+        totals = data.totals()
+        return totals["income"] - totals["expense"]
+    if isinstance(data, TransactionFrame):
+        return data.sum()
     return sum(t.get("amount", 0) for t in data)
 
+sum_amounts.batch = True  # аддитивна: сумма по пакету = сумме по строкам (core.service)
+
 def sum_by_category(data, cat_id):
     """
     Суммирует поле 'amount' для всех элементов списка data с конкретным cat_id.
+    TransactionFrame суммируется векторно, Cube — по ячейкам категории.
     """
+    if isinstance(data, Cube):
+        totals = data.totals({"cat_id": cat_id})
+        return totals["income"] - totals["expense"]
+    if isinstance(data, TransactionFrame):
+        return data.sum_by_category(cat_id)
     return sum(t.get("amount", 0) for t in data if t.get("cat_id") == cat_id)
 
+sum_by_category.batch = True
+
 # ================== Ленивая обработка транзакций ==================
 
 def iter_transactions(trans: Tuple[Transaction, ...], pred) -> Iterable[Transaction]:
@@ -53,7 +76,6 @@ def lazy_top_categories(
     for t in trans:
         totals[t.cat_id] += abs(t.amount)
 
-    sorted_cats = sorted(totals.items(), key=lambda x: x[1], reverse=True)
-
-    for cat_id, total in sorted_cats[:k]:
+    # куча на k элементов вместо сортировки всех категорий: O(c log k)
+    for cat_id, total in top_k(totals, k):
         yield (cat_map.get(cat_id, f"cat_{cat_id}"), total)
@@ -1,4 +1,10 @@
-from core.maybe_either import Left, Right, Maybe
+from collections import defaultdict
+from itertools import chain
+from typing import Iterable, Optional
+
+from core.maybe_either import Either, Left, Right, Maybe
+
+DEFAULT_LIMIT = 999999
 
 # ====== Классы данных ======
 class Account:
@@ -51,8 +57,70 @@ def validate_pipeline(t: Transaction, accs, cats, budgets, all_trans):
     result = (
         validate_transaction(t, accs, cats)
         .bind(lambda valid_t: check_budget(
-            next((b for b in budgets if b.cat_id == valid_t.cat_id), Budget(valid_t.cat_id, 999999)),
-            all_trans + [valid_t]
+            next((b for b in budgets if b.cat_id == valid_t.cat_id), Budget(valid_t.cat_id, DEFAULT_LIMIT)),
+            chain(all_trans, [valid_t])  # без копирования всей истории
         ))
     )
     return result
+
+
+# ====== Контекст валидации для массовой проверки ======
+def _account_of(t):
+    """validation.Transaction хранит acc_id, core.domain.Transaction — account_id."""
+    return t.acc_id if hasattr(t, "acc_id") else t.account_id
+
+
+class Validator:
+    """
+    Заранее построенные множества id, бюджет по категории и текущие траты по категориям.
+    Проверка одной транзакции — O(1): поиск в set/dict вместо линейных any(...)/next(...).
+    """
+
+    def __init__(self, acc_ids: Iterable, cat_ids: Iterable, limits: Optional[dict], spent: dict = None):
+        self.acc_ids = set(acc_ids)
+        self.cat_ids = set(cat_ids)
+        # limits=None — проверяются только счёт и категория (например, импорт выписки)
+        self.limits = dict(limits) if limits is not None else None
+        self.spent = defaultdict(int, spent or {})
+
+    @classmethod
+    def from_models(cls, accs, cats, budgets, trans=()) -> "Validator":
+        limits = {}
+        for b in budgets:
+            limits.setdefault(b.cat_id, b.limit)  # как next(...): первый бюджет категории
+        spent = defaultdict(int)
+        for t in trans:
+            spent[t.cat_id] += t.amount
+        return cls((a.acc_id for a in accs), (c.cat_id for c in cats), limits, spent)
+
+    def validate(self, t) -> Either:
+        """Either: Right(t) или Left({"error": ...}) с теми же сообщениями, что и validate_pipeline."""
+        acc_id = _account_of(t)
+        if acc_id not in self.acc_ids:
+            return Left({"error": f"Account {acc_id} not found"})
+        if t.cat_id not in self.cat_ids:
+            return Left({"error": f"Category {t.cat_id} not found"})
+        if self.limits is None:
+            return Right(t)
+        limit = self.limits.get(t.cat_id, DEFAULT_LIMIT)
+        total = self.spent[t.cat_id] + t.amount
+        if total > limit:
+            return Left({"error": f"Budget exceeded for category {t.cat_id}. Limit={limit}, Total={total}"})
+        return Right(t)
+
+    def commit(self, t):
+        """Учесть принятую транзакцию в текущих тратах."""
+        self.spent[t.cat_id] += t.amount
+
+    def validate_many(self, items: Iterable, commit: bool = True) -> list:
+        """
+        Массовая проверка: каждая принятая транзакция сразу учитывается в тратах,
+        так что следующие проверяются уже с её учётом (как при поочерёдном добавлении).
+        """
+        results = []
+        for t in items:
+            result = self.validate(t)
+            if commit and isinstance(result, Right):
+                self.commit(t)
+            results.append(result)
+        return results
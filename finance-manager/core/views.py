@@ -0,0 +1,112 @@
+from collections import defaultdict
+from datetime import date as _date
+from typing import Iterable, Optional
+
+from core.domain import MINOR_UNITS
+from core.frp import EventBus
+
+# ================== Материализованные агрегаты поверх EventBus ==================
+#
+# MaterializedTotals держит накопительные суммы и обновляет их за O(1) на событие:
+#   по пользователю            user_id -> доход / расход
+#   по счёту                   acc_id -> баланс (сумма amount)
+#   по категории пользователя  (user_id, cat_id) -> доход / расход
+#   по периоду бюджета         (user_id, cat_id, период) -> расход,
+#                              период — "YYYY-MM" (month) или "YYYY-Www" (week)
+# Суммы хранятся целыми в минимальных единицах (копейки/тиыны), чтобы
+# добавление и удаление одной и той же суммы не копили ошибку float.
+
+TRANSACTION_ADDED = "TRANSACTION_ADDED"
+TRANSACTION_EDITED = "TRANSACTION_EDITED"
+TRANSACTION_DELETED = "TRANSACTION_DELETED"
+
+
+def period_key(ts: Optional[str], period: str = "month") -> Optional[str]:
+    """Ключ периода бюджета по дате "YYYY-MM-DD"; без даты — None."""
+    if not ts:
+        return None
+    if period == "week":
+        year, week, _ = _date.fromisoformat(ts[:10]).isocalendar()
+        return f"{year}-W{week:02d}"
+    return ts[:7]
+
+
+def _new_totals():
+    return [0, 0, 0]  # доход, расход, количество транзакций
+
+
+class MaterializedTotals:
+    def __init__(self, transactions: Iterable[dict] = ()):
+        self._users = defaultdict(_new_totals)
+        self._accounts = defaultdict(int)
+        self._categories = defaultdict(dict)  # user_id -> {cat_id: [доход, расход, n]}
+        self._periods = defaultdict(int)      # (user_id, cat_id, период) -> расход
+        for t in transactions:
+            self._apply(t, 1)
+
+    # ---------- обновление ----------
+    def _apply(self, t: dict, sign: int):
+        amount = round(t["amount"] * MINOR_UNITS) * sign
+        user_id, cat_id = t.get("user_id"), t.get("cat_id")
+        ts = t.get("date") or t.get("ts")
+        slot = 0 if t["amount"] > 0 else 1
+        value = amount if slot == 0 else -amount
+
+        user = self._users[user_id]
+        user[slot] += value
+        user[2] += sign
+
+        self._accounts[t.get("acc_id", t.get("account_id"))] += amount
+
+        cats = self._categories[user_id]
+        cat = cats.get(cat_id)
+        if cat is None:
+            cat = cats[cat_id] = _new_totals()
+        cat[slot] += value
+        cat[2] += sign
+        if cat[2] == 0:
+            del cats[cat_id]
+
+        if slot == 1:
+            for period in ("month", "week"):
+                self._periods[(user_id, cat_id, period_key(ts, period))] += value
+
+    def on_added(self, event, payload: dict) -> dict:
+        t = payload["transaction"]
+        self._apply(t, 1)
+        return self.user_totals(t.get("user_id"))
+
+    def on_deleted(self, event, payload: dict) -> dict:
+        t = payload["transaction"]
+        self._apply(t, -1)
+        return self.user_totals(t.get("user_id"))
+
+    def on_edited(self, event, payload: dict) -> dict:
+        self._apply(payload["old"], -1)
+        self._apply(payload["new"], 1)
+        return self.user_totals(payload["new"].get("user_id"))
+
+    def subscribe(self, bus: EventBus) -> "MaterializedTotals":
+        bus.subscribe(TRANSACTION_ADDED, self.on_added)
+        bus.subscribe(TRANSACTION_EDITED, self.on_edited)
+        bus.subscribe(TRANSACTION_DELETED, self.on_deleted)
+        return self
+
+    # ---------- чтение ----------
+    def user_totals(self, user_id) -> dict:
+        income, expense, _ = self._users.get(user_id, (0, 0, 0))
+        return {"income": income / MINOR_UNITS, "expense": expense / MINOR_UNITS}
+
+    def category_totals(self, user_id) -> dict:
+        """{cat_id: {"income", "expense"}} — только категории с транзакциями."""
+        return {
+            cat_id: {"income": income / MINOR_UNITS, "expense": expense / MINOR_UNITS}
+            for cat_id, (income, expense, _) in self._categories.get(user_id, {}).items()
+        }
+
+    def account_balance(self, acc_id) -> float:
+        return self._accounts.get(acc_id, 0) / MINOR_UNITS
+
+    def period_spent(self, user_id, cat_id, key: Optional[str]) -> float:
+        """Расход категории за период (ключ из period_key)."""
+        return self._periods.get((user_id, cat_id, key), 0) / MINOR_UNITS
@@ -1,61 +1,389 @@
+"""
+Генератор синтетических данных в схеме seed.json (users / accounts / categories /
+transactions / budgets с user_id), потоково и воспроизводимо по seed.
+
+    python -m data.generate_seed --users 5000 --transactions 10000000 \\
+        --out data/big.fmsnap --out data/big.jsonl --out data/big.json
+
+Формат выбирается по расширению: .json (как seed.json), .jsonl (записи журнала
+core.journal: {"op": "put", "table": ..., "row": ...}), .fmsnap (core.snapshot).
+Все выходы пишутся за один проход кусками по --chunk транзакций.
+"""
+import argparse
 import json
-import random
-from core.domain import Account, Category, Transaction, Budget
+import math
+import os
+from datetime import date, timedelta
+from typing import Iterator
 
-random.seed(42)
+import numpy as np
 
-def generate_accounts():
-    return (
-        Account("acc1", "Карта"),
-        Account("acc2", "Наличные"),
-        Account("acc3", "Депозит"),
-    )
+from core.domain import MINOR_UNITS
+from core.snapshot import SnapshotWriter
 
-def generate_categories():
-    return (
-        Category("food", "Питание", None),
-        Category("rest", "Рестораны", "food"),
-        Category("groceries", "Продукты", "food"),
-        Category("transport", "Транспорт", None),
-        Category("taxi", "Такси", "transport"),
-        Category("bus", "Автобус", "transport"),
-        Category("fun", "Развлечения", None),
-        Category("movies", "Кино", "fun"),
-        Category("games", "Игры", "fun"),
-        Category("edu", "Образование", None),
-    )
+EPOCH = date(1970, 1, 1)
+
+NAMES = ("Диас", "Акерке", "Влад", "Айгерим", "Ержан", "Мария", "Тимур", "Дана", "Арман", "Алия",
+         "Нурлан", "Сабина", "Илья", "Асель", "Данияр", "Камила")
+BANKS = ("Kaspi", "Halyk", "Freedom", "Jusan", "BCC", "Forte")
+ACCOUNT_KINDS = ("Карта", "Депозит", "Наличные", "Кредитка")
+
+# ---------- дерево категорий ----------
+# Узел: (имя, потомки) или лист: (имя, медиана суммы KZT, разброс (sigma логнормали),
+# популярность, знак (+1 доход / -1 расход), контрагенты для note).
+TREE = (
+    ("Питание", (
+        ("Продукты", (
+            ("Супермаркет", 7000, 0.7, 30, -1, ("Magnum", "Small", "Galmart", "Анвар")),
+            ("Рынок", 4000, 0.6, 6, -1, ("Зелёный базар", "Алтын Орда")),
+        )),
+        ("Кафе и рестораны", (
+            ("Кафе", 4500, 0.6, 14, -1, ("Coffee Boom", "Starbucks", "Del Papa", "Салам Бро")),
+            ("Доставка", 6000, 0.5, 9, -1, ("Wolt", "Glovo", "Яндекс Еда")),
+        )),
+    )),
+    ("Транспорт", (
+        ("Такси", 1800, 0.6, 16, -1, ("Яндекс Go", "inDrive")),
+        ("Общественный", 200, 0.2, 12, -1, ("Onay",)),
+        ("Авто", (
+            ("Топливо", 15000, 0.4, 5, -1, ("Helios", "Qazaq Oil", "Sinooil")),
+            ("Парковка", 800, 0.5, 3, -1, ("Astana Parking", "Almaty Parking")),
+        )),
+    )),
+    ("Дом", (
+        ("Хозтовары", 5000, 0.8, 4, -1, ("Leroy Merlin", "Metro", "Sulpak")),
+    )),
+    ("Развлечения", (
+        ("Кино", 3500, 0.3, 3, -1, ("Kinopark", "Chaplin")),
+        ("Игры", 5000, 0.9, 2, -1, ("Steam", "PlayStation Store")),
+    )),
+    ("Здоровье", (
+        ("Аптека", 3500, 0.8, 4, -1, ("Европа", "Биосфера", "Садыхан")),
+        ("Врач", 12000, 0.6, 1, -1, ("Invivo", "Олимп", "Medical Park")),
+    )),
+    ("Одежда", 18000, 0.8, 3, -1, ("Zara", "LC Waikiki", "Lamoda")),
+    ("Путешествия", (
+        ("Билеты", 60000, 0.6, 1, -1, ("Air Astana", "FlyArystan", "ҚТЖ")),
+        ("Отели", 45000, 0.7, 1, -1, ("Booking", "Ostrovok")),
+    )),
+    ("Доходы", (
+        ("Зарплата", 0, 0, 0, 1, ("Зарплата",)),
+        ("Фриланс", 60000, 0.9, 1, 1, ("Upwork", "Перевод")),
+        ("Кэшбэк", 1500, 0.8, 2, 1, ("Кэшбэк",)),
+    )),
+)
 
-def generate_transactions(accounts, categories, n=120):
-    trans = []
-    for i in range(n):
-        acc = random.choice(accounts)
-        cat = random.choice(categories)
-        amount = random.randint(-5000, 20000)  # расходы или доходы
-        ts = f"2025-01-{random.randint(1,28):02d}"
-        trans.append(Transaction(f"t{i}", acc.id, cat.id, amount, ts))
-    return tuple(trans)
-
-def generate_budgets():
+# Регулярные платежи: (лист, вероятность у пользователя, доля дохода или сумма KZT, день месяца)
+RECURRING = (
+    ("Аренда", 0.45, 0.30, 1),
+    ("Коммунальные", 0.90, 18000, 12),
+    ("Интернет", 0.85, 6500, 15),
+    ("Мобильная связь", 0.95, 3500, 20),
+    ("Подписки", 0.60, 2990, 7),
+)
+TREE += (("Платежи", tuple((name, 0, 0, 0, -1, (name,)) for name, *_ in RECURRING)),)
+
+# Сезонность: множители по месяцам (декабрь — подарки, лето — отпуска) и по дням недели.
+MONTH_WEIGHT = (0.85, 0.85, 0.95, 1.0, 1.0, 1.1, 1.15, 1.15, 1.0, 1.0, 1.1, 1.45)
+WEEKDAY_WEIGHT = (0.9, 0.9, 0.95, 1.0, 1.2, 1.35, 1.1)
+
+
+def _flatten(nodes, parent=None, out=None):
+    """Дерево -> [(имя, индекс родителя, параметры листа или None)] в порядке обхода."""
+    out = [] if out is None else out
+    for node in nodes:
+        index = len(out)
+        if isinstance(node[1], tuple):
+            out.append((node[0], parent, None))
+            _flatten(node[1], index, out)
+        else:
+            out.append((node[0], parent, node[1:]))
+    return out
+
+
+CATEGORIES = _flatten(TREE)
+LEAF = {name: i for i, (name, _, spec) in enumerate(CATEGORIES) if spec is not None}
+RANDOM_LEAVES = np.array([i for i, (_, _, spec) in enumerate(CATEGORIES) if spec and spec[2] > 0])
+
+
+def _leaf_arrays():
+    specs = [CATEGORIES[i][2] for i in RANDOM_LEAVES]
+    merchants, starts = [], []
+    for spec in specs:
+        starts.append(len(merchants))
+        merchants.extend(spec[4])
     return (
-        Budget("b1", "food", 50000, "month"),
-        Budget("b2", "transport", 20000, "month"),
-        Budget("b3", "fun", 30000, "month"),
+        np.log([s[0] for s in specs]),                       # mu логнормали
+        np.array([s[1] for s in specs]),                     # sigma
+        np.array([s[2] for s in specs], dtype=float),        # популярность
+        np.array([s[3] for s in specs]),                     # знак
+        np.array(starts), np.array([len(s[4]) for s in specs]),
+        merchants,
     )
 
-def save_seed(path="data/seed.json"):
-    accounts = generate_accounts()
-    categories = generate_categories()
-    transactions = generate_transactions(accounts, categories)
-    budgets = generate_budgets()
-
-    data = {
-        "accounts": [a._asdict() for a in accounts],
-        "categories": [c._asdict() for c in categories],
-        "transactions": [t._asdict() for t in transactions],
-        "budgets": [b._asdict() for b in budgets],
+
+LEAF_MU, LEAF_SIGMA, LEAF_WEIGHT, LEAF_SIGN, MERCHANT_START, MERCHANT_COUNT, MERCHANTS = _leaf_arrays()
+NOTES = np.array(MERCHANTS + [name for name, *_ in RECURRING] + ["Зарплата"], dtype=object)
+
+
+def _months(start: date, months: int) -> list:
+    return [date(start.year + (start.month - 1 + i) // 12, (start.month - 1 + i) % 12 + 1, 1) for i in range(months)]
+
+
+def _day_weights(start: date, months: int) -> np.ndarray:
+    first = start.replace(day=1)
+    last = _months(first, months + 1)[-1]
+    days = [first + timedelta(d) for d in range((last - first).days)]
+    weights = np.array([MONTH_WEIGHT[d.month - 1] * WEEKDAY_WEIGHT[d.weekday()] for d in days])
+    return weights / weights.sum()
+
+
+# ---------- генерация ----------
+class _Profile:
+    __slots__ = ("user_id", "income", "accounts", "cat_base", "recurring", "activity")
+
+
+def _profiles(rng, users: int, months: list, next_acc: int):
+    """Пользователи, их счета, категории (копия дерева) и бюджеты; профиль для транзакций."""
+    rows = {"users": [], "accounts": [], "categories": [], "budgets": []}
+    profiles = []
+    next_cat = 1
+    for user_id in range(1, users + 1):
+        p = _Profile()
+        p.user_id = user_id
+        p.income = float(np.exp(rng.normal(math.log(350_000), 0.45)))
+        p.activity = float(rng.lognormal(0, 0.8))
+        rows["users"].append({"id": user_id, "name": f"{NAMES[user_id % len(NAMES)]} {user_id}"})
+
+        p.accounts = []
+        for kind in ACCOUNT_KINDS[:1 + int(rng.integers(0, len(ACCOUNT_KINDS)))]:
+            bank = BANKS[int(rng.integers(len(BANKS)))]
+            name = kind if kind == "Наличные" else f"{bank} {kind}"
+            balance = round(float(rng.uniform(0, 2) * p.income), -2)
+            rows["accounts"].append({"id": next_acc, "user_id": user_id, "name": name,
+                                     "balance": balance, "currency": "KZT"})
+            p.accounts.append(next_acc)
+            next_acc += 1
+
+        p.cat_base = next_cat
+        for i, (name, parent, _) in enumerate(CATEGORIES):
+            rows["categories"].append({"id": next_cat + i, "user_id": user_id, "name": name,
+                                       "parent_id": None if parent is None else next_cat + parent})
+        next_cat += len(CATEGORIES)
+
+        # зарплата 5-го или 25-го числа, остальные регулярные — с вероятностью
+        p.recurring = [(LEAF["Зарплата"], p.income, int(rng.choice((5, 25))), 1)]
+        for name, chance, amount, day in RECURRING:
+            if rng.random() < chance:
+                value = amount * p.income if amount < 1 else amount
+                p.recurring.append((LEAF[name], value, day, -1))
+
+        for root, share in (("Питание", 0.25), ("Транспорт", 0.08), ("Развлечения", 0.05)):
+            cat_id = p.cat_base + next(i for i, c in enumerate(CATEGORIES) if c[0] == root)
+            rows["budgets"].append({"id": len(rows["budgets"]) + 1, "user_id": user_id, "cat_id": cat_id,
+                                    "limit": round(share * p.income, -3)})
+        profiles.append(p)
+    return rows, profiles
+
+
+def _user_transactions(rng, p: _Profile, n: int, months: list, day0: int, day_p: np.ndarray) -> dict:
+    """Колонки транзакций одного пользователя (без id), отсортированные по дате."""
+    # регулярные платежи: каждый месяц в свой день, сумма с небольшим шумом
+    rec = [(leaf, value, m, day, sign) for leaf, value, day, sign in p.recurring for m in months]
+    r_days = np.array([(date(m.year, m.month, day) - EPOCH).days for _, _, m, day, _ in rec], dtype=np.int64)
+    heating = np.array([1.5 if m.month in (11, 12, 1, 2, 3) and leaf == LEAF["Коммунальные"] else 1.0
+                        for leaf, _, m, _, _ in rec])
+    r_amount = np.array([sign * value for leaf, value, _, _, sign in rec]) * heating
+    r_amount *= rng.normal(1, 0.03, len(rec))
+    r_leaf = np.array([leaf for leaf, *_ in rec], dtype=np.int64)
+    r_note = np.array([len(MERCHANTS) + [n for n, *_ in RECURRING].index(CATEGORIES[leaf][0])
+                       if leaf != LEAF["Зарплата"] else len(NOTES) - 1 for leaf in r_leaf], dtype=np.int64)
+
+    # разовые траты: день по сезонности, категория по вкусам пользователя
+    prefs = rng.dirichlet(LEAF_WEIGHT)
+    pick = rng.choice(len(RANDOM_LEAVES), size=n, p=prefs)
+    d_days = day0 + rng.choice(len(day_p), size=n, p=day_p)
+    scale = math.sqrt(p.income / 350_000)
+    d_amount = LEAF_SIGN[pick] * np.exp(rng.normal(LEAF_MU[pick], LEAF_SIGMA[pick])) * scale
+    d_note = MERCHANT_START[pick] + (rng.random(n) * MERCHANT_COUNT[pick]).astype(np.int64)
+
+    days = np.concatenate([r_days, d_days])
+    order = np.argsort(days, kind="stable")
+    main = p.accounts[0]
+    acc_p = np.full(len(p.accounts), 0.3 / max(len(p.accounts) - 1, 1))
+    acc_p[0] = 0.7 if len(p.accounts) > 1 else 1.0
+    accounts = np.concatenate([np.full(len(rec), main), rng.choice(p.accounts, size=n, p=acc_p)])
+    amount = np.rint(np.concatenate([r_amount, d_amount]) / 10) * 10  # до 10 тенге
+    return {
+        "user_id": np.full(len(days), p.user_id, dtype=np.int64),
+        "acc_id": accounts[order],
+        "cat_id": (p.cat_base + np.concatenate([r_leaf, RANDOM_LEAVES[pick]]))[order],
+        "amount": np.rint(amount * MINOR_UNITS).astype(np.int64)[order],
+        "date": days[order],
+        "note": NOTES[np.concatenate([r_note, d_note])[order]],
     }
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def generate(users: int = 1000, transactions: int = 100_000, months: int = 12,
+             start: str = "2025-01-01", seed: int = 42, chunk: int = 200_000) -> Iterator[tuple]:
+    """
+    Поток (таблица, строки-словари) для малых таблиц и (таблица, колонки) для
+    транзакций кусками ~chunk строк: amount в минимальных единицах, date — дни от 1970-01-01.
+    Таблицы идут в порядке core.journal.TABLES. Один и тот же seed даёт тот же поток.
+    Регулярных платежей не меньше, чем месяцев * платежей: transactions — нижняя граница.
+    """
+    rng = np.random.default_rng(seed)
+    first = date.fromisoformat(start).replace(day=1)
+    month_list = _months(first, months)
+    rows, profiles = _profiles(rng, users, month_list, 1)
+    for table in ("users", "accounts", "categories"):
+        yield table, rows[table]
+
+    recurring = sum(len(p.recurring) for p in profiles) * months
+    activity = np.array([p.activity for p in profiles])
+    counts = rng.multinomial(max(transactions - recurring, 0), activity / activity.sum())
+    day_p = _day_weights(first, months)
+    day0 = (first - EPOCH).days
+
+    next_id, parts, size = 1, [], 0
+    for p, n in zip(profiles, counts):
+        cols = _user_transactions(rng, p, int(n), month_list, day0, day_p)
+        parts.append(cols)
+        size += len(cols["date"])
+        if size >= chunk or p is profiles[-1]:
+            batch = {name: np.concatenate([c[name] for c in parts]) for name in parts[0]}
+            batch["id"] = np.arange(next_id, next_id + size, dtype=np.int64)
+            next_id += size
+            yield "transactions", batch
+            parts, size = [], 0
+    yield "budgets", rows["budgets"]
+
+
+# ---------- запись ----------
+def _dates(days: np.ndarray) -> list:
+    return days.astype("datetime64[D]").astype(str).tolist()
+
+
+class _JsonRows:
+    """Общая сериализация строк для .json и .jsonl: транзакции — шаблоном, без json.dumps на строку."""
+
+    def __init__(self):
+        self._quoted = {}
+
+    def _q(self, s) -> str:
+        q = self._quoted.get(s)
+        if q is None:
+            q = self._quoted[s] = json.dumps(s, ensure_ascii=False)
+        return q
+
+    def lines(self, table: str, payload) -> list:
+        if table != "transactions":
+            return [json.dumps(row, ensure_ascii=False) for row in payload]
+        cols = zip(payload["id"].tolist(), payload["user_id"].tolist(), payload["acc_id"].tolist(),
+                   payload["cat_id"].tolist(), (payload["amount"] / MINOR_UNITS).tolist(),
+                   _dates(payload["date"]), payload["note"].tolist())
+        q = self._q
+        return [f'{{"id": {i}, "user_id": {u}, "acc_id": {a}, "cat_id": {c}, "amount": {m!r}, '
+                f'"date": "{d}", "note": {q(n)}}}' for i, u, a, c, m, d, n in cols]
+
+
+class JsonOutput(_JsonRows):
+    """Один JSON-объект с таблицами как в seed.json; таблицы приходят по очереди, строки — кусками."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._f = open(path + ".tmp", "w", encoding="utf-8")
+        self._f.write("{")
+        self._table = None
+        self._first = True
+
+    def write(self, table: str, payload):
+        if table != self._table:
+            if self._table is not None:
+                self._f.write("\n  ],")
+            self._f.write(f'\n  "{table}": [')
+            self._table, self._first = table, True
+        lines = self.lines(table, payload)
+        if lines:
+            sep = ",\n    "
+            self._f.write(("\n    " if self._first else sep) + sep.join(lines))
+            self._first = False
+
+    def close(self):
+        if self._table is not None:
+            self._f.write("\n  ]")
+        self._f.write("\n}\n")
+        self._f.close()
+        os.replace(self.path + ".tmp", self.path)
+
+
+class JsonlOutput(_JsonRows):
+    """Записи журнала core.journal: можно проиграть поверх пустого снапшота."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._f = open(path + ".tmp", "w", encoding="utf-8")
+
+    def write(self, table: str, payload):
+        prefix = f'{{"op": "put", "table": "{table}", "row": '
+        self._f.writelines(f"{prefix}{line}}}\n" for line in self.lines(table, payload))
+
+    def close(self):
+        self._f.close()
+        os.replace(self.path + ".tmp", self.path)
+
+
+class SnapshotOutput:
+    def __init__(self, path: str):
+        self._writer = SnapshotWriter(path, MINOR_UNITS)
+
+    def write(self, table: str, payload):
+        if table == "transactions":
+            self._writer.add_columns(table, payload)
+        else:
+            self._writer.add_rows(table, payload)
+
+    def close(self):
+        self._writer.close()
+
+
+def open_output(path: str):
+    if path.endswith(".fmsnap"):
+        return SnapshotOutput(path)
+    if path.endswith(".jsonl"):
+        return JsonlOutput(path)
+    return JsonOutput(path)
+
+
+def save_seed(paths=("data/generated.json",), **params) -> int:
+    """Генерирует данные (параметры generate) сразу во все paths; возвращает число транзакций."""
+    for path in paths:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    outputs = [open_output(path) for path in paths]
+    total = 0
+    for table, payload in generate(**params):
+        if table == "transactions":
+            total += len(payload["id"])
+        for out in outputs:
+            out.write(table, payload)
+    for out in outputs:
+        out.close()
+    return total
+
 
 if __name__ == "__main__":
-    save_seed()
+    parser = argparse.ArgumentParser(description="Синтетические данные в схеме seed.json")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk", type=int, default=200_000)
+    parser.add_argument("--out", action="append", help=".json / .jsonl / .fmsnap (можно несколько)")
+    args = parser.parse_args()
+    paths = args.out or ["data/generated.json"]
+    n = save_seed(paths, users=args.users, transactions=args.transactions, months=args.months,
+                  start=args.start, seed=args.seed, chunk=args.chunk)
+    print(f"{n} transactions -> {', '.join(paths)}")
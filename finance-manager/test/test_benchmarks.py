@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+# Бенчмарки выключены по умолчанию: обычный прогон pytest остаётся быстрым.
+pytestmark = pytest.mark.skipif(not os.environ.get("FM_BENCH"), reason="set FM_BENCH=1 to run benchmarks")
+
+if os.environ.get("FM_BENCH"):
+    from bench import suite
+
+    SIZES, CASES = suite.sizes(), list(suite.CASES)
+else:
+    SIZES, CASES = [], []
+
+
+@pytest.fixture(scope="module")
+def results():
+    measured = {}
+    yield measured
+    suite.write_json(suite.RESULTS, {**suite.read_json(suite.RESULTS), **measured})
+    if os.environ.get("FM_BENCH_UPDATE"):
+        suite.write_json(suite.BASELINES, {**suite.read_json(suite.BASELINES), **measured})
+
+
+@pytest.fixture(scope="module", params=SIZES)
+def dataset(request, tmp_path_factory):
+    return suite.Dataset(str(tmp_path_factory.mktemp("bench")), request.param)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_benchmark(case, dataset, results):
+    func = suite.CASES[case](dataset)
+    elapsed = suite.measure(func, dataset.n)
+    name = suite.key(case, dataset.n)
+    results[name] = round(elapsed, 6)
+    baseline = suite.read_json(suite.BASELINES).get(name)
+    if not os.environ.get("FM_BENCH_UPDATE"):
+        assert not suite.regression(elapsed, baseline), (
+            f"{name}: {elapsed * 1000:.1f} ms vs baseline {baseline * 1000:.1f} ms (x{suite.TOLERANCE} allowed)"
+        )
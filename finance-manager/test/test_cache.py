@@ -0,0 +1,31 @@
+from core.cache import DerivedCache
+
+def _counter():
+    calls = []
+    def build():
+        calls.append(1)
+        return len(calls)
+    return calls, build
+
+def test_memoized_until_write_in_scope():
+    cache = DerivedCache()
+    calls, build = _counter()
+    assert cache.get(1, "report", build) == 1
+    assert cache.get(1, "report", build) == 1
+    cache.bump(2)                       # запись другого пользователя
+    assert cache.get(1, "report", build) == 1
+    cache.bump(1)
+    assert cache.get(1, "report", build) == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+
+def test_bump_all_and_version_monotonic():
+    cache = DerivedCache()
+    calls, build = _counter()
+    cache.get(1, "a", build)
+    cache.get(2, "a", build)
+    v1 = cache.bump(1, 2)
+    v2 = cache.bump()
+    assert v2 > v1
+    cache.get(1, "a", build)
+    cache.get(2, "a", build)
+    assert len(calls) == 4
@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from core.cube import Cube
+from core.frame import TransactionFrame
+from core.frp import EventBus
+from core.recursion import CategoryTree
+from core.service import ReportService
+from core.transforms import sum_by_category
+from core.views import TRANSACTION_ADDED, TRANSACTION_DELETED, TRANSACTION_EDITED
+
+categories = [
+    {"id": 1, "name": "дом", "parent_id": None},
+    {"id": 2, "name": "коммуналка", "parent_id": 1},
+    {"id": 3, "name": "работа", "parent_id": None},
+]
+transactions = [
+    {"id": 1, "user_id": 1, "acc_id": 10, "cat_id": 1, "amount": -100.0, "date": "2025-01-03"},
+    {"id": 2, "user_id": 1, "acc_id": 10, "cat_id": 2, "amount": -40.5, "date": "2025-01-20"},
+    {"id": 3, "user_id": 1, "acc_id": 11, "cat_id": 3, "amount": 1000.0, "date": "2025-01-25"},
+    {"id": 4, "user_id": 1, "acc_id": 10, "cat_id": 2, "amount": -60.0, "date": "2025-02-02"},
+    {"id": 5, "user_id": 2, "acc_id": 20, "cat_id": 2, "amount": -5.0, "date": "2025-02-10"},
+]
+
+def test_slice_dice_rollup():
+    cube = Cube(transactions)
+    assert len(cube) == 5
+    by_month = cube.rollup(("month",), {"user_id": 1})
+    assert by_month == {
+        "2025-01": {"income": 1000.0, "expense": 140.5, "n_income": 1, "n_expense": 2},
+        "2025-02": {"income": 0.0, "expense": 60.0, "n_income": 0, "n_expense": 1},
+    }
+    diced = cube.dice({"cat_id": [2, 3], "month": "2025-02"})
+    assert diced.rollup(("user_id", "acc_id")) == {
+        (1, 10): {"income": 0.0, "expense": 60.0, "n_income": 0, "n_expense": 1},
+        (2, 20): {"income": 0.0, "expense": 5.0, "n_income": 0, "n_expense": 1},
+    }
+    assert cube.slice("user_id", 2).totals()["expense"] == 5.0
+    assert cube.totals({"user_id": 3}) == {"income": 0.0, "expense": 0.0, "n_income": 0, "n_expense": 0}
+    tree = cube.rollup_tree(CategoryTree(categories), {"user_id": 1})
+    assert tree[1]["expense"] == 200.5 and tree[1]["n_expense"] == 3 and tree[2]["expense"] == 100.5
+    assert ReportService(aggregators=[sum_by_category]).category_report(cube, 2) == {2: -105.5}
+
+def test_incremental_matches_rebuild():
+    bus = EventBus()
+    cube = Cube(transactions[:2]).subscribe(bus)
+    cube.rollup(("cat_id",), {"user_id": 1})  # индексы уже построены — дальше поддерживаются записью
+    for t in transactions[2:]:
+        bus.publish(TRANSACTION_ADDED, {"transaction": t})
+    edited = {**transactions[3], "cat_id": 1, "amount": -70.0}
+    bus.publish(TRANSACTION_EDITED, {"old": transactions[3], "new": edited})
+    bus.publish(TRANSACTION_DELETED, {"transaction": transactions[4]})
+    expected = Cube(transactions[:3] + [edited])
+    assert cube._cells == expected._cells
+    assert cube.rollup(("user_id",)) == expected.rollup(("user_id",)) and 2 not in cube.rollup(("user_id",))
+    assert cube.totals({"cat_id": 2, "month": "2025-02"})["n_expense"] == 0
+
+def test_parallel_and_frame_rebuild():
+    cube = Cube(transactions)
+    with ThreadPoolExecutor(2) as executor:
+        assert Cube.build(transactions, executor, chunk=2)._cells == cube._cells
+        frame = TransactionFrame.from_dicts(transactions, 100)
+        assert Cube.from_frame(frame)._cells == cube._cells
+        assert Cube.from_frame(frame, executor, chunk=2)._cells == cube._cells
+    assert Cube.from_frame(TransactionFrame.from_dicts([])).rollup(("month",)) == {}
@@ -0,0 +1,30 @@
+from core.decode import decode_rows, decode_seed, decode_transactions, to_minor
+from core.domain import Budget, Transaction
+
+seed = {
+    "users": [{"id": 1, "name": "A"}],
+    "accounts": [{"id": 1, "user_id": 1, "name": "Kaspi", "balance": 10.5}],
+    "categories": [{"id": 4, "user_id": 1, "name": "Food", "parent_id": None}],
+    "transactions": [
+        {"id": 1, "user_id": 1, "acc_id": 1, "cat_id": 4, "amount": -200.55, "date": "2025-01-02"},
+        {"id": 2, "acc_id": 1, "cat_id": 4, "amount": 0.1},
+    ],
+    "budgets": [{"id": 1, "user_id": 1, "cat_id": 4, "limit": 1000.0}],
+}
+
+def test_decode_transactions_minor_units():
+    t1, t2 = decode_transactions(seed["transactions"])
+    assert t1 == Transaction(1, 1, 4, -20055, "2025-01-02")
+    assert t2.amount == 10 and t2.ts == "" and t2.note is None
+    assert not hasattr(t1, "__dict__")
+    assert to_minor(-200.55) == -20055
+
+def test_decode_seed_and_generic_spec():
+    decoded = decode_seed(seed)
+    assert decoded["accounts"][0].balance == 1050
+    assert decoded["budgets"][0] == Budget(1, 4, 100000, "month")
+    assert decoded["categories"][0].parent_id is None
+    (b,) = decode_rows(Budget, seed["budgets"], (
+        ("id", None, None), ("cat_id", None, None), ("limit", 0, int), ("period", "week", None),
+    ))
+    assert b == Budget(1, 4, 1000, "week")
@@ -1,4 +1,6 @@
-from core.forecast import forecast_expenses, measure_time, _make_hashable
+from core.forecast import forecast_expenses, measure_time, _make_hashable, ForecastEngine, forecast_all
+from core.frp import EventBus
+from core.views import TRANSACTION_ADDED, TRANSACTION_EDITED, TRANSACTION_DELETED
 
 transactions = [
     {"cat_id": "food", "amount": -100},
@@ -15,7 +17,75 @@ def test_forecast_empty():
     result = forecast_expenses("rent", hashable, 3)
     assert result == 0
 
-def test_cache_speed():
-    uncached, t1 = measure_time(forecast_expenses.__wrapped__, "food", hashable, 3)
-    cached, t2 = measure_time(forecast_expenses, "food", hashable, 3)
-    assert t2 <= t1
+def test_measure_time():
+    result, ms = measure_time(forecast_expenses, "food", hashable, 3)
+    assert result == 200 and ms >= 0
+
+def test_forecast_expenses_follows_history():
+    assert forecast_expenses("food", hashable, 3) == 200
+    assert forecast_expenses("food", _make_hashable(transactions[:1]), 3) == 100
+    assert forecast_expenses("food", hashable, 3) == 200
+
+def test_engine_answers_repeated_queries_from_cache():
+    engine = ForecastEngine(dict(t) for t in hashable)
+    assert [engine.forecast("food", 3), engine.forecast("rent", 3), engine.forecast("food", 3)] == [200, 0, 200]
+    assert (engine.hits, engine.misses) == (1, 2)
+
+def test_engine_matches_legacy():
+    engine = ForecastEngine(transactions)
+    assert engine.forecast("food", 3) == forecast_expenses("food", hashable, 3)
+    assert engine.forecast("food", 2) == 250
+    assert engine.forecast("rent", 3) == 0
+    assert engine.forecast_all(3) == {"food": 200}
+
+def test_engine_cache_invalidated_on_write():
+    engine = ForecastEngine(transactions, maxsize=2)
+    engine.forecast("food", 3)
+    engine.forecast("food", 3)
+    assert (engine.hits, engine.misses) == (1, 1)
+    engine.add({"cat_id": "food", "amount": -600})
+    assert engine.forecast("food", 3) == 366
+    engine.forecast("food", 1)
+    engine.forecast("food", 2)
+    assert len(engine._cache) == 2
+
+def test_engine_events():
+    bus = EventBus()
+    engine = ForecastEngine([{"id": 1, "cat_id": "food", "amount": -100}]).subscribe(bus)
+    bus.publish(TRANSACTION_ADDED, {"transaction": {"id": 2, "cat_id": "food", "amount": -300}})
+    assert engine.forecast("food", 2) == 200
+    bus.publish(TRANSACTION_EDITED, {"old": {"id": 1, "cat_id": "food", "amount": -100},
+                                     "new": {"id": 1, "cat_id": "food", "amount": -500}})
+    assert engine.forecast("food", 1) == 300
+    bus.publish(TRANSACTION_DELETED, {"transaction": {"id": 2, "cat_id": "food", "amount": -300}})
+    assert engine.forecast("food", 2) == 500
+
+dated = [
+    {"cat_id": "food", "amount": -100, "date": "2025-01-02"},
+    {"cat_id": "snacks", "amount": -50, "date": "2025-03-01"},
+    {"cat_id": "food", "amount": -300, "date": "2025-03-05"},
+    {"cat_id": "salary", "amount": 1000, "date": "2025-03-05"},
+]
+tree = [{"id": "food", "parent_id": None}, {"id": "snacks", "parent_id": "food"}]
+
+def test_forecast_all_mean_matches_loop():
+    rows = {r.cat_id: r for r in forecast_all(dated, 2)}
+    for cat_id in ("food", "snacks"):
+        assert rows[cat_id].forecast == forecast_expenses(cat_id, _make_hashable(dated), 2)
+    assert "salary" not in rows
+
+def test_forecast_all_rollup_monthly():
+    rows = {r.cat_id: r for r in forecast_all(dated, 2, categories=tree, bucket="month")}
+    assert rows["food"].forecast == 150      # январь 100, февраль 0, март 300
+    assert rows["food"].rollup == 175        # март 300 + 50
+    assert rows["food"].observations == 3
+    assert rows["snacks"].rollup == rows["snacks"].forecast == 50
+
+def test_forecast_all_smoothing_models():
+    flat = [{"cat_id": "rent", "amount": -100, "date": f"2025-{m:02d}-01"} for m in range(1, 7)]
+    for model in ("ewma", "holt"):
+        assert forecast_all(flat, 3, model, bucket="month")[0].forecast == 100
+    growing = [{"cat_id": "rent", "amount": -100 * m, "date": f"2025-{m:02d}-01"} for m in range(1, 7)]
+    ewma = forecast_all(growing, 3, "ewma", bucket="month")[0].forecast
+    holt = forecast_all(growing, 3, "holt", bucket="month")[0].forecast
+    assert ewma < holt
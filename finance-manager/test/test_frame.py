@@ -0,0 +1,45 @@
+from core.domain import Transaction
+from core.frame import TransactionFrame
+from core.transforms import sum_amounts, sum_by_category
+from app.core import account_balance
+
+rows = [
+    {"id": 1, "user_id": 1, "acc_id": 1, "cat_id": 1, "amount": 1000.0, "date": "2025-01-05"},
+    {"id": 2, "user_id": 1, "acc_id": 1, "cat_id": 2, "amount": -200.5, "date": "2025-01-10"},
+    {"id": 3, "user_id": 1, "acc_id": 2, "cat_id": 2, "amount": -50.0, "date": "2025-02-01"},
+    {"id": 4, "user_id": 2, "acc_id": 2, "cat_id": 3, "amount": -70.0},
+]
+
+models = (
+    Transaction("t1", "acc1", "food", -100, "2025-01-01"),
+    Transaction("t2", "acc1", "salary", 500, "2025-01-02"),
+    Transaction("t3", "acc2", "food", -300, "2025-01-03"),
+)
+
+def test_from_models():
+    f = TransactionFrame.from_models(models)
+    assert len(f) == 3
+    assert f.group_sum("cat") == {"food": -400, "salary": 500}
+    assert f.group_sum("acc") == {"acc1": 400, "acc2": -300}
+    assert f.totals() == {"income": 500, "expense": 400}
+
+def test_from_dicts_scale_and_masks():
+    f = TransactionFrame.from_dicts(rows, scale=100)
+    assert f.income_expense("cat", f.mask_user(1)) == {
+        1: {"income": 1000.0, "expense": 0.0},
+        2: {"income": 0.0, "expense": 250.5},
+    }
+    assert f.sum(f.mask_date_range("2025-01-01", "2025-01-31")) == 799.5
+    assert f.group_sum("cat", f.mask_user(99)) == {}
+    assert len(f.filter(f.mask_expense())) == 3
+
+def test_transforms_dispatch():
+    f = TransactionFrame.from_dicts(rows, scale=100)
+    assert sum_amounts(f) == sum_amounts(rows) == 679.5
+    assert sum_by_category(f, 2) == sum_by_category(rows, 2) == -250.5
+    assert account_balance(f, 2) == -120
+
+def test_group_sum_exact_for_huge_amounts():
+    big = 2 ** 60
+    f = TransactionFrame.from_columns([big, 1, -big], ["a", "a", "b"], [1, 1, 1], [1, 1, 1], [None] * 3)
+    assert f.group_sum("cat") == {"a": big + 1, "b": -big}
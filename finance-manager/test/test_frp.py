@@ -1,5 +1,6 @@
+import asyncio
 import pytest
-from core.frp import EventBus
+from core.frp import AsyncEventBus, EventBus
 from core.frp import update_balance, check_budget, create_alert
 
 def test_eventbus_subscribe_publish():
@@ -36,3 +37,55 @@ def test_multiple_events_sequence():
     res2 = bus.publish("BUDGET_ALERT", {"cat_id": "food", "amount": 500})
     assert res1[0]["a1"] == 100
     assert "BUDGET_ALERT" in res2[0]["alerts"][0]
+
+def test_async_bus_batches_and_keeps_order():
+    batches, single = [], []
+
+    async def main():
+        async with AsyncEventBus(maxsize=4, batch_size=3) as bus:
+            bus.subscribe("TRANSACTION_ADDED", lambda events: batches.append([e.payload["n"] for e in events]), batch=True)
+            bus.subscribe("TRANSACTION_ADDED", lambda event, payload: single.append(payload["n"]), offload=True)
+            for n in range(10):
+                await bus.publish("TRANSACTION_ADDED", {"n": n})
+                assert bus._queues["TRANSACTION_ADDED"].qsize() <= 4
+            await bus.publish("UNKNOWN_EVENT", {"x": 1})
+    asyncio.run(main())
+    assert [n for batch in batches for n in batch] == list(range(10))
+    assert max(len(batch) for batch in batches) <= 3
+    assert single == list(range(10))
+
+def test_async_bus_handler_error_does_not_stop_delivery():
+    seen = []
+
+    def flaky(events):
+        if events[0].payload["n"] == 0:
+            raise ValueError("boom")
+        seen.extend(e.payload["n"] for e in events)
+
+    async def main():
+        async with AsyncEventBus(batch_size=1) as bus:
+            bus.subscribe("X", flaky, batch=True)
+            for n in range(3):
+                await bus.publish("X", {"n": n})
+            return bus
+    bus = asyncio.run(main())
+    assert seen == [1, 2]
+    assert isinstance(bus.errors[0][1], ValueError)
+
+def test_async_bus_per_event_error_loses_only_that_event():
+    seen = []
+
+    def flaky(event, payload):
+        if payload["n"] == 0:
+            raise ValueError("boom")
+        seen.append(payload["n"])
+
+    async def main():
+        async with AsyncEventBus(batch_size=8) as bus:
+            bus.subscribe("X", flaky)
+            for n in range(5):
+                await bus.publish("X", {"n": n})  # одна пачка: воркер ещё не запускался
+            return bus
+    bus = asyncio.run(main())
+    assert seen == [1, 2, 3, 4]
+    assert len(bus.errors) == 1 and isinstance(bus.errors[0][1], ValueError)
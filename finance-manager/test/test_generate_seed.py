@@ -0,0 +1,33 @@
+from core.journal import empty_data, load, read_journal, replay
+from core.recursion import CategoryTree
+from data.generate_seed import save_seed
+
+def generate(tmp_path, name, **params):
+    paths = [str(tmp_path / f"{name}{ext}") for ext in (".json", ".jsonl", ".fmsnap")]
+    n = save_seed(paths, users=5, transactions=2000, months=3, chunk=500, **params)
+    return n, paths
+
+def test_formats_agree_and_schema(tmp_path):
+    n, (json_path, jsonl_path, snap_path) = generate(tmp_path, "a")
+    data = load(json_path)
+    assert n == len(data["transactions"]) >= 2000
+    assert load(snap_path) == data
+    assert replay(empty_data(), read_journal(jsonl_path)) == data
+    assert len(data["users"]) == 5
+    user_ids = {u["id"] for u in data["users"]}
+    for table in ("accounts", "categories", "transactions", "budgets"):
+        assert {row["user_id"] for row in data[table]} <= user_ids
+    tree = CategoryTree(data["categories"])
+    assert max(len(tree.path(c["id"])) for c in data["categories"]) == 3
+    dates = [t["date"] for t in data["transactions"] if t["user_id"] == 1]
+    assert dates == sorted(dates) and dates[0] >= "2025-01-01" and dates[-1] < "2025-04-01"
+
+def test_reproducible_with_recurring_salary(tmp_path):
+    _, (first, *_) = generate(tmp_path, "a", seed=3)
+    _, (second, *_) = generate(tmp_path, "b", seed=3)
+    _, (other, *_) = generate(tmp_path, "c", seed=4)
+    with open(first, "rb") as a, open(second, "rb") as b, open(other, "rb") as c:
+        body = a.read()
+        assert body == b.read() and body != c.read()
+    salary = [t for t in load(first)["transactions"] if t["note"] == "Зарплата"]
+    assert len(salary) == 5 * 3 and all(t["amount"] > 0 for t in salary)
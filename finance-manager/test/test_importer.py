@@ -0,0 +1,95 @@
+import io
+
+import pytest
+
+from core.domain import Transaction
+from core.importer import SeenHashes, chunked, content_hash, import_csv, parse_amount, parse_date
+
+accounts = [{"id": 1, "user_id": 1, "name": "Kaspi"}, {"id": 2, "user_id": 1, "name": "Cash"}]
+categories = [{"id": 10, "user_id": 1, "name": "Food"}, {"id": 11, "user_id": 1, "name": "Salary"}]
+
+CSV = """date;amount;account;category;note
+2025-01-05;-1 200,50;Kaspi;food;lunch
+2025-01-05;-1 200,50;Kaspi;food;lunch
+2025-01-06;350000;cash;Salary;
+2025-01-07;abc;Kaspi;Food;
+2025-01-08;-500;Unknown;Food;taxi
+2025-01-09;-70;;;coffee
+"""
+
+def _run(existing=(), batch_size=2, account_id=None, category_id=None):
+    batches = []
+    result = import_csv(
+        io.StringIO(CSV), batches.append, 1, accounts, categories,
+        existing=existing, next_id=100, delimiter=";", batch_size=batch_size,
+        account_id=account_id, category_id=category_id,
+    )
+    return result, batches
+
+def test_parse_amount():
+    assert parse_amount("-1 234,50") == -1234.5
+    assert parse_amount("1,234.50") == 1234.5
+    assert parse_amount("−500") == -500.0
+    assert parse_amount("1.234,50") == 1234.5
+    assert parse_amount("1 234 567.8") == 1234567.8
+    assert parse_amount("1,234,567") == 1234567.0
+    assert parse_amount("-0,125") == -0.125 and parse_amount("12,5") == 12.5 and parse_amount(".5") == 0.5
+    for bad in ("1,234", "1.234", "1,234.5.6", "12,34,567.00", "1,2a"):
+        with pytest.raises(ValueError):
+            parse_amount(bad)
+
+def test_parse_date_and_bad_dates_rejected():
+    assert parse_date("01.03.2025") == parse_date(" 2025-03-01T10:00 ") == "2025-03-01"
+    assert parse_date("") == ""
+    for bad in ("03/01/2025", "2025-03-01junk", "2025-13-01", "32.01.2025", "yesterday"):
+        with pytest.raises(ValueError):
+            parse_date(bad)
+    batches = []
+    result = import_csv(
+        io.StringIO("date;amount;account;category\n01.03.2025;-5;Kaspi;Food\n2025/03/02;-6;Kaspi;Food\n"),
+        batches.append, 1, accounts, categories, delimiter=";",
+    )
+    assert (result.imported, result.rejected) == (1, 1)
+    assert batches[0][0]["date"] == "2025-03-01"
+    assert result.errors == ["line 3: bad date '2025/03/02'"]
+
+def test_import_batches_dedupe_and_rejects():
+    result, batches = _run()
+    rows = [r for b in batches for r in b]
+    assert (result.imported, result.duplicates, result.rejected) == (2, 1, 3)
+    assert all(len(b) <= 2 for b in batches)
+    assert rows[0] == {"id": 100, "user_id": 1, "acc_id": 1, "cat_id": 10,
+                       "amount": -1200.5, "date": "2025-01-05", "note": "lunch"}
+    assert rows[1]["id"] == 101 and rows[1]["acc_id"] == 2 and rows[1]["cat_id"] == 11
+    assert result.errors[0] == "line 5: bad amount 'abc'"
+
+def test_defaults_and_existing_duplicates():
+    first, batches = _run(account_id=2, category_id=10)
+    assert first.imported == 4 and first.rejected == 1
+    again, batches = _run(existing=[r for b in batches for r in b], account_id=2, category_id=10)
+    assert again.imported == 0 and again.duplicates == 5
+
+def test_seen_hashes_window():
+    stored = [{"acc_id": 1, "cat_id": 10, "amount": -5.0, "date": "2025-01-01", "note": None}]
+    lookups = []
+    def lookup(date):
+        lookups.append(date)
+        return [r for r in stored if r["date"] == date]
+    seen = SeenHashes(lookup, window=1)
+    old = Transaction(None, 1, 10, -5, "2025-01-01", None)
+    new = Transaction(None, 1, 10, -7, "2025-01-02", None)
+    assert not seen.add(old) and seen.add(new) and not seen.add(new)
+    stored.append({"acc_id": 1, "cat_id": 10, "amount": -7.0, "date": "2025-01-02", "note": None})
+    seen.committed([])
+    assert len(seen._hashes) == 1
+    assert not seen.add(old) and not seen.add(new)  # вытесненная дата прочитана заново
+    assert lookups == ["2025-01-01", "2025-01-02", "2025-01-01"]
+    rows = SeenHashes(window=0)
+    assert rows.add(new)
+    rows.committed([{"acc_id": 1, "cat_id": 10, "amount": -7, "date": "2025-01-02", "note": None}])
+    assert not rows._hashes and not rows.add(new)
+
+def test_chunked_and_hash():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    a = Transaction(None, 1, 10, -5, "2025-01-01", None)
+    assert content_hash(a) == content_hash(Transaction(7, 1, 10, -5.0, "2025-01-01", ""))
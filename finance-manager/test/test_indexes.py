@@ -0,0 +1,47 @@
+from core.indexes import IndexManager
+
+data = {
+    "accounts": [{"id": 1, "user_id": 1, "name": "Kaspi"}, {"id": 2, "user_id": 2, "name": "Cash"}],
+    "transactions": [
+        {"id": 1, "user_id": 1, "acc_id": 1, "cat_id": 5, "amount": -10.0},
+        {"id": 2, "user_id": 1, "acc_id": 1, "cat_id": 6, "amount": 100.0},
+        {"id": 2, "user_id": 1, "acc_id": 1, "cat_id": 7, "amount": -3.0},
+        {"id": 3, "user_id": 2, "acc_id": 2, "cat_id": 5, "amount": -7.0},
+    ],
+}
+
+def _ids(rows):
+    return [(r["id"], r["cat_id"]) for r in rows]
+
+def test_query_uses_posting_lists():
+    index = IndexManager(data)
+    assert _ids(index.query("transactions", user_id=1)) == [(1, 5), (2, 6), (2, 7)]
+    assert _ids(index.query("transactions", user_id=1, cat_id=5)) == [(1, 5)]
+    assert index.query("transactions", user_id=99) == []
+    assert index.count("transactions", cat_id=5) == 2
+    assert index.by_id("accounts")[2]["name"] == "Cash"
+
+def test_incremental_put_and_delete():
+    index = IndexManager(data)
+    index.put("transactions", {"id": 1, "user_id": 1, "acc_id": 1, "cat_id": 6, "amount": -20.0})
+    assert _ids(index.query("transactions", user_id=1)) == [(1, 6), (2, 6), (2, 7)]
+    assert index.count("transactions", cat_id=5) == 1
+    index.put("transactions", {"id": 4, "user_id": 2, "acc_id": 2, "cat_id": 5, "amount": -1.0})
+    assert _ids(index.query("transactions", user_id=2)) == [(3, 5), (4, 5)]
+    index.delete("transactions", 2)
+    assert _ids(index.query("transactions", user_id=1)) == [(1, 6)]
+    index.delete("transactions", 3)
+    index.delete("transactions", 4)
+    assert index.query("transactions", user_id=2) == []
+    assert index.count("transactions", cat_id=5) == 0
+
+def test_put_replaces_last_duplicate_like_storage():
+    index = IndexManager(data)
+    assert index.get("transactions", 2)["cat_id"] == 7
+    index.put("transactions", {"id": 2, "user_id": 2, "acc_id": 2, "cat_id": 7, "amount": -4.0})
+    assert _ids(index.query("transactions", user_id=1)) == [(1, 5), (2, 6)]
+    assert _ids(index.query("transactions", user_id=2)) == [(3, 5), (2, 7)]
+    assert index.get("transactions", 2)["amount"] == -4.0 and len(index.by_id("transactions")) == 4
+    index.delete("transactions", 2)
+    index.put("transactions", {"id": 2, "user_id": 1, "acc_id": 1, "cat_id": 8, "amount": 1.0})
+    assert _ids(index.query("transactions", user_id=1)) == [(1, 5), (2, 8)]
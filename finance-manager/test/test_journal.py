@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from core.journal import Journal, load, journal_path
+from app.core import load_seed
+
+seed = {
+    "users": [{"id": 1, "name": "Dias"}],
+    "accounts": [{"id": 1, "user_id": 1, "name": "Card"}],
+    "categories": [{"id": 1, "user_id": 1, "name": "Food"}],
+    "transactions": [
+        {"id": 1, "user_id": 1, "acc_id": 1, "cat_id": 1, "amount": -100},
+        {"id": 2, "user_id": 1, "acc_id": 1, "cat_id": 1, "amount": 200},
+    ],
+    "budgets": [],
+}
+
+def _write_seed(tmp_path):
+    path = tmp_path / "seed.json"
+    path.write_text(json.dumps(seed), encoding="utf-8")
+    return str(path)
+
+def test_put_and_delete_replayed(tmp_path):
+    path = _write_seed(tmp_path)
+    j = Journal(path)
+    j.put("transactions", {"id": 3, "user_id": 1, "acc_id": 1, "cat_id": 1, "amount": -50})
+    j.put("transactions", {"id": 2, "user_id": 1, "acc_id": 1, "cat_id": 1, "amount": 250})
+    j.delete("transactions", 1)
+    data = load(path)
+    assert [(t["id"], t["amount"]) for t in data["transactions"]] == [(2, 250), (3, -50)]
+    # снапшот не переписывался
+    assert json.loads(open(path, encoding="utf-8").read()) == seed
+
+def test_compact(tmp_path):
+    path = _write_seed(tmp_path)
+    j = Journal(path, compact_every=2, ratio=0)
+    j.put("users", {"id": 2, "name": "Vlad"})
+    assert not j.needs_compaction()
+    j.delete("users", 1)
+    assert j.needs_compaction()
+    j.compact()
+    assert j.pending == 0
+    assert not (tmp_path / "seed.json.journal").exists()
+    assert load(path)["users"] == [{"id": 2, "name": "Vlad"}]
+
+def test_compaction_waits_for_journal_to_reach_snapshot_size(tmp_path):
+    path = _write_seed(tmp_path)
+    j = Journal(path, compact_every=2)
+    rewrites = 0
+    for i in range(3, 200, 10):
+        j.put_many("transactions", [{"id": k, "amount": -1} for k in range(i, i + 10)])
+        if j.needs_compaction():
+            j.compact()
+            rewrites += 1
+    # снапшот переписывается при удвоении, а не после каждой пачки
+    assert 1 <= rewrites <= 5 and len(load(path)["transactions"]) == 202
+
+def test_reset_and_missing_snapshot(tmp_path):
+    path = str(tmp_path / "none.json")
+    j = Journal(path)
+    j.put("users", {"id": 1, "name": "A"})
+    j.reset()
+    j.put("users", {"id": 2, "name": "B"})
+    assert load(path)["users"] == [{"id": 2, "name": "B"}]
+    assert Journal(path).pending == 3
+
+def test_torn_last_record_ignored(tmp_path):
+    path = _write_seed(tmp_path)
+    Journal(path).delete("transactions", 1)
+    with open(journal_path(path), "a", encoding="utf-8") as f:
+        f.write('{"op": "del", "table": "transac')
+    assert [t["id"] for t in load(path)["transactions"]] == [2]
+    # следующая запись не склеивается с оборванной строкой
+    Journal(path).put("users", {"id": 2, "name": "Vlad"})
+    assert [u["id"] for u in load(path)["users"]] == [1, 2]
+    with open(journal_path(path), "a", encoding="utf-8") as f:
+        f.write("not json\n")
+    Journal(path).put("users", {"id": 3, "name": "Aru"})
+    with pytest.warns(RuntimeWarning, match="journal record"):
+        assert [u["id"] for u in load(path)["users"]] == [1, 2, 3]
+
+def test_load_seed_sees_journal(tmp_path):
+    path = _write_seed(tmp_path)
+    Journal(path).put("accounts", {"id": 2, "user_id": 1, "name": "Cash"})
+    acc, cat, trans, bud = load_seed(path)
+    assert len(acc) == 2
+    assert len(trans) == 2
+
+def test_delete_removes_duplicate_ids(tmp_path):
+    path = tmp_path / "dup.json"
+    rows = [{"id": 11, "amount": -1}, {"id": 12, "amount": -2}, {"id": 11, "amount": -3}]
+    path.write_text(json.dumps({"transactions": rows}), encoding="utf-8")
+    Journal(str(path)).delete("transactions", 11)
+    assert load(str(path))["transactions"] == [{"id": 12, "amount": -2}]
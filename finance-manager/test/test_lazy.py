@@ -25,8 +25,7 @@ def test_iter_transactions():
 def test_lazy_top_categories():
     gen = lazy_top_categories(iter_transactions(transactions, lambda t: True), categories, 3)
     result = list(gen)
-    assert result[-2][0] == "transport"
-    assert result[-1][0] == "leisure" or result[-1][0] in {"food", "leisure"}  
+    assert result == [("food", 400), ("transport", 200), ("leisure", 50)]
 
 def test_empty_predicate():
     gen = iter_transactions(transactions, lambda t: t.amount < -1000)
@@ -34,12 +33,21 @@ def test_empty_predicate():
 
 def test_top_category_counter_order():
     gen = lazy_top_categories(iter_transactions(transactions, lambda t: True), categories, 3)
-    last = None
-    for cat_id, total in gen:
-        last = (cat_id, total)
-    assert last is not None
+    totals = [total for _, total in gen]
+    assert totals == sorted(totals, reverse=True)
 
 def test_cat_not_included():
     cat = Category("salary", "Salary", None, "income")
     gen = lazy_top_categories(iter_transactions(transactions, lambda t: True), (cat,), 1)
     assert list(gen) == []
+
+def test_top_k_is_bounded_and_exact_with_more_categories_than_k():
+    assert list(lazy_top_categories(iter(transactions), categories, 1)) == [("food", 400)]
+    assert list(lazy_top_categories(iter(transactions), categories, 0)) == []
+    bounded = list(lazy_top_categories(iter(transactions), categories, 1, capacity=1))
+    assert bounded == [("leisure", 650)]  # один счётчик: верхняя оценка, а не 50
+
+def test_income_is_not_counted_as_spend():
+    refund = Transaction("t5", "acc1", "leisure", 1000, "2025-01-05", "refund")
+    result = list(lazy_top_categories(iter(transactions + (refund,)), categories, 3))
+    assert result == [("food", 400), ("transport", 200), ("leisure", 50)]
@@ -0,0 +1,40 @@
+from core.filters import by_date_range
+from core.ledger import Ledger
+from core.service import BudgetService
+from core.transforms import filter_month, sum_amounts
+
+transactions = [
+    {"id": 1, "amount": -100, "date": "2025-02-03"},
+    {"id": 2, "amount": 500, "date": "2025-01-05"},
+    {"id": 3, "amount": -40, "date": "2025-01-31"},
+    {"id": 4, "amount": -7, "month": "2025-01"},
+    {"id": 5, "amount": -1},
+    {"id": 6, "amount": -20, "date": "2025-03-10T12:00"},
+]
+
+def test_sorted_and_partitioned():
+    ledger = Ledger(transactions)
+    assert len(ledger) == 6
+    assert ledger.months() == ["2025-01", "2025-02", "2025-03"]
+    assert [t["id"] for t in ledger] == [2, 3, 4, 1, 6, 5]
+    assert [t["id"] for t in filter_month(ledger, "2025-01")] == [2, 3, 4]
+    assert filter_month(ledger, "2024-12") == []
+
+def test_range_matches_predicate():
+    ledger = Ledger(transactions)
+    dated = [t for t in transactions if "date" in t]
+    for start, end in [("2025-01-05", "2025-02-03"), ("2025-01-06", "2025-03-10"), ("2024-01-01", "2026-01-01")]:
+        expected = sorted(filter(by_date_range(start, end[:10] + "T23:59"), dated), key=lambda t: t["date"])
+        assert ledger.range(start, end) == expected
+
+def test_add_remove():
+    ledger = Ledger(transactions[:3])
+    ledger.add({"id": 7, "amount": 1, "date": "2025-01-10"})
+    assert [t["id"] for t in ledger.month("2025-01")] == [2, 7, 3]
+    ledger.remove(transactions[2])
+    assert [t["id"] for t in ledger.range("2025-01-01", "2025-01-31")] == [2, 7]
+    assert len(ledger) == 3
+
+def test_monthly_report_on_partition():
+    svc = BudgetService(calculators=[sum_amounts])
+    assert svc.monthly_report(Ledger(transactions), "2025-01") == 453
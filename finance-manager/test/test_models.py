@@ -0,0 +1,17 @@
+from app.models import Account, Transaction, account_balance, dicts_to_transactions, total_balance
+
+accounts = (Account(1, 1, "Kaspi", 0.0), Account(2, 1, "Cash", 0.0))
+transactions = dicts_to_transactions([
+    {"id": 1, "user_id": 1, "acc_id": 1, "cat_id": 5, "amount": -100},
+    {"id": 2, "user_id": 1, "acc_id": 2, "cat_id": 5, "amount": 250.5},
+    {"id": 3, "user_id": 1, "acc_id": 3, "cat_id": 5, "amount": 1000},
+])
+
+def test_total_balance_matches_per_account_sum():
+    expected = sum(account_balance(transactions, a.id) for a in accounts)
+    assert total_balance(transactions, accounts) == expected == 150.5
+    assert total_balance(transactions, accounts + (accounts[0],)) == 50.5
+    assert total_balance((), accounts) == 0.0
+
+def test_models_are_plain_dataclasses():
+    assert transactions[1] == Transaction(2, 1, 2, 5, 250.5)
@@ -0,0 +1,51 @@
+from core.persistent import PMap, PVector, PersistentRows
+
+rows = [
+    {"id": 1, "user_id": 1, "amount": -10.0},
+    {"id": 2, "user_id": 1, "amount": 100.0},
+    {"id": 2, "user_id": 2, "amount": -3.0},
+]
+
+def test_vector_structural_sharing():
+    v = PVector.from_iterable(range(2000))
+    w = v.append(2000).set(5, "x")
+    assert list(v) == list(range(2000))
+    assert w[5] == "x" and w[-1] == 2000 and len(w) == 2001
+    assert list(PVector().append(1).append(2)) == [1, 2]
+
+def test_hamt_set_remove():
+    m = PMap()
+    for k in range(-500, 500):
+        m = m.set(k, k * 2)
+    m2 = m.remove(7).set(3, "x")
+    assert len(m) == 1000 and len(m2) == 999
+    assert m.get(7) == 14 and 7 not in m2 and m2.get(3) == "x"
+    assert dict(m2.items())[-500] == -1000
+
+def test_persistent_rows():
+    coll = PersistentRows.from_rows(rows)
+    added = coll.append({"id": coll.next_id(), "user_id": 1, "amount": 5.0})
+    edited = added.replace({"id": 1, "user_id": 1, "amount": -20.0})
+    deleted = edited.delete(2)
+    assert [r["amount"] for r in coll] == [-10.0, 100.0, -3.0]
+    assert [r["amount"] for r in edited] == [-20.0, 100.0, -3.0, 5.0]
+    assert [r["id"] for r in deleted] == [1, 3] and len(deleted) == 2
+    assert deleted.get(2) is None and deleted.get(3)["amount"] == 5.0
+    assert deleted.delete(1).delete(3).next_id() == 4
+    assert edited.get(3) is added.get(3)  # строки не копируются
+
+def test_duplicate_ids_follow_storage_and_replay(tmp_path):
+    import os
+    import shutil
+    from core.storage import JsonStorage
+    path = str(tmp_path / "seed.json")
+    shutil.copy(os.path.join(os.path.dirname(__file__), "..", "data", "seed.json"), path)
+    storage = JsonStorage(path)
+    trans = PersistentRows.from_rows(storage.data["transactions"])
+    assert trans.get(11)["amount"] == -5000.0  # последняя из трёх строк с id 11
+    edited = {**trans.get(11), "amount": -7000.0}
+    trans = trans.replace(edited)
+    storage.put("transactions", edited)
+    replayed = JsonStorage(path).data["transactions"]
+    assert trans.to_list() == storage.data["transactions"] == replayed
+    assert [t["user_id"] for t in trans if t["id"] == 11] == [3, 1, 1]
@@ -0,0 +1,55 @@
+from core.compose import pipe
+from core.filters import by_amount_range, by_category, by_date_range
+from core.frame import TransactionFrame
+from core.indexes import IndexManager
+from core.ledger import Ledger
+from core.query import where
+from core.transforms import sum_amounts
+
+transactions = [
+    {"id": 1, "cat_id": "food", "amount": -100, "date": "2025-01-03"},
+    {"id": 2, "cat_id": "food", "amount": -900, "date": "2025-01-10"},
+    {"id": 3, "cat_id": "rent", "amount": -500, "date": "2025-01-05"},
+    {"id": 4, "cat_id": "food", "amount": -50, "date": "2025-02-01"},
+    {"id": 5, "cat_id": "food", "amount": 300, "date": "2025-01-20"},
+]
+
+query = where(by_category("food"), by_date_range("2025-01-01", "2025-01-31"), by_amount_range(50, 500))
+
+def ids(rows):
+    return sorted(t["id"] for t in rows)
+
+def test_same_result_on_every_access_path():
+    expected = [1, 5]
+    assert ids(query.run(transactions)) == expected
+    assert ids(query.run(Ledger(transactions))) == expected
+    assert ids(query.run(IndexManager({"transactions": transactions}))) == expected
+    frame = query.run(TransactionFrame.from_dicts(transactions))
+    assert sorted(frame.amount.tolist()) == [-100, 300]
+
+def test_plan_picks_most_selective_index():
+    index = IndexManager({"transactions": transactions})
+    ledger = Ledger(transactions)
+    narrow = where(by_category("food"), by_date_range("2025-02-01", "2025-02-28"))
+    assert narrow.plan(transactions, ledger, index).access == "ledger"
+    assert where(by_category("rent"), by_date_range("2025-01-01", "2025-12-31")).plan(
+        transactions, ledger, index).access == "index"
+    assert where(by_amount_range(0, 10)).plan(transactions, ledger, index).access == "scan"
+
+def test_merge_and_custom_predicates():
+    assert where(by_category("food"), by_category("rent")).run(transactions) == []
+    overlap = where(by_date_range("2025-01-01", "2025-01-15"), by_date_range("2025-01-04", "2025-02-28"))
+    assert ids(overlap.run(transactions)) == [2, 3]
+    assert pipe(transactions, where(by_category("food"), lambda t: t["amount"] < 0), sum_amounts) == -1050
+
+def test_frame_custom_predicates_and_day_granularity():
+    frame = TransactionFrame.from_dicts(transactions)
+    spend = where(by_category("food"), lambda t: t["amount"] < 0 and t["date"] < "2025-01-15")
+    assert sorted(spend.run(frame).amount.tolist()) == [-900, -100]
+    assert where(lambda t: t["amount"] > 0).mask(frame).tolist() == [False, False, False, False, True]
+    late = transactions + [{"id": 6, "cat_id": "rent", "amount": -1, "date": "2025-01-31T10:00"}]
+    month = where(by_date_range("2025-01-01", "2025-01-31"), by_category("rent"))
+    assert ids(month.run(late)) == [3, 6]
+    assert ids(month.run(Ledger(late))) == [3, 6]
+    assert ids(month.run(late, Ledger(late))) == [3, 6]
+    assert len(month.run(TransactionFrame.from_dicts(late))) == 2
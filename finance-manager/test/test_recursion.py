@@ -1,4 +1,4 @@
-from core.recursion import flatten_categories, sum_expenses_recursive
+from core.recursion import CategoryTree, flatten_categories, sum_expenses_recursive
 
 cats = [
     {"id": "root", "parent_id": None},
@@ -19,3 +19,26 @@ def test_flatten_categories():
 def test_sum_expenses_recursive():
     total = sum_expenses_recursive(cats, transactions, "root")
     assert total == 250
+
+def test_flatten_from_none_and_unknown_root():
+    assert [c["id"] for c in flatten_categories(cats)] == ["root", "food", "snacks"]
+    assert flatten_categories(cats, "missing") == []
+
+def test_category_tree_membership_and_path():
+    tree = CategoryTree(cats)
+    assert tree.is_descendant("snacks", "root")
+    assert tree.is_descendant("food", "food")
+    assert not tree.is_descendant("root", "food")
+    assert [c["id"] for c in tree.path("snacks")] == ["root", "food", "snacks"]
+
+def test_category_tree_rollup():
+    totals = CategoryTree(cats).rollup(transactions)
+    assert totals == {"root": 250, "food": 250, "snacks": 50}
+
+def test_deep_tree_is_iterative():
+    depth = 5000
+    deep = [{"id": 0, "parent_id": None}] + [{"id": i, "parent_id": i - 1} for i in range(1, depth)]
+    trans = [{"cat_id": depth - 1, "amount": -1}]
+    assert len(flatten_categories(deep, 0)) == depth - 1
+    assert sum_expenses_recursive(deep, trans, 0) == 1
+    assert CategoryTree(deep).rollup(trans)[0] == 1
@@ -0,0 +1,44 @@
+from core.domain import Transaction
+from core.frame import TransactionFrame
+from core.reports import CategoryRow, build_report, category_totals, report
+
+categories = [
+    {"id": 1, "user_id": 1, "name": "Дом", "parent_id": None},
+    {"id": 2, "user_id": 1, "name": "Коммуналка", "parent_id": 1},
+    {"id": 3, "user_id": 1, "name": "Работа", "parent_id": None},
+]
+budgets = [{"id": 1, "user_id": 1, "cat_id": 1, "limit": 100.0}, {"id": 2, "user_id": 1, "cat_id": 99, "limit": 5.0}]
+rows = [
+    {"id": 1, "user_id": 1, "acc_id": 1, "cat_id": 2, "amount": -30.1},
+    {"id": 2, "user_id": 1, "acc_id": 1, "cat_id": 1, "amount": -20.0},
+    {"id": 3, "user_id": 1, "acc_id": 1, "cat_id": 3, "amount": 500.0},
+    {"id": 4, "user_id": 2, "acc_id": 2, "cat_id": 3, "amount": 7.0},
+    {"id": 5, "user_id": 1, "acc_id": 1, "cat_id": 42, "amount": -1.0},
+]
+
+def test_report_single_pass():
+    r = report(rows, categories, budgets, user_id=1)
+    assert (r.income, r.expense) == (500.0, 51.1)
+    assert r.by_category == (
+        CategoryRow("Коммуналка", 0.0, 30.1), CategoryRow("Дом", 0.0, 20.0),
+        CategoryRow("Работа", 500.0, 0.0), CategoryRow(None, 0.0, 1.0),
+    )
+    assert [row.name for row in r.by_subcategory] == ["Дом", "Дом → Коммуналка", "Работа"]
+    assert r.by_subcategory[0].expense == 50.1
+    (budget,) = r.budgets
+    assert budget.spent == 50.1 and budget.remaining == 49.9
+    assert r.expenses_by_name() == {"Коммуналка": 30.1, "Дом": 20.0, None: 1.0}
+
+def test_category_totals_inputs_agree():
+    by_dicts = category_totals(rows, user_id=1)
+    frame = TransactionFrame.from_dicts(rows, scale=100)
+    assert category_totals(frame, user_id=1) == by_dicts
+    models = [Transaction(t["id"], t["acc_id"], t["cat_id"], t["amount"], "") for t in rows]
+    assert category_totals(models)[3] == {"income": 507.0, "expense": 0.0}
+
+def test_same_name_categories_sum_in_minor_units():
+    cats = [{"id": i, "user_id": 1, "name": "Еда", "parent_id": None} for i in (1, 2, 3)]
+    totals = {1: {"income": 0.0, "expense": 0.1}, 2: {"income": 0.0, "expense": 0.2},
+              3: {"income": 0.0, "expense": 0.3}}
+    r = build_report(totals, cats)
+    assert r.by_category == (CategoryRow("Еда", 0.0, 0.6),)  # float: 0.1 + 0.2 + 0.3 == 0.6000000000000001
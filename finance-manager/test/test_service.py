@@ -1,4 +1,7 @@
-from core.service import BudgetService, ReportService
+import pytest
+
+from core.frame import TransactionFrame
+from core.service import BudgetService, ReportService, batch_calculator, per_row
 from core.transforms import filter_month, sum_amounts, sum_by_category
 
 def test_budget_service():
@@ -35,3 +38,51 @@ def test_multiple_aggregators():
     )
     result = svc.category_report(data, "food")
     assert result["food"] == 300
+
+def test_report_dispatches_on_batch_protocol_not_name():
+    data = [{"cat_id": "food", "amount": 100}, {"cat_id": "food", "amount": -40}]
+
+    @batch_calculator
+    def spend(rows, cat_id):
+        return sum(-t["amount"] for t in rows if t["cat_id"] == cat_id and t["amount"] < 0)
+    svc = ReportService(aggregators=[spend, lambda total, cat_id: -total])
+    assert svc.category_report(data, "food") == {"food": -40}
+
+rows = [
+    {"user_id": 1, "month": "2025-01", "date": "2025-01-03", "cat_id": "food", "amount": -30},
+    {"user_id": 2, "month": "2025-01", "date": "2025-01-09", "cat_id": "food", "amount": -20},
+    {"user_id": 1, "month": "2025-01", "date": "2025-01-15", "cat_id": "job", "amount": 500},
+    {"user_id": 1, "month": "2025-02", "date": "2025-02-01", "cat_id": "food", "amount": -45},
+    {"user_id": 2, "month": "2025-02", "date": "2025-02-20", "cat_id": "job", "amount": 0},
+]
+
+def test_batch_calculators_get_whole_groups():
+    calls = []
+
+    @batch_calculator
+    def spy(data, cat_id):
+        calls.append((cat_id, len(data)))
+        return sum_by_category(data, cat_id)
+
+    legacy = BudgetService(calculators=[lambda d, cat_id: sum(t["amount"] for t in d)])
+    batched = BudgetService(calculators=[spy], chunk=2)
+    assert batched.monthly_report(rows, "2025-01") == legacy.monthly_report(rows, "2025-01") == {"food": -50, "job": 500}
+    assert calls == [("food", 2), ("job", 1)]
+    assert per_row(sum_amounts) is sum_amounts
+
+def test_monthly_reports_single_pass():
+    svc = BudgetService(validators=[lambda d: [t for t in d if t["amount"]]], calculators=[sum_by_category], chunk=2)
+    assert svc.monthly_reports(rows) == {"2025-01": {"food": -50, "job": 500}, "2025-02": {"food": -45}}
+    assert svc.monthly_reports(rows, ["2025-02", "2025-03"]) == {"2025-02": {"food": -45}, "2025-03": 0}
+    assert svc.monthly_reports(rows, by_user=True) == {
+        (1, "2025-01"): {"food": -30, "job": 500}, (2, "2025-01"): {"food": -20}, (1, "2025-02"): {"food": -45},
+    }
+
+def test_frame_columnar_slices():
+    frame = TransactionFrame.from_dicts(rows)
+    svc = BudgetService(validators=[lambda f: f.filter(f.amount != 0)], calculators=[sum_by_category])
+    expected = BudgetService(validators=[lambda d: [t for t in d if t["amount"]]], calculators=[sum_by_category])
+    assert svc.monthly_reports(frame, by_user=True) == expected.monthly_reports(rows, by_user=True)
+    assert svc.monthly_report(frame, "2025-01") == {"food": -50, "job": 500}
+    with pytest.raises(TypeError):
+        BudgetService(calculators=[lambda d, cat_id: 0]).monthly_report(frame, "2025-01")
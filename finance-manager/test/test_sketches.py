@@ -0,0 +1,55 @@
+import random
+
+from core.frp import EventBus
+from core.lazy import iter_transactions
+from core.sketches import KLL, HyperLogLog, SketchView, tap
+from core.views import TRANSACTION_ADDED
+
+def test_kll_quantiles_and_merge():
+    rnd = random.Random(7)
+    values = [rnd.random() for _ in range(20000)]
+    left, right = KLL(), KLL()
+    for v in values[:12000]:
+        left.update(v)
+    for v in values[12000:]:
+        right.update(v)
+    merged = left.merge(right)
+    assert merged.n == 20000 and merged.min == min(values) and merged.max == max(values)
+    assert sum(len(items) for items in merged._levels) < 1000
+    ordered = sorted(values)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        assert abs(ordered.index(merged.quantile(q)) / 20000 - q) < 0.02
+
+def test_hyperloglog_count_and_merge():
+    a, b = HyperLogLog(), HyperLogLog()
+    for i in range(30000):
+        a.update(i)
+    for i in range(20000, 50000):
+        b.update(i)
+    assert abs(a.count() - 30000) / 30000 < 0.05
+    assert abs(a.merge(b).count() - 50000) / 50000 < 0.05
+    small = HyperLogLog()
+    for v in ["food", "rent", "food", 3]:
+        small.update(v)
+    assert small.count() == 3
+
+def test_tap_in_lazy_pipeline():
+    amounts = KLL()
+    rows = [{"amount": -i} for i in range(1, 101)]
+    out = list(tap(iter_transactions(rows, lambda t: t["amount"] < -50), amounts, key=lambda t: -t["amount"]))
+    assert len(out) == len(amounts) == 50
+    assert amounts.quantile(0.5) in (75, 76)
+
+def test_sketch_view_on_event_bus():
+    bus = EventBus()
+    view = SketchView([{"user_id": 1, "acc_id": 1, "cat_id": 2, "amount": -10.0}]).subscribe(bus)
+    bus.publish(TRANSACTION_ADDED, {"transaction": {"user_id": 1, "acc_id": 2, "cat_id": 2, "amount": -30.0}})
+    bus.publish(TRANSACTION_ADDED, {"transaction": {"user_id": 2, "acc_id": 3, "cat_id": 5, "amount": 99.0}})
+    bus.publish(TRANSACTION_ADDED, {"transaction": {"user_id": 1, "acc_id": 2, "cat_id": 7, "amount": -500.0}})
+    assert view.expense_quantiles(1, (0.0, 1.0), cat_id=2) == [10.0, 30.0]
+    assert view.expense_quantiles(1, (0.0, 1.0)) == [10.0, 500.0]
+    assert view.category_quantiles(1) == {2: view.expense_quantiles(1, (0.5, 0.95), 2), 7: [500.0, 500.0]}
+    assert view.expense_quantiles(2, cat_id=5) == [None, None]
+    assert view.distinct(1, "acc_id") == 2 and view.distinct(1, "cat_id") == 2
+    kll, distinct = view.overall()
+    assert kll.n == 3 and distinct["acc_id"].count() == 3
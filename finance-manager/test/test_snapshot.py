@@ -0,0 +1,59 @@
+import pytest
+
+from core.journal import Journal, load
+from core.snapshot import Snapshot, read, write
+
+data = {
+    "users": [{"id": 1, "name": "Дина"}],
+    "accounts": [{"id": 3, "user_id": 1, "name": "Kaspi", "balance": 10.5, "currency": "KZT"}],
+    "categories": [{"id": 4, "user_id": 1, "name": "Еда", "parent_id": None},
+                   {"id": 5, "user_id": 1, "name": "Кафе", "parent_id": 4}],
+    "transactions": [
+        {"id": 1, "user_id": 1, "acc_id": 3, "cat_id": 5, "amount": -200.55, "date": "2025-01-02", "note": "обед"},
+        {"id": 2, "user_id": None, "acc_id": 3, "cat_id": 4, "amount": 1000.0, "date": None, "note": None},
+    ],
+    "budgets": [{"id": 1, "user_id": 1, "cat_id": 4, "limit": 500.0}],
+}
+
+def test_roundtrip(tmp_path):
+    path = str(tmp_path / "seed.fmsnap")
+    write(path, data)
+    assert read(path) == data
+
+def test_lazy_columns_and_frame(tmp_path):
+    path = str(tmp_path / "seed.fmsnap")
+    write(path, data)
+    snap = Snapshot(path)
+    assert snap.count("transactions") == 2
+    assert snap.column("transactions", "amount").tolist() == [-20055, 100000]
+    frame = snap.frame()
+    assert frame.income_expense("cat") == {4: {"income": 1000.0, "expense": 0.0}, 5: {"income": 0.0, "expense": 200.55}}
+    assert frame.sum(frame.mask_date_range("2025-01-01", "2025-01-31")) == -200.55
+
+def test_journal_on_top_of_snapshot(tmp_path):
+    path = str(tmp_path / "seed.fmsnap")
+    write(path, data)
+    journal = Journal(path)
+    journal.put("transactions", {"id": 3, "user_id": 1, "acc_id": 3, "cat_id": 4, "amount": -1.0, "date": None, "note": None})
+    journal.delete("transactions", 1)
+    journal.compact()
+    assert [t["id"] for t in load(path)["transactions"]] == [2, 3]
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "seed.fmsnap"
+    path.write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
+    write(str(path), {})
+    assert read(str(path))["transactions"] == []
+
+def test_storage_aggregates_without_decoding_rows(tmp_path):
+    from core.storage import JsonStorage
+    path = str(tmp_path / "seed.fmsnap")
+    write(path, data)
+    storage = JsonStorage(path)
+    assert storage.category_totals(1) == {5: {"income": 0.0, "expense": 200.55}}
+    assert storage._data is None
+    storage.put("transactions", {"id": 3, "user_id": 1, "acc_id": 3, "cat_id": 4, "amount": -1.0, "date": None, "note": None})
+    assert storage.totals(1) == {"income": 0.0, "expense": 201.55}
+    assert JsonStorage(path).totals(1) == {"income": 0.0, "expense": 201.55}
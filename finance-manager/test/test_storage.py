@@ -0,0 +1,118 @@
+import io
+import json
+import sqlite3
+
+import pytest
+from core.importer import import_csv
+from core.storage import JsonStorage, SqliteStorage, migrate_json_to_sqlite, open_storage
+
+seed = {
+    "users": [{"id": 1, "name": "Dias"}, {"id": 2, "name": "Vlad"}],
+    "accounts": [{"id": 1, "user_id": 1, "name": "Card", "balance": 0.0, "currency": "KZT"}],
+    "categories": [
+        {"id": 1, "user_id": 1, "name": "Salary", "parent_id": None},
+        {"id": 2, "user_id": 1, "name": "Food", "parent_id": None},
+    ],
+    "transactions": [
+        {"id": 1, "user_id": 1, "acc_id": 1, "cat_id": 1, "amount": 1000.0, "date": "2025-01-05"},
+        {"id": 2, "user_id": 1, "acc_id": 1, "cat_id": 2, "amount": -200.0, "date": "2025-01-10"},
+        {"id": 3, "user_id": 1, "acc_id": 1, "cat_id": 2, "amount": -50.0, "date": "2025-02-01"},
+        {"id": 4, "user_id": 2, "acc_id": 2, "cat_id": 2, "amount": -70.0, "date": "2025-01-03"},
+    ],
+    "budgets": [{"id": 1, "user_id": 1, "cat_id": 2, "limit": 300.0}],
+}
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request, tmp_path):
+    json_path = tmp_path / "seed.json"
+    json_path.write_text(json.dumps(seed), encoding="utf-8")
+    s = open_storage(request.param, str(json_path), str(tmp_path / "finance.db"))
+    yield s
+    s.close()
+
+def test_totals(storage):
+    assert storage.totals(1) == {"income": 1000.0, "expense": 250.0}
+    assert storage.totals(2) == {"income": 0, "expense": 70.0}
+
+def test_category_totals(storage):
+    stats = storage.category_totals(1)
+    assert list(stats) == [1, 2]
+    assert stats[2] == {"income": 0, "expense": 250.0}
+
+def test_filters(storage):
+    assert [t["id"] for t in storage.transactions(user_id=1, cat_id=2)] == [2, 3]
+    assert [t["id"] for t in storage.transactions(start="2025-01-04", end="2025-01-31")] == [1, 2]
+    assert [t["id"] for t in storage.transactions(acc_id=2)] == [4]
+    assert [a["name"] for a in storage.rows("accounts", 1)] == ["Card"]
+
+def test_put_delete_persist(storage, tmp_path):
+    storage.put("transactions", {"id": 5, "user_id": 1, "acc_id": 1, "cat_id": 2, "amount": -10.0})
+    storage.put("transactions", {"id": 2, "user_id": 1, "acc_id": 1, "cat_id": 2, "amount": -100.0})
+    storage.delete("transactions", 3)
+    assert storage.totals(1)["expense"] == 110.0
+    reopened = open_storage(
+        "json" if isinstance(storage, JsonStorage) else "sqlite",
+        str(tmp_path / "seed.json"), str(tmp_path / "finance.db"),
+    )
+    assert [t["id"] for t in reopened.load_all()["transactions"]] == [1, 2, 4, 5]
+    reopened.close()
+
+def test_migrate(tmp_path):
+    json_path = tmp_path / "seed.json"
+    json_path.write_text(json.dumps(seed), encoding="utf-8")
+    db = migrate_json_to_sqlite(str(json_path), str(tmp_path / "m.db"))
+    data = db.load_all()
+    assert {k: len(v) for k, v in data.items()} == {k: len(v) for k, v in seed.items()}
+    assert data["budgets"][0]["limit"] == 300.0
+    indexes = {r[0] for r in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_trans_user", "idx_trans_user_cat", "idx_trans_acc", "idx_trans_date"} <= indexes
+    db.close()
+
+def test_sqlite_uses_index(tmp_path):
+    db = SqliteStorage(str(tmp_path / "p.db"))
+    plan = db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT cat_id, SUM(amount) FROM transactions WHERE user_id = ? GROUP BY cat_id", (1,)
+    ).fetchall()
+    assert "idx_trans_user" in " ".join(str(row[-1]) for row in plan)
+    db.close()
+
+def test_migrate_keeps_duplicate_ids(tmp_path):
+    data = dict(seed, transactions=seed["transactions"] + [dict(seed["transactions"][1], amount=-5.0)])
+    json_path = tmp_path / "seed.json"
+    json_path.write_text(json.dumps(data), encoding="utf-8")
+    db = migrate_json_to_sqlite(str(json_path), str(tmp_path / "m.db"))
+    assert [t["id"] for t in db.load_all()["transactions"]] == [1, 2, 3, 4, 5]
+    assert db.totals(1)["expense"] == 255.0
+    db.close()
+
+def test_reimport_with_notes_is_deduped(storage):
+    statement = "date,amount,account,category,note\n2025-03-01,-12.5,Card,Food,coffee\n2025-03-02,-40,Card,Food,taxi\n"
+    for expected in (2, 0):
+        result = import_csv(
+            io.StringIO(statement), lambda rows: storage.put_many("transactions", rows), 1,
+            storage.rows("accounts", 1), storage.rows("categories", 1),
+            existing=storage.transactions(user_id=1), next_id=10 + expected,
+        )
+        assert result.imported == expected
+    assert [t["note"] for t in storage.transactions(user_id=1, start="2025-03-01")] == ["coffee", "taxi"]
+
+def test_sqlite_adds_note_column(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY, user_id INTEGER, acc_id INTEGER,"
+                 " cat_id INTEGER, amount REAL NOT NULL, date TEXT)")
+    conn.execute("INSERT INTO transactions VALUES (1, 1, 1, 1, -5.0, '2025-01-01')")
+    conn.commit()
+    conn.close()
+    db = SqliteStorage(path)
+    assert db.load_all()["transactions"] == [
+        {"id": 1, "user_id": 1, "acc_id": 1, "cat_id": 1, "amount": -5.0, "date": "2025-01-01", "note": None}
+    ]
+    db.close()
+
+def test_max_id(storage):
+    assert storage.max_id("transactions") == 4
+    storage.put("transactions", {"id": 10, "user_id": 2, "acc_id": 2, "cat_id": 2, "amount": -1.0})
+    assert storage.max_id("transactions") == 10
+    storage.replace_all({"users": seed["users"]})
+    assert storage.max_id("transactions") == 0
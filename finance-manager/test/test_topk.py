@@ -0,0 +1,41 @@
+import random
+
+from core.domain import Category, Transaction
+from core.lazy import lazy_top_snapshots
+from core.topk import SpaceSaving, top_k
+
+def test_exact_while_within_capacity():
+    sketch = SpaceSaving(3)
+    for key, weight in [("a", 5), ("b", 1), ("a", 2), ("c", 4)]:
+        sketch.update(key, weight)
+    assert sketch.top(2) == [("a", 7), ("c", 4)]
+    assert sketch.error("a") == 0 and sketch.total == 12
+
+def test_heavy_hitters_survive_eviction():
+    rnd = random.Random(1)
+    stream = [("big", 50)] * 200 + [(f"k{rnd.randrange(500)}", rnd.randint(1, 10)) for _ in range(5000)]
+    rnd.shuffle(stream)
+    sketch = SpaceSaving(20)
+    for key, weight in stream:
+        sketch.update(key, weight)
+    assert len(sketch) == 20 and len(sketch._heap) <= 40
+    key, estimate = sketch.top(1)[0]
+    assert key == "big"
+    assert estimate - sketch.error("big") <= 10000 <= estimate
+
+def test_merge_matches_single_stream_top():
+    left, right = SpaceSaving(4), SpaceSaving(4)
+    for key, weight in [("a", 10), ("b", 3), ("c", 1)]:
+        left.update(key, weight)
+    for key, weight in [("a", 5), ("d", 8), ("c", 1)]:
+        right.update(key, weight)
+    merged = left.merge(right)
+    assert merged.top(2) == [("a", 15), ("d", 8)]
+    assert top_k({"a": 15, "d": 8, "b": 3}, 2) == [("a", 15), ("d", 8)]
+
+def test_snapshot_stream():
+    trans = [Transaction(i, "acc", f"c{i % 3}", -(i + 1), "2025-01-01") for i in range(10)]
+    cats = tuple(Category(f"c{i}", f"C{i}", None, "expense") for i in range(3))
+    shots = list(lazy_top_snapshots(trans, cats, 2, every=4, capacity=3))
+    assert len(shots) == 3
+    assert shots[-1] == (("c0", 22), ("c2", 18))
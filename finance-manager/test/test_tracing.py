@@ -0,0 +1,49 @@
+from core import tracing
+from core.reports import build_report, category_totals
+from core.tracing import Tracer, profiled, span, traced
+
+TRANSACTIONS = [
+    {"user_id": 1, "cat_id": 1, "amount": -500},
+    {"user_id": 1, "cat_id": 2, "amount": 2000},
+]
+CATEGORIES = [{"id": 1, "name": "еда", "parent_id": None}, {"id": 2, "name": "работа", "parent_id": None}]
+
+def test_disabled_spans_record_nothing():
+    tracing.TRACER.reset()
+    tracing.enable(False)
+    with span("outer") as s:
+        pass
+    assert s is span("other") and tracing.TRACER.stats() == []
+
+def test_nested_spans_stats_and_chrome_trace():
+    tracer = Tracer()
+    tracer.enabled = True
+    for _ in range(3):
+        with tracer.span("outer"):
+            with tracer.span("inner"):
+                pass
+    stats = {row["span"]: row for row in tracer.stats()}
+    assert stats["outer"]["count"] == stats["inner"]["count"] == 3
+    assert stats["outer"]["total_ms"] >= stats["inner"]["total_ms"]
+    assert stats["inner"]["p50_ms"] <= stats["inner"]["p99_ms"]
+    events = tracer.chrome_trace()["traceEvents"]
+    assert [e["name"] for e in events[:2]] == ["inner", "outer"]
+    inner, outer = events[0], events[1]
+    assert inner["ph"] == "X" and inner["args"]["depth"] == 1 and outer["args"]["depth"] == 0
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+def test_instrumented_core_and_profile():
+    tracing.TRACER.reset()
+    tracing.enable()
+    try:
+        with profiled() as result:
+            report = build_report(category_totals(TRANSACTIONS, user_id=1), CATEGORIES)
+        double = traced("double")(lambda x: x * 2)
+        assert double(21) == 42
+    finally:
+        tracing.enable(False)
+    assert report.income == 2000 and report.expense == 500
+    names = {row["span"] for row in tracing.TRACER.stats()}
+    assert {"reports.category_totals", "reports.build_report", "double"} <= names
+    assert "category_totals" in result["text"]
+    tracing.TRACER.reset()
@@ -13,7 +13,7 @@ def test_lazy_top_categories_simple():
     )
     gen = lazy_top_categories(iter_transactions(trans, lambda t: True), cats, 2)
     result = list(gen)
-    assert result[-1][0] == "food"
+    assert sorted(result) == [("food", 300), ("transport", 300)]
 
 def test_lazy_top_categories_limit_k():
     trans = (
@@ -28,7 +28,7 @@ def test_lazy_top_categories_limit_k():
     )
     gen = lazy_top_categories(iter_transactions(trans, lambda t: True), cats, 2)
     result = list(gen)
-    assert result[-1][0] in {"b", "c"}
+    assert result == [("c", 400), ("b", 300)]
 
 def test_lazy_combined_pipeline():
     trans = (
@@ -1,6 +1,6 @@
 from core.validation import (
     Account, Category, Transaction, Budget,
-    safe_category, validate_transaction, check_budget, validate_pipeline
+    safe_category, validate_transaction, check_budget, validate_pipeline, Validator
 )
 from core.maybe_either import Left, Right, Maybe
 
@@ -59,3 +59,31 @@ def test_pipeline_budget_exceeded():
     t = Transaction(1, 10, 100)
     result = validate_pipeline(t, accs, cats, budgets, trans)
     assert isinstance(result, Left)
+
+
+def test_validator_matches_pipeline():
+    accs = [Account(1, "Cash")]
+    cats = [Category(10, "Food")]
+    budgets = [Budget(10, 150)]
+    trans = [Transaction(1, 10, 100)]
+    v = Validator.from_models(accs, cats, budgets, trans)
+    for t in (Transaction(1, 10, 50), Transaction(1, 10, 100), Transaction(2, 10, 1), Transaction(1, 99, 1)):
+        expected = validate_pipeline(t, accs, cats, budgets, trans)
+        got = v.validate(t)
+        assert type(got) is type(expected)
+        if isinstance(got, Left):
+            assert got.value == expected.value
+
+
+def test_validate_many_tracks_running_spend():
+    v = Validator.from_models([Account(1, "Cash")], [Category(10, "Food")], [Budget(10, 150)])
+    results = v.validate_many([Transaction(1, 10, 100), Transaction(1, 10, 100), Transaction(1, 10, 50)])
+    assert [type(r) for r in results] == [Right, Left, Right]
+    assert v.spent[10] == 150
+
+
+def test_validate_many_bulk():
+    v = Validator(range(10), range(100), {})
+    items = [Transaction(i % 10, i % 100, -1) for i in range(100_000)]
+    results = v.validate_many(items)
+    assert all(isinstance(r, Right) for r in results)
@@ -0,0 +1,44 @@
+from core.frp import EventBus
+from core.views import (
+    MaterializedTotals, period_key,
+    TRANSACTION_ADDED, TRANSACTION_EDITED, TRANSACTION_DELETED,
+)
+
+history = [
+    {"id": 1, "user_id": 1, "acc_id": 1, "cat_id": 1, "amount": 1000.0, "date": "2025-01-05"},
+    {"id": 2, "user_id": 1, "acc_id": 1, "cat_id": 2, "amount": -200.0, "date": "2025-01-10"},
+    {"id": 3, "user_id": 2, "acc_id": 2, "cat_id": 2, "amount": -70.0},
+]
+
+def _bus():
+    bus = EventBus()
+    view = MaterializedTotals(history).subscribe(bus)
+    return bus, view
+
+def test_initial_totals():
+    _, view = _bus()
+    assert view.user_totals(1) == {"income": 1000.0, "expense": 200.0}
+    assert view.category_totals(1) == {1: {"income": 1000.0, "expense": 0.0}, 2: {"income": 0.0, "expense": 200.0}}
+    assert view.account_balance(1) == 800.0
+    assert view.period_spent(1, 2, "2025-01") == 200.0
+    assert view.period_spent(1, 2, period_key("2025-01-10", "week")) == 200.0
+
+def test_add_edit_delete_events():
+    bus, view = _bus()
+    new = {"id": 4, "user_id": 1, "acc_id": 1, "cat_id": 2, "amount": -0.1, "date": "2025-02-01"}
+    results = bus.publish(TRANSACTION_ADDED, {"transaction": new})
+    assert results == [{"income": 1000.0, "expense": 200.1}]
+    edited = dict(new, cat_id=3, amount=-0.3)
+    bus.publish(TRANSACTION_EDITED, {"old": new, "new": edited})
+    assert view.category_totals(1)[2]["expense"] == 200.0
+    assert view.category_totals(1)[3]["expense"] == 0.3
+    assert view.period_spent(1, 3, "2025-02") == 0.3
+    bus.publish(TRANSACTION_DELETED, {"transaction": edited})
+    assert 3 not in view.category_totals(1)
+    assert view.user_totals(1) == {"income": 1000.0, "expense": 200.0}
+
+def test_matches_full_recompute():
+    _, view = _bus()
+    expense = sum(-t["amount"] for t in history if t["user_id"] == 2 and t["amount"] < 0)
+    assert view.user_totals(2)["expense"] == expense
+    assert view.user_totals(99) == {"income": 0, "expense": 0}